@@ -1,10 +1,19 @@
-from flask import request, make_response, current_app
+from flask import request, current_app
 from flask_restful import Resource
 
 from firebase_admin import db
 from app.routes.mra.view_models.atleta_view_model import AtletaViewModel
+from utils.rest.etag import calcola_etag_collezione, formatta_etag, etag_corrisponde, risposta_condizionale, risposta_non_modificata, memorizza_etag
+from utils.rest.proiezione import leggi_parametri_proiezione
+from app.routes.mra.utils.espansione import RELAZIONI_ATLETA, leggi_parametro_expand, variante_espansione, elementi_incorporati, incorpora_tipologie
+from utils.firebase.firebase_reference import TransazioneAnnullata
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
 
+# Rami figli dell'atleta mantenuti inalterati da una PUT
+RAMI_PRESERVATI_PUT = ("esercizi",)
+
+ERRORE_PRECONDIZIONE = "L'atleta è stato modificato da un'altra richiesta"
+
 # -----------------------------------------------------------------------------
 
 @log_restful_class_on_any_method_call(log_restful_method_call)
@@ -21,6 +30,9 @@ class Atleta(Resource):
         tags:
           - MRA - Atleti
         summary: Ottiene i dettagli di un atleta
+        description: >
+          Con il parametro "expand" la risposta incorpora in "_embedded" le tipologie di esercizi svolti
+          e, a cascata, le relative sessioni e rilevazioni, ottenute con una sola lettura del database.
         parameters:
           - name: id_atleta
             in: path
@@ -28,6 +40,25 @@ class Atleta(Resource):
             required: true
             description: ID univoco dell'atleta
             example: "123"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,nickname"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
+          - name: expand
+            in: query
+            type: string
+            enum: [tipologie_esercizi_svolti, tipologie_esercizi_svolti.sessioni, tipologie_esercizi_svolti.sessioni.rilevazioni]
+            required: false
+            description: Relazioni da incorporare in "_embedded" (catena separata da punto)
+            example: "tipologie_esercizi_svolti.sessioni"
         responses:
           200:
             description: Atleta trovato
@@ -43,6 +74,11 @@ class Atleta(Resource):
                   tipologie_esercizi_svolti: "/api/mra/v1.0.0/atleti/123/tipologie-esercizi-svolti"
           304:
             description: Contenuto non modificato (ETag match)
+          400:
+            description: Parametro "expand" non valido
+            examples:
+              application/json:
+                error: "Parametro 'expand' non valido: [sessioni] (valori ammessi: tipologie_esercizi_svolti, ...)"
           404:
             description: Atleta non trovato
             examples:
@@ -56,24 +92,42 @@ class Atleta(Resource):
                 comment: "Errore interno del server in Atleta.get"
         """
         try:
+            try:
+                espansione = leggi_parametro_expand(request.args, RELAZIONI_ATLETA)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
             db = current_app.config['firebase'].get('db_app_1a')
             ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}")
-            get_reply = ref.get()
+
+            # 304 senza leggere né rendere i dati, se la loro versione in cache non è cambiata
+            non_modificata = risposta_non_modificata(ref.versione())
+            if non_modificata is not None:
+                return non_modificata
+
+            get_reply, versione = ref.get_con_versione()
 
             if not get_reply:
                 return {"error": "Atleta non trovato"}, 404
 
+            proiezione = leggi_parametri_proiezione(request.args)
             atleta_vm = AtletaViewModel(id_atleta, get_reply)
-            atleta_dict = atleta_vm.to_dict()
-            etag = atleta_dict["_hash"]
-
-            client_etag = request.headers.get("If-None-Match")
-            if client_etag == etag:
-                return make_response('', 304)
+            atleta_dict = atleta_vm.to_dict(proiezione)
+            if espansione:
+                # Sottoalbero dell'atleta già letto per intero: nessuna lettura aggiuntiva per le relazioni incorporate
+                esercizi = get_reply.get("esercizi")
+                riepilogo_atleta = current_app.config['indice_riepilogo_1a'].registra_atleta(id_atleta, esercizi)
+                atleta_dict["_embedded"] = {
+                    "tipologie_esercizi_svolti": incorpora_tipologie(id_atleta, riepilogo_atleta, esercizi, espansione[1:], proiezione)
+                }
+                etag = calcola_etag_collezione(elementi_incorporati(atleta_dict), variante_espansione(proiezione, espansione))
+            elif proiezione.completa:
+                etag = atleta_dict["_hash"]
+            else:
+                etag = calcola_etag_collezione([atleta_dict], proiezione.variante)
+            memorizza_etag(versione, etag)
 
-            response = make_response(atleta_dict, 200)
-            response.headers["ETag"] = etag
-            return response
+            return risposta_condizionale(atleta_dict, etag)
 
         except Exception as e:
             error_location = "Atleta.get"
@@ -93,10 +147,13 @@ class Atleta(Resource):
         summary: Aggiorna completamente un atleta
         description: >
           Questo metodo implementa un "safe PUT":
-          - Recupera il documento esistente da Firebase
+          - Verifica l'esistenza dell'atleta leggendo le sole chiavi del documento (lettura shallow)
           - Applica i nuovi dati forniti nel body (nickname, genere, data-inserimento)
-          - Mantiene inalterati eventuali rami non forniti (es. "esercizi")
-          - Sovrascrive il documento completo, assicurando l'integrità dei dati
+          - Mantiene inalterati eventuali rami non forniti (es. "esercizi"), senza leggerli né riscriverli
+          - Rimuove ogni altro campo, con un unico aggiornamento multi-path
+          Con l'header If-Match la sostituzione avviene, in un'unica transazione, solo se l'atleta
+          non è stato modificato rispetto all'ETag indicato (altrimenti 412); la transazione
+          scarica e riscrive l'intero nodo dell'atleta, storico "esercizi" compreso.
         parameters:
           - name: id_atleta
             in: path
@@ -116,6 +173,12 @@ class Atleta(Resource):
                   enum: [M, F]
                 data-inserimento:
                   type: string
+          - name: If-Match
+            in: header
+            required: false
+            type: string
+            description: ETag dell'atleta già letto dal client; la scrittura avviene solo se corrisponde ancora a quello corrente ("_hash" di una GET senza fields/expand; ETag di altre rappresentazioni o deboli "W/" danno sempre 412)
+            example: "abc123hash"
         responses:
           200:
             description: Atleta aggiornato con successo
@@ -139,6 +202,11 @@ class Atleta(Resource):
             examples:
               application/json:
                 error: "Atleta non trovato"
+          412:
+            description: L'atleta è stato modificato dopo la lettura del client (If-Match non corrispondente)
+            examples:
+              application/json:
+                error: "L'atleta è stato modificato da un'altra richiesta"
           500:
             description: Errore interno del server
             examples:
@@ -155,25 +223,38 @@ class Atleta(Resource):
             db = current_app.config['firebase'].get('db_app_1a')
             ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}")
 
-            get_reply = ref.get()
-            if not get_reply:
-                return {"error": "Atleta non trovato"}, 404
-
-            # Recupero rami children da reimpostare as-is (es. "esercizi")
-            esercizi_original = get_reply.get("esercizi", {})
-
             # Costruzione del nuovo stato da salvare (safe PUT)
             dati_firebase = {
                 "nickname": dati["nickname"],
                 "sesso": dati["genere"],
-                "data": dati["data-inserimento"],
-                "esercizi": esercizi_original
+                "data": dati["data-inserimento"]
             }
 
-            ref.set(dati_firebase)
+            if_match = request.headers.get("If-Match")
+            if if_match:
+                # Scrittura condizionata: verifica dell'ETag e sostituzione in un'unica transazione
+                _, errore = self._scrittura_condizionata(ref, id_atleta, if_match, lambda corrente: dict(
+                    dati_firebase, **{ramo: corrente[ramo] for ramo in RAMI_PRESERVATI_PUT if ramo in corrente}
+                ))
+                if errore:
+                    return errore
+            else:
+                # Verifica di esistenza con lettura shallow (solo le chiavi, non lo storico "esercizi")
+                chiavi_atleta = ref.get_shallow()
+                if not chiavi_atleta:
+                    return {"error": "Atleta non trovato"}, 404
 
-            atleta_vm = AtletaViewModel(id_atleta, dati_firebase)
-            return atleta_vm.to_dict(), 200
+                # Aggiornamento multi-path: i campi sconosciuti sono rimossi (valore None), i rami preservati
+                # (es. "esercizi") non vengono né letti né riscritti
+                aggiornamenti = dict(dati_firebase)
+                for chiave in chiavi_atleta:
+                    if chiave not in aggiornamenti and chiave not in RAMI_PRESERVATI_PUT:
+                        aggiornamenti[chiave] = None
+
+                ref.update(aggiornamenti)
+
+            atleta_dict = AtletaViewModel(id_atleta, dati_firebase).to_dict()
+            return atleta_dict, 200, {"ETag": formatta_etag(atleta_dict["_hash"])}
 
         except Exception as e:
             error_location = "Atleta.put"
@@ -206,6 +287,12 @@ class Atleta(Resource):
                   enum: [M, F]
                 data-inserimento:
                   type: string
+          - name: If-Match
+            in: header
+            required: false
+            type: string
+            description: ETag dell'atleta già letto dal client; la scrittura avviene solo se corrisponde ancora a quello corrente ("_hash" di una GET senza fields/expand; ETag di altre rappresentazioni o deboli "W/" danno sempre 412)
+            example: "abc123hash"
         responses:
           200:
             description: Atleta aggiornato
@@ -229,6 +316,11 @@ class Atleta(Resource):
             examples:
               application/json:
                 error: "Atleta non trovato"
+          412:
+            description: L'atleta è stato modificato dopo la lettura del client (If-Match non corrispondente)
+            examples:
+              application/json:
+                error: "L'atleta è stato modificato da un'altra richiesta"
           500:
             description: Errore interno del server
             examples:
@@ -241,9 +333,6 @@ class Atleta(Resource):
 
             db_ref = current_app.config['firebase'].get('db_app_1a')
             ref = db_ref.get_reference(f"/tempiDiReazione/utenti/{id_atleta}")
-            atleta_esistente = ref.get()
-            if not atleta_esistente:
-                return {"error": "Atleta non trovato"}, 404
 
             aggiornamenti = {}
 
@@ -257,13 +346,30 @@ class Atleta(Resource):
             if not aggiornamenti:
                 return {"error": "Nessun campo valido fornito"}, 400
 
-            # ⚠️ PATCH: aggiorna solo i campi presenti nel payload.
-            # Firebase manterrà automaticamente intatti tutti gli altri rami (es. "esercizi"):
-            ref.update(aggiornamenti)
+            if_match = request.headers.get("If-Match")
+            if if_match:
+                # Scrittura condizionata: verifica dell'ETag ed aggiornamento in un'unica transazione
+                atleta_aggiornato, errore = self._scrittura_condizionata(
+                    ref, id_atleta, if_match, lambda corrente: dict(corrente, **aggiornamenti)
+                )
+                if errore:
+                    return errore
+            else:
+                # Verifica di esistenza con lettura shallow (solo le chiavi, non lo storico "esercizi")
+                chiavi_atleta = ref.get_shallow()
+                if not chiavi_atleta:
+                    return {"error": "Atleta non trovato"}, 404
+
+                # ⚠️ PATCH: aggiorna solo i campi presenti nel payload.
+                # Firebase manterrà automaticamente intatti tutti gli altri rami (es. "esercizi"):
+                ref.update(aggiornamenti)
+
+                # Rappresentazione aggiornata: i soli campi scalari non modificati sono letti singolarmente
+                campi_invariati = [k for k in ("nickname", "sesso", "data") if k not in aggiornamenti and k in chiavi_atleta]
+                atleta_aggiornato = dict(ref.get_figli(campi_invariati), **aggiornamenti)
 
-            atleta_aggiornato = ref.get()
-            atleta_vm = AtletaViewModel(id_atleta, atleta_aggiornato)
-            return atleta_vm.to_dict(), 200
+            atleta_dict = AtletaViewModel(id_atleta, atleta_aggiornato).to_dict()
+            return atleta_dict, 200, {"ETag": formatta_etag(atleta_dict["_hash"])}
 
         except Exception as e:
             error_location = "Atleta.patch"
@@ -284,6 +390,12 @@ class Atleta(Resource):
             required: true
             type: string
             example: "123"
+          - name: If-Match
+            in: header
+            required: false
+            type: string
+            description: ETag dell'atleta già letto dal client; l'eliminazione avviene solo se corrisponde ancora a quello corrente ("_hash" di una GET senza fields/expand; ETag di altre rappresentazioni o deboli "W/" danno sempre 412)
+            example: "abc123hash"
         responses:
           204:
             description: Atleta eliminato con successo
@@ -292,6 +404,11 @@ class Atleta(Resource):
             examples:
               application/json:
                 error: "Atleta non trovato"
+          412:
+            description: L'atleta è stato modificato dopo la lettura del client (If-Match non corrispondente)
+            examples:
+              application/json:
+                error: "L'atleta è stato modificato da un'altra richiesta"
           500:
             description: Errore interno del server
             examples:
@@ -302,10 +419,23 @@ class Atleta(Resource):
         try:
             db_ref = current_app.config['firebase'].get('db_app_1a')
             ref = db_ref.get_reference(f"/tempiDiReazione/utenti/{id_atleta}")
-            if not ref.get():
-                return {"error": "Atleta non trovato"}, 404
 
-            ref.delete()
+            if_match = request.headers.get("If-Match")
+            if if_match:
+                # Eliminazione condizionata: ETag dell'atleta verificato sul valore letto, eliminazione
+                # subordinata all'ETag Firebase della stessa lettura (nessuna modifica nel frattempo)
+                corrente, etag_firebase = ref.get_con_etag()
+                if not corrente:
+                    return {"error": "Atleta non trovato"}, 404
+                if not etag_corrisponde(AtletaViewModel(id_atleta, corrente)._calcola_hash(), if_match, forte=True) \
+                        or not ref.delete_if_unchanged(etag_firebase):
+                    return {"error": ERRORE_PRECONDIZIONE}, 412
+            else:
+                if not ref.get_shallow():
+                    return {"error": "Atleta non trovato"}, 404
+
+                ref.delete()
+            current_app.config['indice_riepilogo_1a'].rimuovi_atleta(id_atleta)
             return '', 204
 
         except Exception as e:
@@ -313,4 +443,30 @@ class Atleta(Resource):
             print(f"\u274c Errore in {error_location}: {e}")
             return {"error": str(e), "comment": f"Errore interno del server in {error_location}"}, 500
 
+    #--------------------------------------------------------------------------
+    def _scrittura_condizionata(self, ref, id_atleta, if_match, nuovo_valore):
+        """
+        Scrittura condizionata dall'header If-Match, applicata atomicamente con una transazione Firebase:
+        nuovo_valore(valore_corrente) viene scritto solo se l'ETag corrente dell'atleta ("_hash")
+        corrisponde ancora a quello indicato dal client (confronto forte).
+        ⚠️ La transazione scarica l'intero nodo dell'atleta e lo riscrive, storico "esercizi" compreso
+        (e lo riscarica ad ogni conflitto): costo accettato per le sole richieste con If-Match.
+        Ritorna la coppia (valore scritto, None) oppure (None, risposta di errore 404/412).
+        """
+        esito = {}
+
+        def aggiorna_se_invariato(corrente):
+            if not corrente:
+                esito["errore"] = ({"error": "Atleta non trovato"}, 404)
+                raise TransazioneAnnullata()
+            if not etag_corrisponde(AtletaViewModel(id_atleta, corrente)._calcola_hash(), if_match, forte=True):
+                esito["errore"] = ({"error": ERRORE_PRECONDIZIONE}, 412)
+                raise TransazioneAnnullata()
+            return nuovo_valore(corrente)
+
+        try:
+            return ref.transaction(aggiorna_se_invariato), None
+        except TransazioneAnnullata:
+            return None, esito["errore"]
+
 #==============================================================================
@@ -5,7 +5,11 @@ import inspect
 
 from utils.config import config, env
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.paginazione import leggi_parametri_paginazione, costruisci_link_pagina
+from utils.rest.etag import calcola_etag_collezione, risposta_condizionale
+from utils.rest.proiezione import leggi_parametri_proiezione
 
+from utils.firebase.firebase_reference import TransazioneAnnullata
 from app.routes.mra.view_models.atleta_view_model import AtletaViewModel
 
 # -----------------------------------------------------------------------------
@@ -25,6 +29,33 @@ class Atleti(Resource):
         summary: Ottiene la lista di tutti gli atleti
         description: >
           Ritorna la lista di tutti gli atleti registrati nel sistema, con metadati principali e link HATEOAS per ogni atleta.
+          Se viene indicato il parametro "limit", la risposta è paginata lato database (ordinamento per ID atleta):
+          la lista viene restituita nel campo "atleti" ed il link alla pagina successiva in "_links.next".
+        parameters:
+          - name: limit
+            in: query
+            type: integer
+            required: false
+            description: Numero massimo di atleti per pagina (abilita la paginazione)
+            example: 50
+          - name: cursor
+            in: query
+            type: string
+            required: false
+            description: ID del primo atleta della pagina richiesta (ricavato da "_links.next")
+            example: "123"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,nickname"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Lista di atleti trovata con successo
@@ -58,6 +89,15 @@ class Atleti(Resource):
                       tipologie_esercizi_svolti:
                         type: string
                         example: "/api/mra/v1.0.0/atleti/123/tipologie-esercizi-svolti"
+          304:
+            description: Contenuto non modificato (ETag della collezione invariato)
+          400:
+            description: Parametri di paginazione non validi
+            examples:
+              application/json:
+                {
+                  "error": "Parametro 'limit' non valido: [abc]"
+                }
           404:
             description: Nessun atleta trovato
             examples:
@@ -78,8 +118,19 @@ class Atleti(Resource):
             # Generazione forzata di test per HTTP resp-code 500 (INTERNAL-SERVER-ERROR):
             # raise ValueError("Test per 500-INTERNAL-SERVER-ERROR")
 
+            try:
+                limit, cursor = leggi_parametri_paginazione(request.args)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            proiezione = leggi_parametri_proiezione(request.args)
+
             db = current_app.config['firebase'].get('db_app_1a')
             ref = db.get_reference("/tempiDiReazione/utenti")
+
+            if limit is not None:
+                return self._get_pagina(ref, limit, cursor, proiezione)
+
             get_reply = ref.get()
 
             if not get_reply:
@@ -91,12 +142,12 @@ class Atleti(Resource):
             for id_entity, entity_original_format in get_reply.items():
                 entity_view_model = AtletaViewModel(id_entity, entity_original_format)
 
-                entity_view_model_dictionary = entity_view_model.to_dict()
+                entity_view_model_dictionary = entity_view_model.to_dict(proiezione)
                 # etag = entity_view_model_dictionary["_hash"]
 
                 response.append(entity_view_model_dictionary)
 
-            return response, 200
+            return risposta_condizionale(response, calcola_etag_collezione(response, proiezione.variante))
 
         except Exception as e:
             error_location = "Atleti.get"
@@ -106,6 +157,27 @@ class Atleti(Resource):
                 "comment": f"Errore interno del server in {error_location}"
             }, 500
 
+    #--------------------------------------------------------------------------
+    def _get_pagina(self, ref, limit, cursor, proiezione):
+        # Query ordinata per chiave: si legge un elemento in più per sapere se esiste una pagina successiva
+        get_reply = ref.get_ordered_by_key(start_at=cursor, limit_to_first=limit + 1)
+
+        if not get_reply and cursor is None:
+            return {"error": "Nessun atleta trovato"}, 404
+
+        chiavi = list(get_reply.keys()) if get_reply else []
+
+        response = []
+        for id_entity in chiavi[:limit]:
+            entity_view_model = AtletaViewModel(id_entity, get_reply[id_entity])
+            response.append(entity_view_model.to_dict(proiezione))
+
+        links = {"self": costruisci_link_pagina(request.path, request.args)}
+        if len(chiavi) > limit:
+            links["next"] = costruisci_link_pagina(request.path, request.args, cursor=chiavi[limit])
+
+        return risposta_condizionale({"atleti": response, "_links": links}, calcola_etag_collezione(response + [links], proiezione.variante))
+
     #--------------------------------------------------------------------------
     def post(self):
         """
@@ -194,11 +266,8 @@ class Atleti(Resource):
 
             id_atleta = str(dati["id"])
 
-            # Controlla se esiste già l'atleta
             db = current_app.config['firebase'].get('db_app_1a')
             ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}")
-            if ref.get() is not None:
-                return {"error": "ID atleta già presente"}, 409
 
             # Prepara i dati da salvare (formato Firebase)
             dati_firebase = {
@@ -207,8 +276,19 @@ class Atleti(Resource):
                 "data": dati["data-inserimento"]
             }
 
-            # Scrivi su Firebase
-            ref.set(dati_firebase)
+            def crea_se_assente(atleta_corrente):
+                if atleta_corrente is not None:
+                    raise TransazioneAnnullata()
+                return dati_firebase
+
+            # Creazione atomica solo se l'ID non esiste già (nessuna lettura preventiva del nodo)
+            try:
+                ref.transaction(crea_se_assente)
+            except TransazioneAnnullata:
+                return {"error": "ID atleta già presente"}, 409
+
+            # Aggiornamento incrementale dell'indice di riepilogo (nuovo atleta senza esercizi)
+            current_app.config['indice_riepilogo_1a'].registra_atleta(id_atleta)
 
             # Crea il ViewModel per restituire il risultato formattato
             atleta_vm = AtletaViewModel(id_atleta, dati_firebase)
@@ -0,0 +1,133 @@
+from flask import request, current_app
+from flask_restful import Resource
+
+from utils.rest.batch import leggi_elementi_batch, esegui_batch_get
+from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+
+MRA_BASE_URL = "/api/mra/v1.0.0"
+
+# -----------------------------------------------------------------------------
+
+@log_restful_class_on_any_method_call(log_restful_method_call)
+class Batch(Resource):
+    """
+    Lettura in un'unica richiesta di più risorse MRA (es. più atleti o più sessioni),
+    risolte in parallelo, con esito ed ETag per ciascuna.
+    """
+
+    #--------------------------------------------------------------------------
+    def get(self):
+        """
+        Legge più risorse MRA indicate con il parametro "path" (ripetuto)
+        ---
+        tags:
+          - MRA - Batch
+        summary: Lettura multipla di risorse MRA
+        description: >
+          Ogni path (relativo a /api/mra/v1.0.0 oppure assoluto, eventualmente con query-string)
+          viene risolto in parallelo come una normale GET. La risposta riporta, nell'ordine di richiesta,
+          status code, ETag e contenuto di ciascuna risorsa.
+        parameters:
+          - name: path
+            in: query
+            type: array
+            items:
+              type: string
+            collectionFormat: multi
+            required: true
+            description: Path delle risorse da leggere
+            example: ["atleti/1", "atleti/2"]
+        responses:
+          200:
+            description: Esiti delle singole letture
+            examples:
+              application/json:
+                responses:
+                  - path: "atleti/1"
+                    status: 200
+                    etag: '"abc123hash"'
+                    body: { "id": "1", "nickname": "speedy" }
+                  - path: "atleti/999"
+                    status: 404
+                    body: { "error": "Atleta non trovato" }
+          400:
+            description: Elenco di path mancante o troppo lungo
+            examples:
+              application/json:
+                error: "Elenco di richieste mancante o vuoto"
+          500:
+            description: Errore interno del server
+            examples:
+              application/json:
+                error: "<EXCEPTION>"
+                comment: "Errore interno del server in Batch.get"
+        """
+        return self._esegui(request.args.getlist("path"), "Batch.get")
+
+    #--------------------------------------------------------------------------
+    def post(self):
+        """
+        Legge più risorse MRA indicate nel corpo della richiesta
+        ---
+        tags:
+          - MRA - Batch
+        summary: Lettura multipla di risorse MRA (elenco nel corpo)
+        description: >
+          Variante di GET /batch per elenchi lunghi o con validazione condizionale: ogni elemento
+          è un path oppure un oggetto con "path" ed "if_none_match" (ETag già posseduto dal client,
+          per ottenere 304 senza contenuto se la risorsa non è cambiata). Nessuna scrittura viene eseguita.
+        consumes:
+          - application/json
+        parameters:
+          - in: body
+            name: body
+            required: true
+            schema:
+              type: object
+              properties:
+                requests:
+                  type: array
+                  items:
+                    type: object
+              example:
+                requests:
+                  - "atleti/1"
+                  - { "path": "atleti/2", "if_none_match": "abc123hash" }
+                  - "atleti/1/tipologie-esercizi-svolti/111/sessioni?expand=rilevazioni"
+        responses:
+          200:
+            description: Esiti delle singole letture (stesso formato di GET /batch)
+          400:
+            description: Corpo della richiesta non valido
+            examples:
+              application/json:
+                error: "Troppe richieste nel batch: 150 (massimo 100)"
+          500:
+            description: Errore interno del server
+            examples:
+              application/json:
+                error: "<EXCEPTION>"
+                comment: "Errore interno del server in Batch.post"
+        """
+        dati = request.get_json(silent=True)
+        return self._esegui(dati.get("requests") if isinstance(dati, dict) else None, "Batch.post")
+
+    #--------------------------------------------------------------------------
+    def _esegui(self, richieste, error_location):
+        try:
+            try:
+                elementi = leggi_elementi_batch(richieste)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            # Esclusi la risorsa batch stessa ed il bulk export dell'intero database
+            percorsi_esclusi = {request.path, f"{MRA_BASE_URL}/"}
+            esiti = esegui_batch_get(current_app._get_current_object(), MRA_BASE_URL, elementi, percorsi_esclusi)
+            return {"responses": esiti}, 200
+
+        except Exception as e:
+            print(f"❌ Errore in {error_location}: {e}")
+            return {
+                "error": str(e),
+                "comment": f"Errore interno del server in {error_location}"
+            }, 500
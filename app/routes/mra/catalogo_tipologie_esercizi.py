@@ -3,6 +3,8 @@ from flask_restful import Resource
 
 from app.routes.mra.view_models.tipologia_esercizio_view_model import TipologiaEsercizioViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.etag import calcola_etag_collezione, risposta_condizionale, risposta_non_modificata, memorizza_etag
+from utils.rest.proiezione import leggi_parametri_proiezione
 
 # -----------------------------------------------------------------------------
 
@@ -20,6 +22,19 @@ class CatalogoTipologieEsercizi(Resource):
         tags:
           - MRA - Catalogo Tipologie Esercizi
         summary: Ottiene la lista di tutte le tipologie di esercizi a catalogo
+        parameters:
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,nome"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Lista delle tipologie trovata con successo
@@ -49,6 +64,8 @@ class CatalogoTipologieEsercizi(Resource):
                       tentativi:
                         type: string
                         example: "/api/mra/v1.0.0/catalogo-tipologie-esercizi/111/tentativi"
+          304:
+            description: Contenuto non modificato (ETag della collezione invariato)
           404:
             description: Nessuna tipologia esercizio trovata nel catalogo
             examples:
@@ -64,17 +81,26 @@ class CatalogoTipologieEsercizi(Resource):
         try:
             db = current_app.config['firebase'].get('db_app_1a')
             ref = db.get_reference("/tempiDiReazione/tipoEsercizio")
-            dati_tipologie = ref.get()
+
+            # 304 senza leggere né rendere i dati, se la loro versione in cache non è cambiata
+            non_modificata = risposta_non_modificata(ref.versione())
+            if non_modificata is not None:
+                return non_modificata
+
+            dati_tipologie, versione = ref.get_con_versione()
 
             if not dati_tipologie:
                 return {"error": "Nessuna tipologia trovata"}, 404
 
+            proiezione = leggi_parametri_proiezione(request.args)
             response = []
             for id_tipologia, raw_data in dati_tipologie.items():
                 vm = TipologiaEsercizioViewModel(id_tipologia, raw_data)
-                response.append(vm.to_dict())
+                response.append(vm.to_dict(proiezione))
 
-            return response, 200
+            etag = calcola_etag_collezione(response, proiezione.variante)
+            memorizza_etag(versione, etag)
+            return risposta_condizionale(response, etag)
 
         except Exception as e:
             print(f"\u274c Errore in CatalogoTipologieEsercizi.get: {e}")
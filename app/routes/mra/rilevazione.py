@@ -4,6 +4,7 @@ from urllib.parse import unquote
 
 from app.routes.mra.view_models.rilevazione_view_model import RilevazioneViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.proiezione import leggi_parametri_proiezione
 
 # -----------------------------------------------------------------------------
 
@@ -42,6 +43,18 @@ class Rilevazione(Resource):
             type: string
             required: true
             example: "1"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,tempo_risposta_ms"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Rilevazione trovata e restituita
@@ -72,7 +85,7 @@ class Rilevazione(Resource):
             rilevazione_vm = RilevazioneViewModel(
                 id_atleta, id_esercizio, id_sessione, id_rilevazione, valore_rilevazione
             )
-            return rilevazione_vm.to_dict(), 200
+            return rilevazione_vm.to_dict(leggi_parametri_proiezione(request.args)), 200
 
         except Exception as e:
             print(f"❌ Errore in Rilevazione.get: {e}")
@@ -3,14 +3,24 @@ from flask_restful import Resource
 from urllib.parse import unquote
 
 from app.routes.mra.view_models.rilevazione_view_model import RilevazioneViewModel
+from app.routes.mra.view_models.rilevazioni_colonnari_view_model import RilevazioniColonnariViewModel
+from app.routes.mra.utils.tabella_rilevazioni import valida_rilevazioni
+from app.routes.mra.utils.indice_riepilogo_atleti import IndiceRiepilogoAtleti
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.etag import calcola_etag_collezione, risposta_condizionale, risposta_non_modificata, memorizza_etag
+from utils.rest.proiezione import leggi_parametri_proiezione
+from utils.firebase.firebase_reference import TransazioneAnnullata
+
+LAYOUT_RIGHE = "rows"
+LAYOUT_COLONNARE = "columnar"
 
 # -----------------------------------------------------------------------------
 
 @log_restful_class_on_any_method_call(log_restful_method_call)
 class Rilevazioni(Resource):
     """
-    Gestisce la lettura (GET) della lista di rilevazioni per una sessione specifica.
+    Gestisce la lettura (GET) della lista di rilevazioni per una sessione specifica
+    e l'accodamento (POST) di nuove rilevazioni alla sessione.
     """
 
     #--------------------------------------------------------------------------
@@ -21,6 +31,10 @@ class Rilevazioni(Resource):
         tags:
           - MRA - Rilevazioni
         summary: Recupera la lista di tutte le rilevazioni per una sessione
+        description: >
+          Con "layout=columnar" le rilevazioni sono restituite in forma colonnare, come array paralleli
+          (un elemento per rilevazione) con un solo hash e i link della sessione: rappresentazione
+          più compatta, pensata per i client che tracciano grafici dei tempi di reazione.
         parameters:
           - name: id_atleta
             in: path
@@ -37,9 +51,47 @@ class Rilevazioni(Resource):
             type: string
             required: true
             example: "12-3-2025_13:40:49"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,tempo_risposta_ms"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
+          - name: layout
+            in: query
+            type: string
+            enum: [rows, columnar]
+            required: false
+            description: Rappresentazione per oggetti, una per rilevazione (default "rows"), oppure colonnare ("columnar")
+            example: "columnar"
         responses:
           200:
-            description: Lista di rilevazioni trovata e restituita
+            description: Lista di rilevazioni trovata e restituita (esempio con layout=columnar)
+            examples:
+              application/json:
+                numero_rilevazioni: 3
+                id: ["0", "1", "2"]
+                pulsante_proposto: [3, 1, 4]
+                pulsante_premuto: [3, 1, 2]
+                tempo_risposta_ms: [412, 387, 655]
+                _hash: "abc123hash"
+                _links:
+                  self: "/api/mra/v1.0.0/atleti/123/tipologie-esercizi-svolti/111/sessioni/12-3-2025_13:40:49/rilevazioni?layout=columnar"
+                  rilevazioni: "/api/mra/v1.0.0/atleti/123/tipologie-esercizi-svolti/111/sessioni/12-3-2025_13:40:49/rilevazioni"
+                  sessione: "/api/mra/v1.0.0/atleti/123/tipologie-esercizi-svolti/111/sessioni/12-3-2025_13:40:49"
+          304:
+            description: Contenuto non modificato (ETag della collezione invariato)
+          400:
+            description: Parametro "layout" non valido
+            examples:
+              application/json:
+                error: "Parametro 'layout' non valido: [xyz]"
           404:
             description: Nessuna rilevazione trovata
             examples:
@@ -53,16 +105,36 @@ class Rilevazioni(Resource):
                 comment: "Errore interno del server in Rilevazioni.get"
         """
         try:
+            layout = (request.args.get("layout") or LAYOUT_RIGHE).strip().lower()
+            if layout not in (LAYOUT_RIGHE, LAYOUT_COLONNARE):
+                return {"error": f"Parametro 'layout' non valido: [{layout}]"}, 400
+
             db = current_app.config['firebase'].get('db_app_1a')
 
             id_sessione = unquote(id_sessione_encoded)
 
             ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}/esercizi/{id_esercizio}/{id_sessione}")
-            rilevazioni_lista = ref.get()
+
+            # 304 senza leggere né rendere i dati, se la loro versione in cache non è cambiata
+            non_modificata = risposta_non_modificata(ref.versione())
+            if non_modificata is not None:
+                return non_modificata
+
+            rilevazioni_lista, versione = ref.get_con_versione()
 
             if not rilevazioni_lista or not isinstance(rilevazioni_lista, list):
                 return {"error": "Nessuna rilevazione trovata"}, 404
 
+            proiezione = leggi_parametri_proiezione(request.args)
+
+            if layout == LAYOUT_COLONNARE:
+                # Decodifica vettoriale di tutte le rilevazioni, un solo hash per l'intera sessione
+                vm = RilevazioniColonnariViewModel(id_atleta, id_esercizio, id_sessione, rilevazioni_lista)
+                colonne = vm.to_dict(proiezione)
+                etag = calcola_etag_collezione([colonne], proiezione.variante)
+                memorizza_etag(versione, etag)
+                return risposta_condizionale(colonne, etag)
+
             response = []
             for idx, valore in enumerate(rilevazioni_lista):
                 if valore is None:
@@ -70,10 +142,142 @@ class Rilevazioni(Resource):
                 vm = RilevazioneViewModel(
                     id_atleta, id_esercizio, id_sessione, str(idx), valore
                 )
-                response.append(vm.to_dict())
+                response.append(vm.to_dict(proiezione))
 
-            return response, 200
+            etag = calcola_etag_collezione(response, proiezione.variante)
+            memorizza_etag(versione, etag)
+            return risposta_condizionale(response, etag)
 
         except Exception as e:
             print(f"❌ Errore in Rilevazioni.get: {e}")
             return {"error": str(e), "comment": "Errore interno del server in Rilevazioni.get"}, 500
+
+    #--------------------------------------------------------------------------
+    def post(self, id_atleta, id_esercizio, id_sessione_encoded):
+        """
+        Accoda un blocco di rilevazioni ad una sessione esistente
+        ---
+        tags:
+          - MRA - Rilevazioni
+        summary: Aggiunge nuove rilevazioni ad una sessione
+        description: >
+          Le rilevazioni, in forma compatta "pulsante_proposto,pulsante_premuto,tempo_risposta_ms",
+          sono accodate a quelle esistenti con una transazione sul nodo della sessione, che assegna
+          gli indici successivi all'ultimo presente anche in caso di richieste concorrenti.
+          La transazione scarica e riscrive l'intera sessione (non i soli nuovi indici): il costo
+          di ogni richiesta cresce con il numero di rilevazioni già presenti.
+          Pensato per i dispositivi, che possono così inviare più rilevazioni in una sola richiesta.
+        consumes:
+          - application/json
+        parameters:
+          - name: id_atleta
+            in: path
+            type: string
+            required: true
+            example: "123"
+          - name: id_esercizio
+            in: path
+            type: string
+            required: true
+            example: "111"
+          - name: id_sessione_encoded
+            in: path
+            type: string
+            required: true
+            example: "12-3-2025_13:40:49"
+          - name: body
+            in: body
+            required: true
+            schema:
+              required: [rilevazioni]
+              properties:
+                rilevazioni:
+                  type: array
+                  items:
+                    type: string
+              example:
+                rilevazioni: ["3,3,412", "1,1,387"]
+        responses:
+          201:
+            description: Rilevazioni aggiunte alla sessione
+            examples:
+              application/json:
+                - id: "3"
+                  pulsante_proposto: 3
+                  pulsante_premuto: 3
+                  tempo_risposta_ms: 412
+                  _hash: "abc123hash"
+                  _links:
+                    self: "/api/mra/v1.0.0/atleti/123/tipologie-esercizi-svolti/111/sessioni/12-3-2025_13:40:49/rilevazioni/3"
+          400:
+            description: Rilevazioni mancanti o non nel formato "a,b,c"
+            examples:
+              application/json:
+                error: 'Rilevazione non valida in posizione 1: [3,x] (formato atteso "a,b,c")'
+          404:
+            description: Sessione non trovata
+            examples:
+              application/json:
+                error: "Sessione non trovata"
+          500:
+            description: Errore interno del server
+            examples:
+              application/json:
+                error: "<EXCEPTION>"
+                comment: "Errore interno del server in Rilevazioni.post"
+        """
+        try:
+            dati = request.get_json(silent=True)
+            try:
+                nuove_rilevazioni = valida_rilevazioni(dati.get("rilevazioni") if isinstance(dati, dict) else None)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            db = current_app.config['firebase'].get('db_app_1a')
+
+            id_sessione = unquote(id_sessione_encoded)
+
+            ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}/esercizi/{id_esercizio}/{id_sessione}")
+
+            accodamento = {}
+
+            def accoda(sessione_corrente):
+                # Sessione come lista (indici densi) o come dizionario (indici sparsi); riapplicata a ogni conflitto
+                if isinstance(sessione_corrente, list) and sessione_corrente:
+                    primo = len(sessione_corrente)
+                    nuova_sessione = sessione_corrente + nuove_rilevazioni
+                elif isinstance(sessione_corrente, dict) and sessione_corrente:
+                    primo = max((int(chiave) for chiave in sessione_corrente if chiave.isdigit()), default=-1) + 1
+                    nuova_sessione = dict(sessione_corrente, **{str(primo + i): valore for i, valore in enumerate(nuove_rilevazioni)})
+                else:
+                    raise TransazioneAnnullata()
+                # Conteggio con la stessa regola dell'indice di riepilogo (indici vuoti esclusi)
+                accodamento.update(primo_indice=primo, totale=IndiceRiepilogoAtleti.conta_rilevazioni(nuova_sessione))
+                return nuova_sessione
+
+            # Accodamento atomico: richieste concorrenti sulla stessa sessione sono serializzate dalla
+            # transazione, che riserva gli indici dopo l'ultimo esistente (nessuna sovrascrittura reciproca).
+            # ⚠️ La transazione scarica la sessione e la riscrive per intero (e la riscarica ad ogni conflitto),
+            # anziché scrivere i soli nuovi indici con un aggiornamento multi-path: le sessioni sono scritte
+            # come liste anche direttamente dai dispositivi, quindi un contatore di indici separato non
+            # sarebbe rispettato da tutti gli scrittori. Costo proporzionale alla dimensione della sessione.
+            try:
+                ref.transaction(accoda)
+            except TransazioneAnnullata:
+                return {"error": "Sessione non trovata"}, 404
+            primo_indice = accodamento["primo_indice"]
+
+            # Aggiornamento incrementale dell'indice di riepilogo (numero di rilevazioni della sessione)
+            current_app.config['indice_riepilogo_1a'].registra_sessione(
+                id_atleta, id_esercizio, id_sessione, accodamento["totale"]
+            )
+
+            response = [
+                RilevazioneViewModel(id_atleta, id_esercizio, id_sessione, str(primo_indice + i), valore).to_dict()
+                for i, valore in enumerate(nuove_rilevazioni)
+            ]
+            return response, 201
+
+        except Exception as e:
+            print(f"❌ Errore in Rilevazioni.post: {e}")
+            return {"error": str(e), "comment": "Errore interno del server in Rilevazioni.post"}, 500
@@ -1,10 +1,11 @@
-from flask import current_app
+from flask import request, current_app
 from flask_restful import Resource
 import inspect
 import urllib.parse
 
 from app.routes.mra.view_models.sessione_view_model import SessioneViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.proiezione import leggi_parametri_proiezione
 
 # -----------------------------------------------------------------------------
 
@@ -39,6 +40,18 @@ class Sessione(Resource):
             type: string
             description: Timestamp codificato della sessione
             example: "12-3-2025_13%3A40%3A49"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,numero_rilevazioni"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Sessione trovata con successo
@@ -73,7 +86,7 @@ class Sessione(Resource):
                 return {"error": "Sessione non trovata"}, 404
 
             vm = SessioneViewModel(id_atleta, id_esercizio, id_sessione, rilevazioni)
-            return vm.to_dict(), 200
+            return vm.to_dict(leggi_parametri_proiezione(request.args)), 200
 
         except Exception as e:
             error_location = f"{self.__class__.__name__}.{inspect.currentframe().f_code.co_name}"
@@ -1,16 +1,27 @@
-from flask import current_app
+from flask import request, current_app
 from flask_restful import Resource
 import inspect
+import re
 
 from app.routes.mra.view_models.sessione_view_model import SessioneViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.indice_temporale import leggi_intervallo_temporale, parse_id_timestamp
+from utils.firebase.firebase_reference import TransazioneAnnullata
+from app.routes.mra.utils.tabella_rilevazioni import valida_rilevazioni
+from utils.rest.etag import calcola_etag_collezione, risposta_condizionale, risposta_non_modificata, memorizza_etag
+from utils.rest.proiezione import leggi_parametri_proiezione
+from app.routes.mra.utils.espansione import RELAZIONI_SESSIONE, leggi_parametro_expand, variante_espansione, elementi_incorporati, incorpora_sessioni
+
+# Identificativo di sessione "giorno-mese-anno_ore:minuti:secondi" (campi non necessariamente zero-padded)
+FORMATO_ID_SESSIONE = re.compile(r"[0-9]{1,2}-[0-9]{1,2}-[0-9]{4}_[0-9]{1,2}:[0-9]{1,2}:[0-9]{1,2}")
 
 # -----------------------------------------------------------------------------
 
 @log_restful_class_on_any_method_call(log_restful_method_call)
 class Sessioni(Resource):
     """
-    Restituisce la lista delle sessioni per una tipologia di esercizio svolto da un atleta.
+    Restituisce la lista delle sessioni per una tipologia di esercizio svolto da un atleta
+    e permette di registrarne una nuova, con le relative rilevazioni.
     """
 
     #--------------------------------------------------------------------------
@@ -21,6 +32,11 @@ class Sessioni(Resource):
         tags:
           - MRA - Sessioni
         summary: Elenco sessioni svolte in una tipologia di esercizio
+        description: >
+          Ritorna le sessioni in ordine cronologico, eventualmente filtrate per intervallo temporale
+          (estremi inclusi) tramite i parametri "from" e "to".
+          Con "expand=rilevazioni" ogni sessione incorpora in "_embedded" le proprie rilevazioni,
+          ottenute con una sola lettura del database.
         parameters:
           - name: id_atleta
             in: path
@@ -32,6 +48,37 @@ class Sessioni(Resource):
             type: string
             required: true
             example: "111"
+          - name: from
+            in: query
+            type: string
+            required: false
+            description: Inizio intervallo (formato ID sessione, ISO-8601 o epoch)
+            example: "2025-03-10"
+          - name: to
+            in: query
+            type: string
+            required: false
+            description: Fine intervallo (formato ID sessione, ISO-8601 o epoch)
+            example: "12-3-2025_13:40:49"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,numero_rilevazioni"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
+          - name: expand
+            in: query
+            type: string
+            enum: [rilevazioni]
+            required: false
+            description: Relazioni da incorporare in "_embedded"
+            example: "rilevazioni"
         responses:
           200:
             description: Lista di sessioni trovata con successo
@@ -48,6 +95,13 @@ class Sessioni(Resource):
                     }
                   }
                 ]
+          304:
+            description: Contenuto non modificato (ETag della collezione invariato)
+          400:
+            description: Estremi dell'intervallo temporale o parametro "expand" non validi
+            examples:
+              application/json:
+                error: "Estremo temporale non valido: [abc]"
           404:
             description: Nessuna sessione trovata
             examples:
@@ -61,19 +115,34 @@ class Sessioni(Resource):
                 comment: "Errore interno del server in Sessioni.get"
         """
         try:
+            try:
+                da, a = leggi_intervallo_temporale(request.args)
+                espansione = leggi_parametro_expand(request.args, RELAZIONI_SESSIONE)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
             db = current_app.config['firebase'].get('db_app_1a')
-            ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}/esercizi/{id_esercizio}")
-            sessioni_dict = ref.get()
+            indice = current_app.config['indice_riepilogo_1a']
 
-            if not sessioni_dict:
+            if espansione:
+                return self._get_espansa(db, indice, id_atleta, id_esercizio, espansione, da, a)
+
+            # Lettura dall'indice di riepilogo: numero di rilevazioni per sessione precalcolato
+            # (o letto per il solo esercizio richiesto, se l'indice ne contiene le sole chiavi)
+            riepilogo = indice.get_riepilogo_esercizio_con_conteggi(db, id_atleta, id_esercizio)
+
+            if not riepilogo or not riepilogo["sessioni"]:
                 return {"error": "Nessuna sessione trovata"}, 404
 
+            # Sessioni in ordine cronologico, selezionate per intervallo con ricerca binaria sull'indice
+            proiezione = leggi_parametri_proiezione(request.args)
             response = []
-            for id_sessione, rilevazioni in sessioni_dict.items():
-                vm = SessioneViewModel(id_atleta, id_esercizio, id_sessione, rilevazioni)
-                response.append(vm.to_dict())
+            for id_sessione in riepilogo["indice_temporale"].intervallo(da, a):
+                numero_rilevazioni = riepilogo["sessioni"][id_sessione]
+                vm = SessioneViewModel(id_atleta, id_esercizio, id_sessione, numero_rilevazioni=numero_rilevazioni)
+                response.append(vm.to_dict(proiezione))
 
-            return response, 200
+            return risposta_condizionale(response, calcola_etag_collezione(response, proiezione.variante))
 
         except Exception as e:
             error_location = f"{self.__class__.__name__}.{inspect.currentframe().f_code.co_name}"
@@ -82,3 +151,148 @@ class Sessioni(Resource):
                 "error": str(e),
                 "comment": f"Errore interno del server in {error_location}"
             }, 500
+
+    #--------------------------------------------------------------------------
+    def post(self, id_atleta, id_esercizio):
+        """
+        Registra una nuova sessione con le relative rilevazioni
+        ---
+        tags:
+          - MRA - Sessioni
+        summary: Crea una sessione di una tipologia di esercizio svolto
+        description: >
+          Crea atomicamente la sessione indicata (solo se non esiste già) con tutte le sue rilevazioni,
+          in forma compatta "pulsante_proposto,pulsante_premuto,tempo_risposta_ms", in un'unica scrittura.
+          Ulteriori rilevazioni possono essere accodate con POST sulle rilevazioni della sessione.
+        consumes:
+          - application/json
+        parameters:
+          - name: id_atleta
+            in: path
+            type: string
+            required: true
+            example: "123"
+          - name: id_esercizio
+            in: path
+            type: string
+            required: true
+            example: "111"
+          - name: body
+            in: body
+            required: true
+            schema:
+              required: [id, rilevazioni]
+              properties:
+                id:
+                  type: string
+                  description: Identificativo della sessione ("giorno-mese-anno_ore:minuti:secondi", spazi esterni ignorati)
+                rilevazioni:
+                  type: array
+                  items:
+                    type: string
+              example:
+                id: "12-3-2025_13:40:49"
+                rilevazioni: ["3,3,412", "1,1,387", "4,2,655"]
+        responses:
+          201:
+            description: Sessione creata
+            examples:
+              application/json:
+                id: "12-3-2025_13:40:49"
+                numero_rilevazioni: 3
+                _hash: "abc123hash"
+                _links:
+                  self: "/api/mra/v1.0.0/atleti/123/tipologie-esercizi-svolti/111/sessioni/12-3-2025_13:40:49"
+                  rilevazioni: "/api/mra/v1.0.0/atleti/123/tipologie-esercizi-svolti/111/sessioni/12-3-2025_13:40:49/rilevazioni"
+          400:
+            description: Identificativo di sessione o rilevazioni non validi
+            examples:
+              application/json:
+                error: "Identificativo di sessione non valido: [abc]"
+          404:
+            description: Atleta non trovato
+            examples:
+              application/json:
+                error: "Atleta non trovato"
+          409:
+            description: Sessione già esistente
+            examples:
+              application/json:
+                error: "Sessione già presente"
+          500:
+            description: Errore interno del server
+            examples:
+              application/json:
+                error: "<EXCEPTION>"
+                comment: "Errore interno del server in Sessioni.post"
+        """
+        try:
+            dati = request.get_json(silent=True)
+            if not isinstance(dati, dict):
+                return {"error": "Dati mancanti nel payload"}, 400
+
+            # Identificativo canonico: spazi esterni rimossi e soli campi numerici ASCII (int() accetterebbe
+            # anche spazi interni, segni e "_"), così da non creare chiavi diverse per la stessa sessione
+            id_sessione = str(dati.get("id") or "").strip()
+            if not FORMATO_ID_SESSIONE.fullmatch(id_sessione) or parse_id_timestamp(id_sessione) is None:
+                return {"error": f"Identificativo di sessione non valido: [{id_sessione}]"}, 400
+            try:
+                rilevazioni = valida_rilevazioni(dati.get("rilevazioni"))
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
+            db = current_app.config['firebase'].get('db_app_1a')
+
+            # Verifica di esistenza dell'atleta con lettura shallow (solo le chiavi, non lo storico "esercizi")
+            ref_atleta = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}")
+            if not ref_atleta.get_shallow():
+                return {"error": "Atleta non trovato"}, 404
+
+            def crea_se_assente(sessione_corrente):
+                if sessione_corrente is not None:
+                    raise TransazioneAnnullata()
+                return rilevazioni
+
+            # Creazione atomica solo se la sessione non esiste già (nessuna lettura preventiva del nodo)
+            try:
+                ref_atleta.child(f"esercizi/{id_esercizio}/{id_sessione}").transaction(crea_se_assente)
+            except TransazioneAnnullata:
+                return {"error": "Sessione già presente"}, 409
+
+            # Aggiornamento incrementale dell'indice di riepilogo
+            current_app.config['indice_riepilogo_1a'].registra_sessione(id_atleta, id_esercizio, id_sessione, len(rilevazioni))
+
+            vm = SessioneViewModel(id_atleta, id_esercizio, id_sessione, numero_rilevazioni=len(rilevazioni))
+            return vm.to_dict(), 201
+
+        except Exception as e:
+            error_location = f"{self.__class__.__name__}.{inspect.currentframe().f_code.co_name}"
+            print(f"❌ Errore in {error_location}: {e}")
+            return {
+                "error": str(e),
+                "comment": f"Errore interno del server in {error_location}"
+            }, 500
+
+    #--------------------------------------------------------------------------
+    def _get_espansa(self, db, indice, id_atleta, id_esercizio, espansione, da, a):
+        # Una sola lettura dell'intero sottoalbero dell'esercizio, comprese le rilevazioni di tutte le sessioni
+        ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}/esercizi/{id_esercizio}")
+
+        # 304 senza leggere né rendere i dati, se la loro versione in cache non è cambiata
+        non_modificata = risposta_non_modificata(ref.versione())
+        if non_modificata is not None:
+            return non_modificata
+
+        sessioni, versione = ref.get_con_versione()
+
+        # Il riepilogo appena ricalcolato aggiorna anche l'indice (nessuna rilettura per le prossime richieste)
+        riepilogo = indice.registra_esercizio(id_atleta, id_esercizio, sessioni)
+        if not riepilogo or not riepilogo["sessioni"]:
+            return {"error": "Nessuna sessione trovata"}, 404
+
+        proiezione = leggi_parametri_proiezione(request.args)
+        response = incorpora_sessioni(id_atleta, id_esercizio, riepilogo, sessioni, espansione, proiezione, da, a)
+
+        etag = calcola_etag_collezione(elementi_incorporati(response), variante_espansione(proiezione, espansione))
+        memorizza_etag(versione, etag)
+        return risposta_condizionale(response, etag)
@@ -3,6 +3,8 @@ from flask_restful import Resource
 
 from app.routes.mra.view_models.tentativo_in_tipologia_esercizio_view_model import TentativoInTipologiaEsercizioViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.etag import calcola_etag_collezione, risposta_condizionale, risposta_non_modificata, memorizza_etag
+from utils.rest.proiezione import leggi_parametri_proiezione
 
 # -----------------------------------------------------------------------------
 
@@ -27,6 +29,18 @@ class TentativiInTipologiaEsercizio(Resource):
             type: string
             description: ID della tipologia di esercizio
             example: "111"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,pulsante-led"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Lista dei tentativi restituita con successo
@@ -53,6 +67,8 @@ class TentativiInTipologiaEsercizio(Resource):
                 count_totale_tentativi:
                   type: integer
                   example: 9
+          304:
+            description: Contenuto non modificato (ETag della collezione invariato)
           404:
             description: Tipologia non trovata o senza sequenza
             examples:
@@ -68,7 +84,13 @@ class TentativiInTipologiaEsercizio(Resource):
         try:
             db = current_app.config['firebase'].get('db_app_1a')
             ref = db.get_reference(f"/tempiDiReazione/tipoEsercizio/{id_tipologia}/sequenza")
-            sequenza_data = ref.get()
+
+            # 304 senza leggere né rendere i dati, se la loro versione in cache non è cambiata
+            non_modificata = risposta_non_modificata(ref.versione())
+            if non_modificata is not None:
+                return non_modificata
+
+            sequenza_data, versione = ref.get_con_versione()
 
             if not sequenza_data:
                 return {"error": "Tipologia non trovata"}, 404
@@ -81,6 +103,7 @@ class TentativiInTipologiaEsercizio(Resource):
             lista_tempo = [int(t) for t in sequenza_tempo.split(",") if t]
             lista_wait = [int(w) for w in sequenza_wait.split(",") if w]
 
+            proiezione = leggi_parametri_proiezione(request.args)
             sequenza_tentativi = []
             for i in range(len(lista_pulsanti)):
                 vm = TentativoInTipologiaEsercizioViewModel(
@@ -90,12 +113,14 @@ class TentativiInTipologiaEsercizio(Resource):
                     intertempo_wait=lista_wait[i] if i < len(lista_wait) else None,
                     id_tipologia=id_tipologia
                 )
-                sequenza_tentativi.append(vm.to_dict())
+                sequenza_tentativi.append(vm.to_dict(proiezione))
 
-            return {
+            etag = calcola_etag_collezione(sequenza_tentativi, proiezione.variante)
+            memorizza_etag(versione, etag)
+            return risposta_condizionale({
                 "sequenza_tentativi": sequenza_tentativi,
                 "count_totale_tentativi": len(sequenza_tentativi)
-            }, 200
+            }, etag)
 
         except Exception as e:
             print(f"\u274c Errore in TentativiInTipologiaEsercizio.get: {e}")
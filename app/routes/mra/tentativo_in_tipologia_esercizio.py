@@ -4,6 +4,7 @@ from urllib.parse import unquote
 
 from app.routes.mra.view_models.singolo_tentativo_in_tipologia_esercizio_view_model import SingoloTentativoInTipologiaEsercizioViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.proiezione import leggi_parametri_proiezione
 
 # -----------------------------------------------------------------------------
 
@@ -34,6 +35,18 @@ class TentativoInTipologiaEsercizio(Resource):
             type: integer
             description: Indice (0-based) del tentativo da recuperare
             example: 2
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,pulsante-led"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Dettaglio del tentativo trovato con successo
@@ -82,7 +95,7 @@ class TentativoInTipologiaEsercizio(Resource):
                 return {"error": "Tipologia o sequenza non trovata"}, 404
 
             vm = SingoloTentativoInTipologiaEsercizioViewModel(id_tipologia, id_tentativo, sequenza_data)
-            return vm.to_dict(), 200
+            return vm.to_dict(leggi_parametri_proiezione(request.args)), 200
 
         except Exception as e:
             print(f"\u274c Errore in TentativoInTipologiaEsercizio.get: {e}")
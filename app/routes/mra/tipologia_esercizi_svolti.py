@@ -1,9 +1,10 @@
-from flask import current_app
+from flask import request, current_app
 from flask_restful import Resource
 import inspect
 
 from app.routes.mra.view_models.tipologia_esercizi_svolti_view_model import TipologiaEserciziSvoltiViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.proiezione import leggi_parametri_proiezione
 
 # -----------------------------------------------------------------------------
 
@@ -34,6 +35,18 @@ class TipologiaEserciziSvolti(Resource):
             required: true
             description: ID della tipologia di esercizio svolto
             example: "111"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,numero_sessioni"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Tipologia trovata
@@ -62,14 +75,15 @@ class TipologiaEserciziSvolti(Resource):
         """
         try:
             db = current_app.config['firebase'].get('db_app_1a')
-            ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}/esercizi/{id_esercizio}")
-            sessioni_dict = ref.get()
+            indice = current_app.config['indice_riepilogo_1a']
+
+            riepilogo = indice.get_riepilogo_esercizio(db, id_atleta, id_esercizio)
 
-            if not sessioni_dict:
+            if not riepilogo or not riepilogo["sessioni"]:
                 return {"error": "Tipologia di esercizio svolto non trovata"}, 404
 
-            vm = TipologiaEserciziSvoltiViewModel(id_atleta, id_esercizio, sessioni_dict)
-            return vm.to_dict(), 200
+            vm = TipologiaEserciziSvoltiViewModel(id_atleta, id_esercizio, riepilogo=riepilogo)
+            return vm.to_dict(leggi_parametri_proiezione(request.args)), 200
 
         except Exception as e:
             error_location = f"{self.__class__.__name__}.{inspect.currentframe().f_code.co_name}"
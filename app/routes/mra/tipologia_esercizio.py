@@ -3,6 +3,7 @@ from flask_restful import Resource
 
 from app.routes.mra.view_models.tipologia_esercizio_view_model import TipologiaEsercizioViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.proiezione import leggi_parametri_proiezione
 
 # -----------------------------------------------------------------------------
 
@@ -27,6 +28,18 @@ class TipologiaEsercizio(Resource):
             type: string
             description: ID della tipologia di esercizio
             example: "111"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,nome"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Tipologia trovata con successo
@@ -75,7 +88,7 @@ class TipologiaEsercizio(Resource):
                 return {"error": "Tipologia non trovata"}, 404
 
             vm = TipologiaEsercizioViewModel(id_tipologia, tipologia_data)
-            return vm.to_dict(), 200
+            return vm.to_dict(leggi_parametri_proiezione(request.args)), 200
 
         except Exception as e:
             print(f"❌ Errore in TipologiaEsercizio.get: {e}")
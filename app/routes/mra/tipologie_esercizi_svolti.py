@@ -1,9 +1,12 @@
-from flask import current_app
+from flask import request, current_app
 from flask_restful import Resource
 import inspect
 
 from app.routes.mra.view_models.tipologia_esercizi_svolti_view_model import TipologiaEserciziSvoltiViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.etag import calcola_etag_collezione, risposta_condizionale, risposta_non_modificata, memorizza_etag
+from utils.rest.proiezione import leggi_parametri_proiezione
+from app.routes.mra.utils.espansione import RELAZIONI_TIPOLOGIA, leggi_parametro_expand, variante_espansione, elementi_incorporati, incorpora_tipologie
 
 # -----------------------------------------------------------------------------
 
@@ -21,6 +24,9 @@ class TipologieEserciziSvolti(Resource):
         tags:
           - MRA - Tipologie Esercizi Svolti
         summary: Ottiene tutte le tipologie di esercizi svolti da un atleta
+        description: >
+          Con il parametro "expand" ogni tipologia incorpora in "_embedded" le proprie sessioni
+          (ed eventualmente le relative rilevazioni), ottenute con una sola lettura del database.
         parameters:
           - name: id_atleta
             in: path
@@ -28,6 +34,25 @@ class TipologieEserciziSvolti(Resource):
             type: string
             description: L'ID univoco dell'atleta
             example: "123"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,numero_sessioni"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
+          - name: expand
+            in: query
+            type: string
+            enum: [sessioni, sessioni.rilevazioni]
+            required: false
+            description: Relazioni da incorporare in "_embedded" (catena separata da punto)
+            example: "sessioni"
         responses:
           200:
             description: Elenco delle tipologie recuperato con successo
@@ -51,6 +76,13 @@ class TipologieEserciziSvolti(Resource):
                       sessioni:
                         type: string
                         example: "/api/mra/v1.0.0/atleti/123/tipologie-esercizi-svolti/111/sessioni"
+          304:
+            description: Contenuto non modificato (ETag della collezione invariato)
+          400:
+            description: Parametro "expand" non valido
+            examples:
+              application/json:
+                error: "Parametro 'expand' non valido: [rilevazioni] (valori ammessi: sessioni, sessioni.rilevazioni)"
           404:
             description: Nessuna tipologia trovata per questo atleta
             examples:
@@ -64,19 +96,30 @@ class TipologieEserciziSvolti(Resource):
                 comment: "Errore interno del server in TipologieEserciziSvolti.get"
         """
         try:
+            try:
+                espansione = leggi_parametro_expand(request.args, RELAZIONI_TIPOLOGIA)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
             db = current_app.config['firebase'].get('db_app_1a')
-            ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}/esercizi")
-            esercizi_dict = ref.get()
+            indice = current_app.config['indice_riepilogo_1a']
+
+            if espansione:
+                return self._get_espansa(db, indice, id_atleta, espansione)
+
+            # Lettura dall'indice di riepilogo: nessun ricalcolo sulle sessioni ad ogni richiesta
+            riepilogo_atleta = indice.get_riepilogo_atleta(db, id_atleta)
 
-            if not esercizi_dict:
+            if not riepilogo_atleta:
                 return {"error": "Nessuna tipologia di esercizi trovata"}, 404
 
+            proiezione = leggi_parametri_proiezione(request.args)
             response = []
-            for id_esercizio, sessioni in esercizi_dict.items():
-                vm = TipologiaEserciziSvoltiViewModel(id_atleta, id_esercizio, sessioni)
-                response.append(vm.to_dict())
+            for id_esercizio, riepilogo in riepilogo_atleta.items():
+                vm = TipologiaEserciziSvoltiViewModel(id_atleta, id_esercizio, riepilogo=riepilogo)
+                response.append(vm.to_dict(proiezione))
 
-            return response, 200
+            return risposta_condizionale(response, calcola_etag_collezione(response, proiezione.variante))
 
         except Exception as e:
             error_location = f"{self.__class__.__name__}.{inspect.currentframe().f_code.co_name}"
@@ -85,3 +128,27 @@ class TipologieEserciziSvolti(Resource):
                 "error": str(e),
                 "comment": f"Errore interno del server in {error_location}"
             }, 500
+
+    #--------------------------------------------------------------------------
+    def _get_espansa(self, db, indice, id_atleta, espansione):
+        # Una sola lettura dell'intero sottoalbero "esercizi", da cui si costruiscono anche le relazioni incorporate
+        ref = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}/esercizi")
+
+        # 304 senza leggere né rendere i dati, se la loro versione in cache non è cambiata
+        non_modificata = risposta_non_modificata(ref.versione())
+        if non_modificata is not None:
+            return non_modificata
+
+        esercizi, versione = ref.get_con_versione()
+
+        # Il riepilogo appena ricalcolato aggiorna anche l'indice (nessuna rilettura per le prossime richieste)
+        riepilogo_atleta = indice.registra_atleta(id_atleta, esercizi)
+        if not riepilogo_atleta:
+            return {"error": "Nessuna tipologia di esercizi trovata"}, 404
+
+        proiezione = leggi_parametri_proiezione(request.args)
+        response = incorpora_tipologie(id_atleta, riepilogo_atleta, esercizi, espansione, proiezione)
+
+        etag = calcola_etag_collezione(elementi_incorporati(response), variante_espansione(proiezione, espansione))
+        memorizza_etag(versione, etag)
+        return risposta_condizionale(response, etag)
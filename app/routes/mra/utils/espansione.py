@@ -0,0 +1,98 @@
+from app.routes.mra.view_models.tipologia_esercizi_svolti_view_model import TipologiaEserciziSvoltiViewModel
+from app.routes.mra.view_models.sessione_view_model import SessioneViewModel
+from app.routes.mra.view_models.rilevazione_view_model import RilevazioneViewModel
+
+# Catena delle relazioni incorporabili, dall'atleta fino alle singole rilevazioni
+RELAZIONI_ATLETA = ("tipologie_esercizi_svolti", "sessioni", "rilevazioni")
+RELAZIONI_TIPOLOGIA = RELAZIONI_ATLETA[1:]
+RELAZIONI_SESSIONE = RELAZIONI_ATLETA[2:]
+
+#------------------------------------------------------------------------------
+
+def leggi_parametro_expand(args, relazioni: tuple) -> tuple:
+    """
+    Legge il parametro "expand" dalla query-string: catena di relazioni separate da punto
+    (es. "sessioni.rilevazioni"), da incorporare in "_embedded". Ritorna la tupla delle relazioni
+    (vuota se l'espansione non è richiesta).
+    Solleva ValueError se la catena non è un prefisso di quella ammessa per la risorsa.
+    """
+    expand_raw = (args.get("expand") or "").strip()
+    if not expand_raw:
+        return ()
+
+    livelli = tuple(nome.strip() for nome in expand_raw.split("."))
+    if livelli != relazioni[:len(livelli)]:
+        ammessi = ", ".join(".".join(relazioni[:i + 1]) for i in range(len(relazioni)))
+        raise ValueError(f"Parametro 'expand' non valido: [{expand_raw}] (valori ammessi: {ammessi})")
+    return livelli
+
+
+def variante_espansione(proiezione, livelli: tuple) -> str:
+    """
+    Variante della rappresentazione (proiezione ed espansione), per distinguerne gli ETag.
+    """
+    return ";".join(filter(None, [proiezione.variante, f"expand={'.'.join(livelli)}"]))
+
+
+def elementi_incorporati(dati) -> list:
+    """
+    Elenco piatto (in profondità) degli elementi e di tutti quelli incorporati in "_embedded",
+    per il calcolo dell'ETag con calcola_etag_collezione().
+    """
+    elementi = []
+    for elemento in (dati if isinstance(dati, list) else [dati]):
+        elementi.append(elemento)
+        for figli in elemento.get("_embedded", {}).values():
+            elementi.extend(elementi_incorporati(figli))
+    return elementi
+
+#------------------------------------------------------------------------------
+
+def _elementi(nodo):
+    if isinstance(nodo, dict):
+        return nodo.items()
+    if isinstance(nodo, list):
+        return ((str(indice), valore) for indice, valore in enumerate(nodo) if valore is not None)
+    return ()
+
+
+def incorpora_tipologie(id_atleta, riepilogo_atleta: dict, esercizi, livelli: tuple, proiezione) -> list:
+    """
+    Tipologie di esercizi svolti dall'atleta, con le eventuali relazioni sottostanti indicate
+    in "livelli" (es. ("sessioni", "rilevazioni")) costruite dal sottoalbero "esercizi" già letto.
+    """
+    esercizi = esercizi if isinstance(esercizi, dict) else {}
+    tipologie = []
+    for id_esercizio, riepilogo in riepilogo_atleta.items():
+        tipologia = TipologiaEserciziSvoltiViewModel(id_atleta, id_esercizio, riepilogo=riepilogo).to_dict(proiezione)
+        if livelli:
+            tipologia["_embedded"] = {
+                "sessioni": incorpora_sessioni(id_atleta, id_esercizio, riepilogo, esercizi.get(id_esercizio), livelli[1:], proiezione)
+            }
+        tipologie.append(tipologia)
+    return tipologie
+
+
+def incorpora_sessioni(id_atleta, id_esercizio, riepilogo: dict, sessioni, livelli: tuple, proiezione, da=None, a=None) -> list:
+    """
+    Sessioni dell'esercizio in ordine cronologico (eventualmente filtrate per intervallo),
+    con le relative rilevazioni se "livelli" le comprende.
+    """
+    sessioni = sessioni if isinstance(sessioni, dict) else {}
+    risultato = []
+    for id_sessione in riepilogo["indice_temporale"].intervallo(da, a):
+        vm = SessioneViewModel(id_atleta, id_esercizio, id_sessione, numero_rilevazioni=riepilogo["sessioni"][id_sessione])
+        sessione = vm.to_dict(proiezione)
+        if livelli:
+            sessione["_embedded"] = {
+                "rilevazioni": incorpora_rilevazioni(id_atleta, id_esercizio, id_sessione, sessioni.get(id_sessione), proiezione)
+            }
+        risultato.append(sessione)
+    return risultato
+
+
+def incorpora_rilevazioni(id_atleta, id_esercizio, id_sessione, rilevazioni, proiezione) -> list:
+    return [
+        RilevazioneViewModel(id_atleta, id_esercizio, id_sessione, idx, valore).to_dict(proiezione)
+        for idx, valore in _elementi(rilevazioni)
+    ]
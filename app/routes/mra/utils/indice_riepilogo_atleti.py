@@ -0,0 +1,186 @@
+import threading
+import time
+
+from utils.indice_temporale import IndiceTemporale
+
+class IndiceRiepilogoAtleti:
+    """
+    Indice di riepilogo per atleta e per tipologia di esercizio svolto (numero sessioni, prima ed ultima
+    sessione, numero di rilevazioni per sessione), mantenuto in memoria ed aggiornato in modo incrementale
+    dalle scritture effettuate tramite API o bulk-import. Gli atleti non ancora indicizzati (o scaduti
+    dopo il TTL) vengono ricostruiti con sole letture shallow del ramo "esercizi" (chiavi degli esercizi
+    e, in parallelo, delle relative sessioni), senza scaricare le rilevazioni; il numero di rilevazioni
+    per sessione (None finché non noto) è letto solo per l'esercizio di cui è richiesto l'elenco sessioni.
+
+    L'indice è locale al processo: con più worker (es. gunicorn) le scritture via API ricevute da un
+    altro worker, così come le scritture dirette dei dispositivi su Firebase, sono recepite solo alla
+    scadenza del TTL (INDICE_RIEPILOGO_TTL_SEC), che limita quindi la durata di elenchi non aggiornati.
+
+    Struttura di un riepilogo atleta:
+        { id_esercizio: { "sessioni": { id_sessione: numero_rilevazioni },
+                          "indice_temporale": IndiceTemporale (sessioni in ordine cronologico),
+                          "prima_sessione": ..., "ultima_sessione": ... } }
+    (numero_rilevazioni è None per le sessioni non ancora contate)
+    """
+
+    def __init__(self, ttl_sec: float = 300):
+        self._ttl_sec = float(ttl_sec)
+        self._atleti = {}  # id_atleta -> (scadenza, riepilogo_atleta)
+        self._lock = threading.Lock()
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def conta_rilevazioni(rilevazioni) -> int:
+        # Rilevazioni presenti in una sessione (esclusi gli indici vuoti delle sessioni in forma di lista)
+        if isinstance(rilevazioni, list):
+            return sum(1 for r in rilevazioni if r is not None)
+        if isinstance(rilevazioni, dict):
+            return len(rilevazioni)
+        return 0
+
+    @classmethod
+    def _riepilogo_esercizio(cls, sessioni: dict) -> dict:
+        return cls._riepilogo_da_conteggi({id_sessione: cls.conta_rilevazioni(r) for id_sessione, r in sessioni.items()})
+
+    @staticmethod
+    def _riepilogo_da_conteggi(conteggi: dict) -> dict:
+        indice_temporale = IndiceTemporale(conteggi.keys())
+        return {
+            "sessioni": conteggi,
+            "indice_temporale": indice_temporale,
+            "prima_sessione": indice_temporale.prima(),
+            "ultima_sessione": indice_temporale.ultima()
+        }
+
+    @classmethod
+    def _riepilogo_atleta(cls, esercizi) -> dict:
+        if not isinstance(esercizi, dict):
+            return {}
+        return {
+            str(id_esercizio): cls._riepilogo_esercizio(sessioni)
+            for id_esercizio, sessioni in esercizi.items() if isinstance(sessioni, dict)
+        }
+
+    #--------------------------------------------------------------------------
+    def get_riepilogo_atleta(self, db, id_atleta) -> dict:
+        """
+        Ritorna il riepilogo dell'atleta (dizionario vuoto se nessun esercizio svolto),
+        ricostruendolo da Firebase se assente o scaduto. Il valore ritornato è in sola lettura.
+        """
+        id_atleta = str(id_atleta)
+        with self._lock:
+            entry = self._atleti.get(id_atleta)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+        riepilogo = self._leggi_riepilogo_atleta(db, id_atleta)
+
+        with self._lock:
+            self._atleti[id_atleta] = (time.monotonic() + self._ttl_sec, riepilogo)
+        return riepilogo
+
+    def _leggi_riepilogo_atleta(self, db, id_atleta) -> dict:
+        # 1 + E letture shallow non in cache (quelle per esercizio in parallelo): chiavi delle sessioni,
+        # senza il numero di rilevazioni (letto solo su richiesta, vedi get_riepilogo_esercizio_con_conteggi)
+        ref_esercizi = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}/esercizi")
+        sessioni_per_esercizio = ref_esercizi.get_keys_with_child_keys(use_cache=False)
+        if not sessioni_per_esercizio:
+            return {}
+        return {
+            str(id_esercizio): self._riepilogo_da_conteggi(dict.fromkeys(id_sessioni))
+            for id_esercizio, id_sessioni in sessioni_per_esercizio.items() if id_sessioni
+        }
+
+    def get_riepilogo_esercizio(self, db, id_atleta, id_esercizio) -> dict:
+        return self.get_riepilogo_atleta(db, id_atleta).get(str(id_esercizio))
+
+    def get_riepilogo_esercizio_con_conteggi(self, db, id_atleta, id_esercizio) -> dict:
+        """
+        Come get_riepilogo_esercizio(), con il numero di rilevazioni di tutte le sessioni: se non ancora
+        noto viene letto per il solo esercizio richiesto (letture shallow parallele delle sue sessioni).
+        """
+        riepilogo = self.get_riepilogo_esercizio(db, id_atleta, id_esercizio)
+        if not riepilogo or None not in riepilogo["sessioni"].values():
+            return riepilogo
+
+        ref_esercizio = db.get_reference(f"/tempiDiReazione/utenti/{id_atleta}/esercizi/{id_esercizio}")
+        conteggi = ref_esercizio.get_keys_with_child_count(use_cache=False)
+        return self._aggiorna_esercizio(id_atleta, id_esercizio, self._riepilogo_da_conteggi(conteggi) if conteggi is not None else None)
+
+    #--------------------------------------------------------------------------
+    def registra_atleta(self, id_atleta, esercizi=None) -> dict:
+        """
+        Registra (o sostituisce) il riepilogo di un atleta a partire dai suoi esercizi, se noti.
+        Ritorna il riepilogo registrato.
+        """
+        riepilogo = self._riepilogo_atleta(esercizi)
+        with self._lock:
+            self._atleti[str(id_atleta)] = (time.monotonic() + self._ttl_sec, riepilogo)
+        return riepilogo
+
+    def registra_esercizio(self, id_atleta, id_esercizio, sessioni) -> dict:
+        """
+        Ricalcola il riepilogo di un esercizio dalle sue sessioni appena lette, aggiornando l'indice
+        se l'atleta è già indicizzato. Ritorna il riepilogo (None se nessuna sessione).
+        """
+        riepilogo = self._riepilogo_esercizio(sessioni) if isinstance(sessioni, dict) else None
+        return self._aggiorna_esercizio(id_atleta, id_esercizio, riepilogo)
+
+    def _aggiorna_esercizio(self, id_atleta, id_esercizio, riepilogo) -> dict:
+        with self._lock:
+            entry = self._atleti.get(str(id_atleta))
+            if entry is not None:
+                # Copy-on-write, come in registra_sessione()
+                riepilogo_atleta = dict(entry[1])
+                if riepilogo is None:
+                    riepilogo_atleta.pop(str(id_esercizio), None)
+                else:
+                    riepilogo_atleta[str(id_esercizio)] = riepilogo
+                self._atleti[str(id_atleta)] = (entry[0], riepilogo_atleta)
+        return riepilogo
+
+    def rimuovi_atleta(self, id_atleta):
+        with self._lock:
+            self._atleti.pop(str(id_atleta), None)
+
+    def registra_sessione(self, id_atleta, id_esercizio, id_sessione, numero_rilevazioni: int):
+        """
+        Aggiorna in modo incrementale il riepilogo con una sessione nuova o modificata
+        (solo se l'atleta è già indicizzato, altrimenti verrà ricostruito alla prima lettura).
+        """
+        with self._lock:
+            entry = self._atleti.get(str(id_atleta))
+            if entry is None:
+                return
+            # Copy-on-write: i riepiloghi già restituiti ai chiamanti restano invariati
+            riepilogo_atleta = dict(entry[1])
+            esercizio = riepilogo_atleta.get(str(id_esercizio)) or self._riepilogo_esercizio({})
+            esercizio = dict(esercizio, sessioni=dict(esercizio["sessioni"]), indice_temporale=esercizio["indice_temporale"].copia())
+            esercizio["sessioni"][id_sessione] = numero_rilevazioni
+
+            # Inserimento ordinato (ricerca binaria) nell'indice cronologico delle sessioni
+            esercizio["indice_temporale"].aggiungi(id_sessione)
+            esercizio["prima_sessione"] = esercizio["indice_temporale"].prima()
+            esercizio["ultima_sessione"] = esercizio["indice_temporale"].ultima()
+
+            riepilogo_atleta[str(id_esercizio)] = esercizio
+            self._atleti[str(id_atleta)] = (entry[0], riepilogo_atleta)
+
+    def ricostruisci_da_dump(self, dati_root: dict):
+        """
+        Ricostruisce l'intero indice da un dump completo del database (bulk-import).
+        """
+        utenti = ((dati_root or {}).get("tempiDiReazione") or {}).get("utenti") or {}
+        if isinstance(utenti, list):
+            utenti = {str(i): u for i, u in enumerate(utenti) if u is not None}
+        scadenza = time.monotonic() + self._ttl_sec
+        atleti = {
+            str(id_atleta): (scadenza, self._riepilogo_atleta(dati_atleta.get("esercizi")))
+            for id_atleta, dati_atleta in utenti.items() if isinstance(dati_atleta, dict)
+        }
+        with self._lock:
+            self._atleti = atleti
+
+    def svuota(self):
+        with self._lock:
+            self._atleti = {}
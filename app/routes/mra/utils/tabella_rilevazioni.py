@@ -0,0 +1,140 @@
+from collections import OrderedDict
+
+from utils.config import config, env
+from utils.firebase.firebase_export import genera_record
+
+try:
+    import numpy as np  # opzionale: decodifica vettoriale delle rilevazioni
+except ImportError:
+    np = None
+
+COLONNE_RILEVAZIONI = ("atleta", "esercizio", "sessione", "idx", "pulsante_proposto", "pulsante_premuto", "tempo_risposta_ms")
+
+PATH_UTENTI = "/tempiDiReazione/utenti"
+
+MAX_RILEVAZIONI_PER_RICHIESTA = int(config[env].RILEVAZIONI_MAX_PER_RICHIESTA)
+
+#------------------------------------------------------------------------------
+
+def _elementi(nodo):
+    """
+    Coppie (chiave, valore) di un nodo Firebase restituito come oggetto o come array.
+    """
+    if isinstance(nodo, dict):
+        return nodo.items()
+    if isinstance(nodo, list):
+        return ((str(indice), valore) for indice, valore in enumerate(nodo) if valore is not None)
+    return ()
+
+
+def _decodifica_valore(valore) -> tuple:
+    """
+    Decodifica una rilevazione "pulsante_proposto,pulsante_premuto,tempo_risposta_ms"
+    (valori a None se non interpretabile, come in RilevazioneViewModel).
+    """
+    try:
+        parti = valore.split(",")
+        if len(parti) == 3:
+            return int(parti[0]), int(parti[1]), int(parti[2])
+    except Exception:
+        pass
+    return None, None, None
+
+
+def _decodifica_vettoriale(valori: list) -> tuple:
+    # Allineamento garantito solo se ogni rilevazione ha esattamente tre componenti
+    if any(valore.count(",") != 2 for valore in valori):
+        raise ValueError("Rilevazione non interpretabile")
+    testo = ",".join(valori)
+    if np is not None:
+        numeri = np.fromstring(testo, dtype=np.int64, sep=",")
+        if len(numeri) != 3 * len(valori):
+            raise ValueError("Rilevazione non interpretabile")
+        return tuple(numeri.reshape(-1, 3).T.tolist())
+    numeri = list(map(int, testo.split(",")))
+    return numeri[0::3], numeri[1::3], numeri[2::3]
+
+
+def decodifica_rilevazioni(valori: list) -> tuple:
+    """
+    Decodifica in un'unica passata vettoriale (numpy, se installato) una lista di rilevazioni
+    "pulsante_proposto,pulsante_premuto,tempo_risposta_ms" nelle tre colonne corrispondenti.
+    Se qualche rilevazione non è interpretabile si ripiega sulla decodifica elemento per elemento
+    (valori a None, come in RilevazioneViewModel).
+    """
+    if not valori:
+        return [], [], []
+    try:
+        return _decodifica_vettoriale(valori)
+    except (AttributeError, TypeError, ValueError):
+        return tuple(list(colonna) for colonna in zip(*map(_decodifica_valore, valori)))
+
+
+def valida_rilevazioni(valori) -> list:
+    """
+    Valida un blocco di rilevazioni in forma compatta "pulsante_proposto,pulsante_premuto,tempo_risposta_ms"
+    (tre interi, come decodificati da RilevazioneViewModel), ritornandole normalizzate.
+    Solleva ValueError se l'elenco è vuoto, supera RILEVAZIONI_MAX_PER_RICHIESTA
+    o contiene una rilevazione non valida.
+    """
+    if not isinstance(valori, list) or not valori:
+        raise ValueError("Elenco di rilevazioni mancante o vuoto")
+    if len(valori) > MAX_RILEVAZIONI_PER_RICHIESTA:
+        raise ValueError(f"Troppe rilevazioni nella richiesta: {len(valori)} (massimo {MAX_RILEVAZIONI_PER_RICHIESTA})")
+
+    normalizzate = []
+    for idx, valore in enumerate(valori):
+        parti = valore.split(",") if isinstance(valore, str) else []
+        try:
+            if len(parti) != 3:
+                raise ValueError()
+            normalizzate.append(",".join(str(int(parte)) for parte in parti))
+        except ValueError:
+            raise ValueError(f"Rilevazione non valida in posizione {idx}: [{valore}] (formato atteso \"a,b,c\")")
+    return normalizzate
+
+
+def colonne_rilevazioni(ref_utenti) -> dict:
+    """
+    Appiattisce tutte le rilevazioni di tutti gli atleti in una tabella colonnare
+    (una lista per ciascuna colonna di COLONNE_RILEVAZIONI), leggendo gli atleti in parallelo.
+    Le chiavi non numeriche sotto una sessione (non indici di rilevazione) sono ignorate.
+    """
+    colonne = {nome: [] for nome in COLONNE_RILEVAZIONI}
+    for path, dati_atleta in genera_record(ref_utenti, 1, path=PATH_UTENTI):
+        id_atleta = path.rsplit("/", 1)[-1]
+        esercizi = dati_atleta.get("esercizi") if isinstance(dati_atleta, dict) else None
+        for id_esercizio, sessioni in _elementi(esercizi):
+            for id_sessione, rilevazioni in _elementi(sessioni):
+                elementi = [(idx, valore) for idx, valore in _elementi(rilevazioni) if str(idx).isdecimal()]
+                pulsante_proposto, pulsante_premuto, tempo_risposta_ms = decodifica_rilevazioni([valore for _, valore in elementi])
+                colonne["atleta"].extend([id_atleta] * len(elementi))
+                colonne["esercizio"].extend([str(id_esercizio)] * len(elementi))
+                colonne["sessione"].extend([id_sessione] * len(elementi))
+                colonne["idx"].extend(int(idx) for idx, _ in elementi)
+                colonne["pulsante_proposto"].extend(pulsante_proposto)
+                colonne["pulsante_premuto"].extend(pulsante_premuto)
+                colonne["tempo_risposta_ms"].extend(tempo_risposta_ms)
+    return colonne
+
+
+def record_da_colonne_rilevazioni(colonne: dict):
+    """
+    Ricostruisce dalle colonne i record di import (path della sessione, rilevazioni codificate),
+    nel formato atteso da importa_a_blocchi(). Le righe non complete sono ignorate.
+    Solleva ValueError se mancano colonne.
+    """
+    mancanti = [nome for nome in COLONNE_RILEVAZIONI if nome not in colonne]
+    if mancanti:
+        raise ValueError(f"Colonne mancanti nella tabella delle rilevazioni: {', '.join(mancanti)}")
+
+    sessioni = OrderedDict()
+    for riga in zip(*(colonne[nome] for nome in COLONNE_RILEVAZIONI)):
+        if any(valore is None for valore in riga):
+            continue
+        id_atleta, id_esercizio, id_sessione, idx, pulsante_proposto, pulsante_premuto, tempo_risposta_ms = riga
+        path = f"{PATH_UTENTI}/{id_atleta}/esercizi/{id_esercizio}/{id_sessione}"
+        sessioni.setdefault(path, {})[str(idx)] = f"{pulsante_proposto},{pulsante_premuto},{tempo_risposta_ms}"
+
+    for path, rilevazioni in sessioni.items():
+        yield path, rilevazioni, sum(len(k) + len(v) + 6 for k, v in rilevazioni.items())
@@ -1,5 +1,5 @@
-import hashlib
-import json
+from utils.hashing import HashCampi
+from utils.rest.proiezione import PROIEZIONE_COMPLETA
 
 class AtletaViewModel:
 
@@ -7,6 +7,9 @@ class AtletaViewModel:
     Trasforma i dati grezzi di un atleta in un formato REST-API pronto (con HATEOAS e hash).
     """
 
+    # Solo i campi "core" (non _hash, non _links HATEOAS)
+    _hash_campi = HashCampi("id", "nickname", "genere", "data-inserimento")
+
     #--------------------------------------------------------------------------
     def __init__(self, id_entity, dati_raw):
         self.id = id_entity
@@ -15,35 +18,33 @@ class AtletaViewModel:
         self.data_inserimento = dati_raw.get("data")
 
     #--------------------------------------------------------------------------
-    def to_dict(self):
-        # Costruzione del dizionario base
-        entity_dict = {
+    def to_dict(self, proiezione=PROIEZIONE_COMPLETA):
+        # Costruzione del dizionario base (limitato ai campi richiesti)
+        entity_dict = proiezione.applica({
             "id": self.id,
             "nickname": self.nickname,
             "genere": self.genere,
             "data-inserimento": self.data_inserimento
-        }
+        })
 
         # Aggiunta dell'hash calcolato
-        entity_dict["_hash"] = self._calcola_hash(entity_dict)
+        if proiezione.includi("_hash"):
+            entity_dict["_hash"] = self._calcola_hash()
 
         # Aggiunta dei link HATEOAS
-        entity_dict["_links"] = {
-            "self": f"/api/mra/v1.0.0/atleti/{self.id}",
-            "tipologie_esercizi_svolti": f"/api/mra/v1.0.0/atleti/{self.id}/tipologie-esercizi-svolti"
-        }
+        if proiezione.includi("_links"):
+            entity_dict["_links"] = {
+                "self": f"/api/mra/v1.0.0/atleti/{self.id}",
+                "tipologie_esercizi_svolti": f"/api/mra/v1.0.0/atleti/{self.id}/tipologie-esercizi-svolti"
+            }
 
         return entity_dict
 
     #--------------------------------------------------------------------------
-    def _calcola_hash(self, entity_dict):
+    def _calcola_hash(self):
         """
-        Calcola un hash SHA256 del solo subset rilevante (esclusi _links HATEOAS ed _hash).
+        Calcola l'hash del solo subset rilevante (esclusi _links HATEOAS ed _hash).
         """
-        # Usa solo i campi "core" (non _hash, non _links HATEOAS)
-        chiavi_rilevanti = ["id", "nickname", "genere", "data-inserimento"]
-        dati = {k: entity_dict[k] for k in chiavi_rilevanti if k in entity_dict}
-        json_ordinato = json.dumps(dati, sort_keys=True)
-        return hashlib.sha256(json_ordinato.encode("utf-8")).hexdigest()
+        return self._hash_campi(self.id, self.nickname, self.genere, self.data_inserimento)
 
 #==============================================================================
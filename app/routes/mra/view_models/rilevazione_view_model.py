@@ -1,5 +1,5 @@
-import hashlib
-import json
+from utils.hashing import HashCampi
+from utils.rest.proiezione import PROIEZIONE_COMPLETA
 
 class RilevazioneViewModel:
     """
@@ -7,6 +7,8 @@ class RilevazioneViewModel:
     Include hash, HATEOAS e semantica separata per le 3 componenti di "valore".
     """
 
+    _hash_campi = HashCampi("id", "pulsante_proposto", "pulsante_premuto", "tempo_risposta_ms")
+
     def __init__(self, id_atleta, id_esercizio, id_sessione, id_rilevazione, valore_raw):
         self.id_atleta = id_atleta
         self.id_esercizio = id_esercizio
@@ -19,21 +21,23 @@ class RilevazioneViewModel:
 
         self._decodifica_valore(valore_raw)
 
-    def to_dict(self):
-        data = {
+    def to_dict(self, proiezione=PROIEZIONE_COMPLETA):
+        data = proiezione.applica({
             "id": self.id_rilevazione,
             "pulsante_proposto": self.pulsante_proposto,
             "pulsante_premuto": self.pulsante_premuto,
             "tempo_risposta_ms": self.tempo_risposta_ms
-        }
-
-        data["_hash"] = self._calcola_hash(data)
-        data["_links"] = {
-            "self": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni/{self.id_sessione}/rilevazioni/{self.id_rilevazione}",
-            "sessione": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni/{self.id_sessione}",
-            "tipologia_esercizi_svolti": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}",
-            "atleta": f"/api/mra/v1.0.0/atleti/{self.id_atleta}"
-        }
+        })
+
+        if proiezione.includi("_hash"):
+            data["_hash"] = self._calcola_hash()
+        if proiezione.includi("_links"):
+            data["_links"] = {
+                "self": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni/{self.id_sessione}/rilevazioni/{self.id_rilevazione}",
+                "sessione": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni/{self.id_sessione}",
+                "tipologia_esercizi_svolti": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}",
+                "atleta": f"/api/mra/v1.0.0/atleti/{self.id_atleta}"
+            }
 
         return data
 
@@ -47,8 +51,5 @@ class RilevazioneViewModel:
         except Exception:
             pass  # In caso di errore lasceremo i valori a None
 
-    def _calcola_hash(self, data_dict):
-        chiavi = ["id", "pulsante_proposto", "pulsante_premuto", "tempo_risposta_ms"]
-        dati_rilevanti = {k: data_dict[k] for k in chiavi if k in data_dict}
-        json_ordinato = json.dumps(dati_rilevanti, sort_keys=True)
-        return hashlib.sha256(json_ordinato.encode("utf-8")).hexdigest()
+    def _calcola_hash(self):
+        return self._hash_campi(self.id_rilevazione, self.pulsante_proposto, self.pulsante_premuto, self.tempo_risposta_ms)
@@ -0,0 +1,45 @@
+from utils.hashing import HashCampi
+from utils.rest.proiezione import PROIEZIONE_COMPLETA
+from app.routes.mra.utils.tabella_rilevazioni import decodifica_rilevazioni
+
+class RilevazioniColonnariViewModel:
+    """
+    ViewModel per rappresentare tutte le rilevazioni di una sessione in forma colonnare
+    (array paralleli, un elemento per rilevazione), decodificate in un'unica passata vettoriale.
+    Include un solo hash e i link HATEOAS della sessione, anziché uno per rilevazione.
+    """
+
+    _hash_campi = HashCampi("id", "pulsante_proposto", "pulsante_premuto", "tempo_risposta_ms")
+
+    def __init__(self, id_atleta, id_esercizio, id_sessione, rilevazioni_raw):
+        self.id_atleta = id_atleta
+        self.id_esercizio = id_esercizio
+        self.id_sessione = id_sessione
+
+        presenti = [(str(idx), valore) for idx, valore in enumerate(rilevazioni_raw) if valore is not None]
+        self.id_rilevazioni = [idx for idx, _ in presenti]
+        self.pulsante_proposto, self.pulsante_premuto, self.tempo_risposta_ms = decodifica_rilevazioni([valore for _, valore in presenti])
+
+    def to_dict(self, proiezione=PROIEZIONE_COMPLETA):
+        data = proiezione.applica({
+            "numero_rilevazioni": len(self.id_rilevazioni),
+            "id": self.id_rilevazioni,
+            "pulsante_proposto": self.pulsante_proposto,
+            "pulsante_premuto": self.pulsante_premuto,
+            "tempo_risposta_ms": self.tempo_risposta_ms
+        })
+
+        if proiezione.includi("_hash"):
+            data["_hash"] = self._calcola_hash()
+        if proiezione.includi("_links"):
+            base_url = f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni/{self.id_sessione}"
+            data["_links"] = {
+                "self": f"{base_url}/rilevazioni?layout=columnar",
+                "rilevazioni": f"{base_url}/rilevazioni",
+                "sessione": base_url
+            }
+
+        return data
+
+    def _calcola_hash(self):
+        return self._hash_campi(self.id_rilevazioni, self.pulsante_proposto, self.pulsante_premuto, self.tempo_risposta_ms)
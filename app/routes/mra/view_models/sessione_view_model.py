@@ -1,5 +1,5 @@
-import hashlib
-import json
+from utils.hashing import HashCampi
+from utils.rest.proiezione import PROIEZIONE_COMPLETA
 
 class SessioneViewModel:
     """
@@ -7,29 +7,32 @@ class SessioneViewModel:
     Include hash e link HATEOAS.
     """
 
-    def __init__(self, id_atleta, id_esercizio, id_sessione, rilevazioni=None):
+    _hash_campi = HashCampi("id", "numero_rilevazioni")
+
+    def __init__(self, id_atleta, id_esercizio, id_sessione, rilevazioni=None, numero_rilevazioni=None):
         self.id_atleta = id_atleta
         self.id_esercizio = id_esercizio
         self.id_sessione = id_sessione
         self.rilevazioni = rilevazioni or []
+        # Conteggio già noto (es. da lettura shallow), senza materializzare le rilevazioni:
+        self.numero_rilevazioni = numero_rilevazioni if numero_rilevazioni is not None else len(self.rilevazioni)
 
-    def to_dict(self):
-        base_dict = {
+    def to_dict(self, proiezione=PROIEZIONE_COMPLETA):
+        base_dict = proiezione.applica({
             "id": self.id_sessione,
-            "numero_rilevazioni": len(self.rilevazioni)
-        }
+            "numero_rilevazioni": self.numero_rilevazioni
+        })
 
-        base_dict["_hash"] = self._calcola_hash(base_dict)
+        if proiezione.includi("_hash"):
+            base_dict["_hash"] = self._calcola_hash()
 
-        base_dict["_links"] = {
-            "self": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni/{self.id_sessione}",
-            "rilevazioni": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni/{self.id_sessione}/rilevazioni"
-        }
+        if proiezione.includi("_links"):
+            base_dict["_links"] = {
+                "self": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni/{self.id_sessione}",
+                "rilevazioni": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni/{self.id_sessione}/rilevazioni"
+            }
 
         return base_dict
 
-    def _calcola_hash(self, entity_dict):
-        chiavi = ["id", "numero_rilevazioni"]
-        dati = {k: entity_dict[k] for k in chiavi if k in entity_dict}
-        json_ordinato = json.dumps(dati, sort_keys=True)
-        return hashlib.sha256(json_ordinato.encode("utf-8")).hexdigest()
+    def _calcola_hash(self):
+        return self._hash_campi(self.id_sessione, self.numero_rilevazioni)
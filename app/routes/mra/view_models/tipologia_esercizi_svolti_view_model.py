@@ -1,5 +1,6 @@
-import hashlib
-import json
+from utils.hashing import HashCampi
+from utils.indice_temporale import IndiceTemporale
+from utils.rest.proiezione import PROIEZIONE_COMPLETA
 
 class TipologiaEserciziSvoltiViewModel:
     """
@@ -7,45 +8,58 @@ class TipologiaEserciziSvoltiViewModel:
     Include metadati, hash e link HATEOAS.
     """
 
-    def __init__(self, id_atleta, id_esercizio, sessioni_dict=None):
+    _hash_campi = HashCampi("id", "numero_sessioni", "intervallo_date_sessioni")
+
+    def __init__(self, id_atleta, id_esercizio, sessioni_dict=None, riepilogo=None):
         self.id_atleta = id_atleta
         self.id_esercizio = id_esercizio
         self.sessioni_dict = sessioni_dict or {}
+        # Riepilogo precalcolato (vedi IndiceRiepilogoAtleti), alternativo a sessioni_dict:
+        self.riepilogo = riepilogo
 
-    def to_dict(self):
-        sessioni_keys = list(self.sessioni_dict.keys()) if isinstance(self.sessioni_dict, dict) else []
-        numero_sessioni = len(sessioni_keys)
-        range_date = self._calcola_range_date(sessioni_keys)
+    def to_dict(self, proiezione=PROIEZIONE_COMPLETA):
+        if self.riepilogo is not None:
+            numero_sessioni = len(self.riepilogo["sessioni"])
+            range_date = self._range_date_da_riepilogo(self.riepilogo)
+        else:
+            sessioni_keys = list(self.sessioni_dict.keys()) if isinstance(self.sessioni_dict, dict) else []
+            numero_sessioni = len(sessioni_keys)
+            range_date = self._calcola_range_date(sessioni_keys)
 
-        base_dict = {
+        base_dict = proiezione.applica({
             "id": self.id_esercizio,
             "numero_sessioni": numero_sessioni,
             "intervallo_date_sessioni": range_date
-        }
+        })
 
-        base_dict["_hash"] = self._calcola_hash(base_dict)
+        if proiezione.includi("_hash"):
+            base_dict["_hash"] = self._hash_campi(self.id_esercizio, numero_sessioni, range_date)
 
-        base_dict["_links"] = {
-            "self": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}",
-            "sessioni": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni"
-        }
+        if proiezione.includi("_links"):
+            base_dict["_links"] = {
+                "self": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}",
+                "sessioni": f"/api/mra/v1.0.0/atleti/{self.id_atleta}/tipologie-esercizi-svolti/{self.id_esercizio}/sessioni"
+            }
 
         return base_dict
 
-    def _calcola_hash(self, entity_dict):
-        chiavi = ["id", "numero_sessioni", "intervallo_date_sessioni"]
-        dati_rilevanti = {k: entity_dict[k] for k in chiavi if k in entity_dict}
-        json_ordinato = json.dumps(dati_rilevanti, sort_keys=True)
-        return hashlib.sha256(json_ordinato.encode("utf-8")).hexdigest()
+    def _range_date_da_riepilogo(self, riepilogo):
+        if riepilogo.get("prima_sessione") is None:
+            return None
+        return {
+            "prima_sessione": riepilogo["prima_sessione"],
+            "ultima_sessione": riepilogo["ultima_sessione"]
+        }
 
     def _calcola_range_date(self, sessioni_keys):
         try:
-            timestamps = sorted(sessioni_keys)
-            if len(timestamps) == 0:
+            # Ordinamento cronologico (gli ID sessione sono day-first e non zero-padded)
+            indice_temporale = IndiceTemporale(sessioni_keys)
+            if len(indice_temporale) == 0:
                 return None
             return {
-                "prima_sessione": timestamps[0],
-                "ultima_sessione": timestamps[-1]
+                "prima_sessione": indice_temporale.prima(),
+                "ultima_sessione": indice_temporale.ultima()
             }
         except Exception:
             return None
@@ -1,5 +1,5 @@
-import hashlib
-import json
+from utils.hashing import HashCampi
+from utils.rest.proiezione import PROIEZIONE_COMPLETA
 
 class TipologiaEsercizioViewModel:
     """
@@ -7,6 +7,8 @@ class TipologiaEsercizioViewModel:
     Trasforma i dati grezzi in formato RESTful con HATEOAS e hash.
     """
 
+    _hash_campi = HashCampi("id", "nome", "numero_tentativi")
+
     def __init__(self, id_tipologia, dati_raw):
         self.id = str(id_tipologia)
         self.nome = dati_raw.get("nomeEsercizio")
@@ -14,23 +16,23 @@ class TipologiaEsercizioViewModel:
         sequenza = dati_raw.get("sequenza", {})
         self.numero_tentativi = int(sequenza.get("totalePulsanti", 0))
 
-    def to_dict(self):
-        base_dict = {
+    def to_dict(self, proiezione=PROIEZIONE_COMPLETA):
+        base_dict = proiezione.applica({
             "id": self.id,
             "nome": self.nome,
             "numero_tentativi": self.numero_tentativi
-        }
+        })
 
-        base_dict["_hash"] = self._calcola_hash(base_dict)
+        if proiezione.includi("_hash"):
+            base_dict["_hash"] = self._calcola_hash()
 
-        base_dict["_links"] = {
-            "self": f"/api/mra/v1.0.0/catalogo-tipologie-esercizi/{self.id}",
-            "tentativi": f"/api/mra/v1.0.0/catalogo-tipologie-esercizi/{self.id}/tentativi"
-        }
+        if proiezione.includi("_links"):
+            base_dict["_links"] = {
+                "self": f"/api/mra/v1.0.0/catalogo-tipologie-esercizi/{self.id}",
+                "tentativi": f"/api/mra/v1.0.0/catalogo-tipologie-esercizi/{self.id}/tentativi"
+            }
 
         return base_dict
 
-    def _calcola_hash(self, base_dict):
-        core_fields = {k: base_dict[k] for k in ["id", "nome", "numero_tentativi"]}
-        json_ordinato = json.dumps(core_fields, sort_keys=True)
-        return hashlib.sha256(json_ordinato.encode("utf-8")).hexdigest()
+    def _calcola_hash(self):
+        return self._hash_campi(self.id, self.nome, self.numero_tentativi)
@@ -2,8 +2,15 @@ from flask import Flask, request, jsonify, current_app
 from flask_restful import Api, Resource
 
 import inspect
+import io
 
 from utils.config import config, env
+from utils.firebase.firebase_export import formato_export_streaming, risposta_export_streaming, leggi_albero, MIMETYPE_NDJSON, PROFONDITA_RECORD_1H
+from utils.firebase.firebase_import import leggi_record_ndjson, record_da_documento, importa_a_blocchi, risposta_import_a_blocchi
+from utils.firebase.firebase_formati import (
+    formato_export, formato_import, formato_disponibile, risposta_export_documento, decodifica_documento, DocumentoTroppoGrande,
+    FORMATI_DOCUMENTO, FORMATO_NDJSON
+)
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
 
 # -----------------------------------------------------------------------------
@@ -23,6 +30,29 @@ class BulkImportExport1H(Resource):
         summary: Ottiene (esporta) in bulk-downloading il documento JSON per tutto l'intero database, rilevando tutti i livelli di profondità presenti.
         description: >
           Ritorna (esporta) in bulk-downloading il documento JSON per tutto l'intero database, rilevandone tutti i livelli di profondità presenti.
+          I record (es. singoli atleti o treni) sono letti in parallelo, dopo averne scoperto la struttura con letture shallow.
+          Con stream=true il documento è generato a frammenti (chunked), senza caricare in memoria l'intero database;
+          con format=ndjson (o Accept application/x-ndjson) è emessa una riga {"path", "value"} per ciascun record.
+          Altri formati (parametro format o header Accept): json.gz e json.zst (JSON compresso, in streaming), msgpack.
+          I formati json.zst e msgpack richiedono le relative dipendenze opzionali.
+        parameters:
+          - name: stream
+            in: query
+            type: boolean
+            required: false
+            description: Export JSON in streaming, senza caricare in memoria l'intero database
+          - name: format
+            in: query
+            type: string
+            enum: [json, ndjson, json.gz, json.zst, msgpack]
+            required: false
+            description: Formato di export; "ndjson" implica lo streaming
+        produces:
+          - application/json
+          - application/x-ndjson
+          - application/gzip
+          - application/zstd
+          - application/msgpack
         responses:
           200:
             description: Root node del database esportato con successo in modalità bulk-downloading
@@ -33,6 +63,8 @@ class BulkImportExport1H(Resource):
                 {
                   "error": "Nessun dato disponibile nel database da esportare"
                 }
+          406:
+            description: Formato di export non supportato o dipendenza opzionale non installata
           500:
             description: Errore interno del server
             examples:
@@ -48,7 +80,24 @@ class BulkImportExport1H(Resource):
 
             db = current_app.config['firebase'].get('db_app_1h')
             ref = db.get_reference("/") # <- export completo da root '/' (database bulk downloading)
-            get_reply = ref.get()
+
+            formato = formato_export(request)
+            if formato is not None:
+                if formato not in FORMATI_DOCUMENTO or not formato_disponibile(formato):
+                    return {"error": f"Formato di export [{formato}] non supportato o non disponibile"}, 406
+                if not ref.get_shallow(use_cache=False):
+                    return {"error": "Nessun dato disponibile nel database da esportare"}, 404
+                return risposta_export_documento(ref, formato, PROFONDITA_RECORD_1H, nome_file="export-1h", error_location="BulkImportExport1H.get")
+
+            formato_streaming = formato_export_streaming(request)
+            if formato_streaming is not None:
+                # Verifica di database non vuoto con la sola lettura shallow della root
+                if not ref.get_shallow(use_cache=False):
+                    return {"error": "Nessun dato disponibile nel database da esportare"}, 404
+                return risposta_export_streaming(ref, PROFONDITA_RECORD_1H, formato_streaming, error_location="BulkImportExport1H.get")
+
+            # Struttura scoperta con letture shallow, record letti in parallelo (BULK_EXPORT_MAX_WORKERS)
+            get_reply = leggi_albero(ref, PROFONDITA_RECORD_1H)
 
             if not get_reply:
                 return {"error": "Nessun dato disponibile nel database da esportare"}, 404
@@ -89,11 +138,43 @@ class BulkImportExport1H(Resource):
         description: >
           Inserisce (importa) in bulk-loading il documento JSON per un database intero, considerandone tutti i livelli >
           di profondità presenti.
+          Import a blocchi: con Content-Type application/x-ndjson (formato dell'export NDJSON) il documento è letto >
+          in modo incrementale, con chunked=true il documento JSON è scomposto in record; i record sono scritti >
+          in blocchi limitati con update multi-path. Dopo un errore l'import riprende con resume_after=<checkpoint>.
+          Sono accettati anche JSON compresso (application/gzip, application/zstd o Content-Encoding) e MessagePack.
+        consumes:
+          - application/json
+          - application/x-ndjson
+          - application/gzip
+          - application/zstd
+          - application/msgpack
+        parameters:
+          - name: format
+            in: query
+            type: string
+            enum: [json, ndjson, json.gz, json.zst, msgpack]
+            required: false
+            description: Formato del documento in ingresso, in alternativa al Content-Type
+          - name: chunked
+            in: query
+            type: boolean
+            required: false
+            description: Import a blocchi di un documento JSON (implicito per il Content-Type application/x-ndjson)
+          - name: resume_after
+            in: query
+            type: string
+            required: false
+            description: Checkpoint (ultimo path scritto) da cui riprendere un import a blocchi interrotto
         responses:
           201:
             description: Database caricato (importato) con successo in bulk-loading
+            examples:
+              application/json:
+                { "completato": true, "record_importati": 1200, "batch_scritti": 6, "checkpoint": "/passaggioLivello/..." }
           400:
             description: Dati mancanti o malformati nel payload in ingresso
+          413:
+            description: Documento compresso che, decompresso, supera BULK_IMPORT_MAX_DECOMPRESSED_BYTES
             examples:
               application/json:
                 { "error": "Dati mancanti o malformati nel payload in ingresso" }
@@ -102,6 +183,8 @@ class BulkImportExport1H(Resource):
             examples:
               application/json:
                 { "error": "ID atleta già presente" }
+          415:
+            description: Formato in ingresso non supportato o dipendenza opzionale non installata
           500:
             description: Errore interno del server
             examples:
@@ -112,7 +195,15 @@ class BulkImportExport1H(Resource):
                 }
         """
         try:
-            dati = request.get_json(force=True)
+            formato = formato_import(request)
+            if formato not in (FORMATI_DOCUMENTO + (FORMATO_NDJSON,)) or not formato_disponibile(formato):
+                return {"error": f"Formato in ingresso [{formato}] non supportato o non disponibile"}, 415
+
+            import_a_blocchi = formato == FORMATO_NDJSON or (request.args.get("chunked") or "").strip().lower() in ("1", "true", "yes")
+            if import_a_blocchi:
+                return self._post_a_blocchi(formato)
+
+            dati = decodifica_documento(request, formato)
 
             # Validazione dati in ingresso (JSON Request Body):
             required_keys = ["passaggioLivello"]
@@ -121,9 +212,9 @@ class BulkImportExport1H(Resource):
 
             db = current_app.config['firebase'].get('db_app_1h')
 
-            # Controlla se esiste già qualsiasi contenuto pre-esistente nel database
+            # Controlla se esiste già qualsiasi contenuto pre-esistente nel database (lettura shallow della sola radice)
             ref = db.get_reference(f"/")
-            if ref.get() is not None:
+            if ref.get_shallow(use_cache=False) is not None:
                 return {"error": "Database non vuoto, quindi non posso procedere al bulk-loading!"}, 409
 
             # Prepara i dati da salvare (formato Firebase già presente per i dati in ingresso, trattandosi di bulk-loading)
@@ -141,6 +232,12 @@ class BulkImportExport1H(Resource):
             # (si conserva il formato originale Firebase dei dati in ingresso)
             return dati_firebase, 201
 
+        except DocumentoTroppoGrande as e:
+            return {"error": str(e)}, 413
+
+        except ValueError as e:
+            return {"error": str(e)}, 400
+
         except Exception as e:
             error_location = "BulkImportExport1H.post"
             print(f"❌ Errore in class {error_location} per POST / in database exporting via bulk-loading: {e}")
@@ -149,6 +246,35 @@ class BulkImportExport1H(Resource):
                 "comment": f"Errore interno del server in {error_location}."
             }, 500
 
+    #--------------------------------------------------------------------------
+    def _post_a_blocchi(self, formato):
+        """
+        Import a blocchi, riprendibile dall'ultimo checkpoint confermato.
+        """
+        required_keys = ["passaggioLivello"]
+        riprendi_dopo = request.args.get("resume_after") or None
+
+        db = current_app.config['firebase'].get('db_app_1h')
+        ref = db.get_reference("/")
+
+        # Senza checkpoint il database deve essere vuoto (verifica con la sola lettura shallow della root)
+        if riprendi_dopo is None and ref.get_shallow(use_cache=False):
+            return {"error": "Database non vuoto, quindi non posso procedere al bulk-loading!"}, 409
+
+        if formato == FORMATO_NDJSON:
+            # Lettura incrementale dal flusso della richiesta (se non già consumato come JSON)
+            sorgente = request.stream if request.mimetype == MIMETYPE_NDJSON else io.BytesIO(request.get_data())
+            records = leggi_record_ndjson(sorgente)
+        else:
+            dati = decodifica_documento(request, formato)
+            if not isinstance(dati, dict) or not all(k in dati for k in required_keys):
+                return {"error": "Dati mancanti o malformati nel payload in ingresso"}, 400
+            records = record_da_documento(dati, PROFONDITA_RECORD_1H)
+
+        esito = importa_a_blocchi(ref, records, radici_ammesse=required_keys, riprendi_dopo=riprendi_dopo)
+
+        return risposta_import_a_blocchi(esito, "/api/pal/v1.0.0/", request.args)
+
     #--------------------------------------------------------------------------
     def delete(self):
         """
@@ -176,7 +302,7 @@ class BulkImportExport1H(Resource):
 
             db = current_app.config['firebase'].get('db_app_1h')
             ref = db.get_reference("/")
-            if not ref.get():
+            if not ref.get_shallow(use_cache=False):
                 return {"error": "Nessun dato presente in database, database già vuoto"}, 404
 
             ref.delete()
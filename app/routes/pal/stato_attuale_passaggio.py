@@ -8,10 +8,11 @@ sullo stato della sbarra, velocità del treno, e tempo di attesa accumulato.
 """
 
 from flask_restful import Resource
-from flask import current_app
+from flask import request, current_app
 from utils.firebase.firebase_initializer import FirebaseInitializer
 from app.routes.pal.view_models.stato_attuale_passaggio_view_model import StatoAttualePassaggioViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.proiezione import leggi_parametri_proiezione
 
 # -----------------------------------------------------------------------------
 
@@ -35,6 +36,21 @@ class StatoAttualePassaggio(Resource):
         description: >
           Recupera lo stato corrente del passaggio a livello da Firebase,
           inclusi lo stato delle sbarre, la stima dell'attesa e il timestamp attuale.
+          Per ricevere le modifiche in tempo reale, anziché interrogare periodicamente
+          questa risorsa, usare lo stream SSE /stato-attuale-passaggio/eventi.
+        parameters:
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "transitabilita,stima-attesa-residua-min"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Stato attuale recuperato con successo
@@ -77,15 +93,18 @@ class StatoAttualePassaggio(Resource):
                 }
         """
         try:
-            # Leggi lo stato corrente dal ramo 'statoCorrente' nel Firebase
-            ref = self.firebase_db.get_reference("/passaggioLivello/statoCorrente")
-            get_reply = ref.get()
+            # Stato corrente mantenuto in memoria dal listener condiviso dello stream SSE, se attivo,
+            # altrimenti letto dal ramo 'statoCorrente' nel Firebase
+            versione, get_reply = current_app.config["diffusore_stato_passaggio"].valore_corrente()
+            if not versione:
+                ref = self.firebase_db.get_reference("/passaggioLivello/statoCorrente")
+                get_reply = ref.get()
 
             # Costruisci il ViewModel:
             view_model = StatoAttualePassaggioViewModel(dati_raw = get_reply)
             #DEBUG: print(f"view_model:\n{view_model}")
 
-            return view_model.to_dict(), 200
+            return view_model.to_dict(leggi_parametri_proiezione(request.args)), 200
 
         except Exception as e:
             return {
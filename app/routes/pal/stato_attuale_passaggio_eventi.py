@@ -0,0 +1,165 @@
+"""
+Risorsa RESTful - Stream delle modifiche allo Stato Attuale del Passaggio a Livello (PAL)
+
+GET /api/pal/v1.0.0/stato-attuale-passaggio/eventi
+
+Server-Sent Events: invia lo stato attuale del passaggio a livello alla connessione e ad ogni sua
+modifica, in alternativa al polling di /stato-attuale-passaggio. Tutti i client collegati sono
+serviti dalla memoria, tramite un unico listener Firebase per processo.
+
+⚠️ Ogni client collegato occupa un worker (o un thread) per tutta la durata della connessione, fino a
+SSE_MAX_DURATA_SEC: con i worker "sync" di gunicorn pochi client basterebbero a saturare il server.
+Lo stream richiede worker asincroni (gevent / eventlet) oppure "gthread" con thread sufficienti
+per i client attesi.
+"""
+
+import secrets
+import threading
+import time
+
+from flask_restful import Resource
+from flask import request, current_app, Response, stream_with_context
+from app.routes.pal.view_models.stato_attuale_passaggio_view_model import StatoAttualePassaggioViewModel
+from utils.config import config, env
+from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.proiezione import leggi_parametri_proiezione
+from utils.rest.rappresentazione_json import serializza_json
+
+HEARTBEAT_SEC = float(config[env].SSE_HEARTBEAT_SEC)
+MAX_DURATA_SEC = float(config[env].SSE_MAX_DURATA_SEC)
+RETRY_MS = int(config[env].SSE_RETRY_MS)
+
+# Le versioni del diffusore valgono per il solo processo: l'ID evento le distingue da quelle di altri processi
+ISTANZA = secrets.token_hex(4)
+
+# Ultimo stato costruito: un solo view model per versione, condiviso da tutti i client
+_ultimo_stato = (0, None)
+_lock_ultimo_stato = threading.Lock()
+
+#------------------------------------------------------------------------------
+
+def _stato_per_versione(versione: int, dati_raw) -> StatoAttualePassaggioViewModel:
+    global _ultimo_stato
+    with _lock_ultimo_stato:
+        if _ultimo_stato[0] != versione:
+            _ultimo_stato = (versione, StatoAttualePassaggioViewModel(dati_raw=dati_raw or {}))
+        return _ultimo_stato[1]
+
+
+def _leggi_last_event_id(last_event_id: str) -> int:
+    """
+    Versione già ricevuta dal client che si ricollega (header Last-Event-ID), 0 se assente
+    o relativa ad un altro processo.
+    """
+    istanza, _, versione = (last_event_id or "").partition("-")
+    if istanza != ISTANZA or not versione.isdigit():
+        return 0
+    return int(versione)
+
+
+def _evento_sse(id_evento: str, nome: str, dati) -> str:
+    righe = serializza_json(dati).decode("utf-8").rstrip("\n").split("\n")
+    return f"id: {id_evento}\nevent: {nome}\n" + "".join(f"data: {riga}\n" for riga in righe) + "\n"
+
+
+def genera_eventi(diffusore, proiezione, ultima_versione: int):
+    """
+    Flusso SSE: stato corrente (se non già ricevuto dal client), poi un evento "stato" per ogni modifica
+    e un commento keep-alive ogni SSE_HEARTBEAT_SEC; la connessione è chiusa dopo SSE_MAX_DURATA_SEC
+    (il client si ricollega automaticamente, indicando l'ultimo ID evento ricevuto).
+    """
+    scadenza = time.monotonic() + MAX_DURATA_SEC
+    yield f"retry: {RETRY_MS}\n\n"
+
+    while True:
+        rimanente = scadenza - time.monotonic()
+        if rimanente <= 0:
+            return
+
+        versione, dati_raw = diffusore.attendi(ultima_versione, min(HEARTBEAT_SEC, rimanente))
+        if versione == ultima_versione:
+            yield ": keep-alive\n\n"
+            continue
+
+        ultima_versione = versione
+        stato = _stato_per_versione(versione, dati_raw).to_dict(proiezione)
+        yield _evento_sse(f"{ISTANZA}-{versione}", "stato", stato)
+
+# -----------------------------------------------------------------------------
+
+@log_restful_class_on_any_method_call(log_restful_method_call)
+class StatoAttualePassaggioEventi(Resource):
+    """
+    Notifica in tempo reale (Server-Sent Events) le modifiche allo stato del passaggio a livello.
+    """
+
+    def get(self):
+        """
+        Stream delle modifiche allo stato attuale del passaggio a livello
+        ---
+        tags:
+          - PAL - Stato Attuale Passaggio
+        summary: Notifica in tempo reale (SSE) dello stato del passaggio a livello
+        description: >
+          Connessione Server-Sent Events (text/event-stream): alla connessione e ad ogni modifica
+          dello stato viene inviato un evento "stato", con la stessa rappresentazione di
+          GET /stato-attuale-passaggio. Tutti i client sono serviti dalla memoria tramite un unico
+          listener Firebase per processo; la connessione è periodicamente chiusa dal server ed il
+          client (es. EventSource) si ricollega automaticamente.
+          Ogni connessione occupa un worker (o thread) del server fino a SSE_MAX_DURATA_SEC:
+          non utilizzabile con i worker "sync" di gunicorn.
+        produces:
+          - text/event-stream
+        parameters:
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "transitabilita,stima-attesa-residua-min"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
+          - name: Last-Event-ID
+            in: header
+            type: string
+            required: false
+            description: ID dell'ultimo evento ricevuto (inviato automaticamente da EventSource alla riconnessione)
+        responses:
+          200:
+            description: Stream di eventi "stato"
+            examples:
+              text/event-stream: |
+                retry: 3000
+
+                id: 3f2a9c1b-1
+                event: stato
+                data: {"orario-rilevazione": "2025-04-06 10:30:00", "transitabilita": 3, "...": "..."}
+
+                : keep-alive
+          500:
+            description: Errore interno del server
+            examples:
+              application/json:
+                {
+                  "error": "Errore nello stream dello stato attuale: <dettaglio>"
+                }
+        """
+        try:
+            diffusore = current_app.config["diffusore_stato_passaggio"]
+            proiezione = leggi_parametri_proiezione(request.args)
+            ultima_versione = _leggi_last_event_id(request.headers.get("Last-Event-ID"))
+
+            return Response(
+                stream_with_context(genera_eventi(diffusore, proiezione, ultima_versione)),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
+        except Exception as e:
+            return {
+                "error": f"Errore nello stream dello stato attuale: {str(e)}"
+            }, 500
@@ -7,11 +7,17 @@ Restituisce la lista di timestamp corrispondenti ai transiti dei treni,
 rappresentati in forma semplificata per uso storico/consultazione.
 """
 
+import threading
+
 from flask_restful import Resource
-from flask import current_app
+from flask import request, current_app
 from urllib.parse import quote
 
 from app.routes.pal.view_models.treno_view_model import TrenoViewModel
+from utils.indice_temporale import IndiceTemporale, leggi_intervallo_temporale, parse_id_timestamp
+from utils.rest.paginazione import leggi_parametri_paginazione, costruisci_link_pagina
+from utils.rest.etag import calcola_etag_collezione, risposta_condizionale
+from utils.rest.proiezione import leggi_parametri_proiezione
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
 
 # -----------------------------------------------------------------------------
@@ -23,6 +29,11 @@ class Treni(Resource):
     al passaggio a livello (PAL).
     """
 
+    # Indice cronologico dei transiti, condiviso fra le richieste ed aggiornato in modo incrementale:
+    indice_temporale = IndiceTemporale()
+    _indice_lock = threading.Lock()
+    _indice_snapshot = None
+
     def __init__(self):
         self.firebase_db = current_app.config["firebase"].get("db_app_1h")
 
@@ -34,9 +45,50 @@ class Treni(Resource):
           - PAL - Treni
         summary: Elenco storico dei treni transitati
         description: >
-          Ritorna una lista di timestamp ordinati in ordine decrescente,
-          relativi ai transiti dei treni rilevati al passaggio a livello.
+          Ritorna una lista di timestamp ordinati in ordine cronologico decrescente,
+          relativi ai transiti dei treni rilevati al passaggio a livello, eventualmente filtrati
+          per intervallo temporale (estremi inclusi) tramite i parametri "from"/"since" e "to"/"until".
           Ogni item contiene anche un link HATEOAS alla risorsa dettagliata del treno.
+          Se viene indicato il parametro "limit", la risposta è paginata: la lista viene restituita
+          nel campo "treni" ed il link alla pagina successiva (treni meno recenti) in "_links.next".
+          Vengono costruiti i dettagli dei soli treni della finestra/pagina richiesta.
+        parameters:
+          - name: from
+            in: query
+            type: string
+            required: false
+            description: Inizio intervallo (formato ID treno, ISO-8601 o epoch); alias "since"
+            example: "2025-04-06"
+          - name: to
+            in: query
+            type: string
+            required: false
+            description: Fine intervallo (formato ID treno, ISO-8601 o epoch); alias "until"
+            example: "06-04-2025_10:30:25"
+          - name: limit
+            in: query
+            type: integer
+            required: false
+            description: Numero massimo di treni per pagina (abilita la paginazione)
+            example: 100
+          - name: cursor
+            in: query
+            type: string
+            required: false
+            description: ID del primo treno della pagina richiesta (ricavato da "_links.next")
+            example: "06-04-2025_10:30:25"
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,velocita-rilevata-kmh"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Elenco treni restituito correttamente
@@ -65,6 +117,15 @@ class Treni(Resource):
                     self:
                       type: string
                       example: "/api/pal/v1.0.0/storico-treni/06-04-2025_10:30:25"
+          304:
+            description: Contenuto non modificato (ETag della collezione invariato)
+          400:
+            description: Estremi dell'intervallo temporale o parametri di paginazione non validi
+            examples:
+              application/json:
+                {
+                  "error": "Estremo temporale non valido: [abc]"
+                }
           500:
             description: Errore interno durante la lettura dei dati
             examples:
@@ -74,20 +135,63 @@ class Treni(Resource):
                 }
         """
         try:
+            try:
+                da, a = leggi_intervallo_temporale(request.args, nomi_da=("from", "since"), nomi_a=("to", "until"))
+                limit, cursor = leggi_parametri_paginazione(request.args)
+                if cursor is not None:
+                    # Il cursore (treno più recente della pagina) limita superiormente la finestra
+                    epoch_cursor = parse_id_timestamp(cursor)
+                    if epoch_cursor is None:
+                        raise ValueError(f"Parametro 'cursor' non valido: [{cursor}]")
+                    a = epoch_cursor if a is None else min(a, epoch_cursor)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+
             get_reply = self.firebase_db.get_reference("/passaggioLivello/backup").get()
 
             if not get_reply:
                 return {"error": "Nessun treno registrato nello storico-treni"}, 404
 
+            # Con paginazione solo limit + 1 treni (l'ultimo è il cursore della pagina successiva),
+            # a partire dal cursore: eventuali omonimi temporali già serviti sono esclusi
+            id_treni = self._id_treni_decrescenti(get_reply, da, a, cursor, limit + 1 if limit is not None else None)
+
+            next_cursor = None
+            if limit is not None and len(id_treni) > limit:
+                next_cursor = id_treni[limit]
+                id_treni = id_treni[:limit]
+
+            # Risoluzione in batch (un solo hash per treno, vettoriale se possibile) di tratte e tipologie:
+            # la riformattazione dell'identificativo avviene solo per i treni non ancora memorizzati
+            tratte_e_tipologie = TrenoViewModel.orario_treni.get_tratte_e_tipologie_by_id_treni(
+                id_treni, TrenoViewModel.chiave_orario
+            )
+
+            proiezione = leggi_parametri_proiezione(request.args)
             response = []
-            for id_entity, stato in sorted(get_reply.items(), reverse=True):
-                entity_view_model = TrenoViewModel(id_entity = id_entity, dati_raw = stato)
+            for id_entity, (tratta, tipologia) in zip(id_treni, tratte_e_tipologie):
+                entity_view_model = TrenoViewModel(id_entity = id_entity, dati_raw = get_reply[id_entity], tratta = tratta, tipologia = tipologia)
 
-                entity_view_model_dictionary = entity_view_model.to_dict()
+                entity_view_model_dictionary = entity_view_model.to_dict(proiezione)
 
                 response.append(entity_view_model_dictionary)
 
-            return response, 200
+            if limit is not None:
+                links = {"self": costruisci_link_pagina(request.path, request.args)}
+                if next_cursor is not None:
+                    links["next"] = costruisci_link_pagina(request.path, request.args, cursor=next_cursor)
+                return risposta_condizionale({"treni": response, "_links": links}, calcola_etag_collezione(response + [links], proiezione.variante))
+
+            return risposta_condizionale(response, calcola_etag_collezione(response, proiezione.variante))
 
         except Exception as e:
             return {"error": f"Errore durante la lettura dello storico-treni: {str(e)}"}, 500
+
+    def _id_treni_decrescenti(self, get_reply: dict, da: float, a: float, cursor: str = None, limite: int = None) -> list:
+        cls = self.__class__
+        with cls._indice_lock:
+            # Sincronizzazione incrementale solo se lo snapshot letto è cambiato (es. non servito dalla cache)
+            if get_reply is not cls._indice_snapshot:
+                cls.indice_temporale.sincronizza(get_reply.keys())
+                cls._indice_snapshot = get_reply
+            return cls.indice_temporale.pagina_decrescente(da, a, cursor, limite)
@@ -7,10 +7,11 @@ Restituisce i dettagli di un treno, a partire da un timestamp registrato nel bac
 """
 
 from flask_restful import Resource
-from flask import current_app
+from flask import request, current_app
 from urllib.parse import unquote
 from app.routes.pal.view_models.treno_view_model import TrenoViewModel
 from utils.tracing.restful_logger_decorator import log_restful_class_on_any_method_call, log_restful_method_call
+from utils.rest.proiezione import leggi_parametri_proiezione
 
 # -----------------------------------------------------------------------------
 
@@ -40,6 +41,18 @@ class Treno(Resource):
             required: true
             type: string
             description: Identificatore del treno codificato (timestamp del passaggio)
+          - name: fields
+            in: query
+            type: string
+            required: false
+            description: Campi da restituire, separati da virgola ("_hash" e "_links" compresi); in assenza tutti
+            example: "id,velocita-rilevata-kmh"
+          - name: links
+            in: query
+            type: string
+            required: false
+            description: Valore "none" per omettere i link HATEOAS ("_links")
+            example: "none"
         responses:
           200:
             description: Dettagli del treno trovati correttamente
@@ -93,7 +106,7 @@ class Treno(Resource):
             # Presentazione contenuti dettagliati: velocità, tratta, tipologia
             view_model = TrenoViewModel(id_entity=id_treno, dati_raw = dati_raw)
 
-            return view_model.to_dict(), 200
+            return view_model.to_dict(leggi_parametri_proiezione(request.args)), 200
 
         except Exception as e:
             return {"error": f"Errore durante il recupero treno: {str(e)}"}, 500
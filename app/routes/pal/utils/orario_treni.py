@@ -1,11 +1,33 @@
+import threading
+from collections import OrderedDict
+
+from utils.config import config, env
+
+try:
+    import numpy as np  # opzionale: abilita il calcolo vettoriale degli hash in batch
+except ImportError:
+    np = None
+
+#------------------------------------------------------------------------------
+
 class OrarioTreni:
     """
     Classe per gestire un orario dei treni, considerandolo localizzato in una singola stazione
     (in prossimità di un prefissato Passaggio a Livello): passaggi ad orari programmati, considerando
     per semplicità un tipico ritardo per il treno come già inglobato nel risultato della scelta.
+    Gli hash degli identificativi treno sono memorizzati in una cache LRU limitata, indicizzata
+    sull'identificativo così come ricevuto: con una funzione "chiave_orario" (riformattazione
+    dell'identificativo nella chiave dell'orario) la conversione avviene solo per gli identificativi
+    non ancora memorizzati.
     """
 
+    HASH_MODULO = 10**9 + 7
+
     def __init__(self):
+        self._memo_hash = OrderedDict()
+        self._memo_max_entries = int(config[env].ORARIO_TRENI_MEMO_MAX_ENTRIES)
+        self._memo_lock = threading.Lock()
+
         self.cardinalita_tipologie = 3
         self.lista_tipologie_treni =  ["REG-Regionale", "IC-Intercity", "RPD-Rapido"]
         self.cardinalita_tratte = 58
@@ -74,17 +96,93 @@ class OrarioTreni:
     def hash_string_to_int(self, s: str) -> int:
         hash_value = 0
         for char in s:
-            hash_value = (hash_value * 31 + ord(char)) % (10**9 + 7)
+            hash_value = (hash_value * 31 + ord(char)) % self.HASH_MODULO
+        return hash_value
+
+
+    def hash_strings_to_int(self, lista_s: list) -> list:
+        """
+        Versione batch di hash_string_to_int(): con NumPy disponibile il calcolo è vettoriale
+        (un passo di Horner per posizione di carattere, su tutte le stringhe insieme).
+        """
+        if np is None or len(lista_s) == 0:
+            return [self.hash_string_to_int(s) for s in lista_s]
+
+        lunghezze = np.fromiter((len(s) for s in lista_s), dtype=np.int64, count=len(lista_s))
+        lunghezza_max = int(lunghezze.max())
+        if lunghezza_max == 0:
+            return [0] * len(lista_s)
+
+        codici = np.frombuffer(
+            "".join(s.ljust(lunghezza_max, "\0") for s in lista_s).encode("utf-32-le"), dtype=np.uint32
+        ).reshape(len(lista_s), lunghezza_max).astype(np.int64)
+
+        hash_values = np.zeros(len(lista_s), dtype=np.int64)
+        for j in range(lunghezza_max):
+            aggiornati = (hash_values * 31 + codici[:, j]) % self.HASH_MODULO
+            hash_values = np.where(lunghezze > j, aggiornati, hash_values)
+        return hash_values.tolist()
+
+
+    def _hash_memo(self, id_treno: str, chiave_orario=None) -> int:
+        with self._memo_lock:
+            hash_value = self._memo_hash.get(id_treno)
+            if hash_value is not None:
+                self._memo_hash.move_to_end(id_treno)
+                return hash_value
+        hash_value = self.hash_string_to_int(chiave_orario(id_treno) if chiave_orario else id_treno)
+        self._memorizza({id_treno: hash_value})
         return hash_value
 
 
+    def _memorizza(self, hash_per_id: dict):
+        with self._memo_lock:
+            self._memo_hash.update(hash_per_id)
+            for id_treno in hash_per_id:
+                self._memo_hash.move_to_end(id_treno)
+            while len(self._memo_hash) > self._memo_max_entries:
+                self._memo_hash.popitem(last=False)
+
+
+    def _tratta_e_tipologia(self, hash_value: int) -> tuple:
+        return (
+            self.lista_tratte[hash_value % self.cardinalita_tratte],
+            self.lista_tipologie_treni[hash_value % self.cardinalita_tipologie]
+        )
+
+
     def get_tratta_by_id_treno(self, id_treno: str) -> str:
-        indice_tratta = (self.hash_string_to_int(id_treno) % self.cardinalita_tratte)
+        indice_tratta = (self._hash_memo(id_treno) % self.cardinalita_tratte)
         #DEBUG: print(f"indice_tratta: [{indice_tratta}]")
         return self.lista_tratte[indice_tratta]
 
 
     def get_tipologia_by_id_treno(self, id_treno: str) -> str:
-        indice_tipologia = (self.hash_string_to_int(id_treno) % self.cardinalita_tipologie)
+        indice_tipologia = (self._hash_memo(id_treno) % self.cardinalita_tipologie)
         #DEBUG: print(f"indice_tipologia: [{indice_tipologia}]")
         return self.lista_tipologie_treni[indice_tipologia]
+
+
+    def get_tratta_e_tipologia_by_id_treno(self, id_treno: str, chiave_orario=None) -> tuple:
+        """
+        Ritorna la coppia (tratta, tipologia) calcolando l'hash dell'identificativo una sola volta.
+        """
+        return self._tratta_e_tipologia(self._hash_memo(id_treno, chiave_orario))
+
+
+    def get_tratte_e_tipologie_by_id_treni(self, id_treni: list, chiave_orario=None) -> list:
+        """
+        Versione batch di get_tratta_e_tipologia_by_id_treno(): gli identificativi non ancora
+        memorizzati vengono risolti insieme (in modo vettoriale, se NumPy è disponibile).
+        """
+        with self._memo_lock:
+            noti = {id_treno: self._memo_hash[id_treno] for id_treno in id_treni if id_treno in self._memo_hash}
+
+        mancanti = list(dict.fromkeys(id_treno for id_treno in id_treni if id_treno not in noti))
+        if mancanti:
+            chiavi = [chiave_orario(id_treno) for id_treno in mancanti] if chiave_orario else mancanti
+            calcolati = dict(zip(mancanti, self.hash_strings_to_int(chiavi)))
+            self._memorizza(calcolati)
+            noti.update(calcolati)
+
+        return [self._tratta_e_tipologia(noti[id_treno]) for id_treno in id_treni]
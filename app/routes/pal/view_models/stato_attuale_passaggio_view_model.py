@@ -11,11 +11,12 @@ Include:
 - _hash per integrità contenuto
 """
 
-import hashlib
 from datetime import datetime
 import random
 from utils.config import config, env
 from app.routes.pal.utils.orario_treni import OrarioTreni
+from utils.hashing import digest_testo
+from utils.rest.proiezione import PROIEZIONE_COMPLETA
 from utils.tracing.view_model_logger_decorator import log_view_model
 
 #------------------------------------------------------------------------------
@@ -55,8 +56,7 @@ class StatoAttualePassaggioViewModel:
         self.orario_rilevazione = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.stima_attesa_residua_min = self._get_stima_attesa_residua(stato_pal)
         self.velocita_rilevata_ultimo_treno_kmh = self._get_velocita(velocita_from_db)
-        self.tratta_ultimo_treno = self._get_tratta_treno(self.orario_rilevazione)
-        self.tipologia_ultimo_treno = self._get_tipologia_treno(self.orario_rilevazione)
+        self.tratta_ultimo_treno, self.tipologia_ultimo_treno = self.orario_treni.get_tratta_e_tipologia_by_id_treno(self.orario_rilevazione)
 
         self._links = {
             "self": "/api/pal/v1.0.0/stato-attuale-passaggio"
@@ -64,8 +64,8 @@ class StatoAttualePassaggioViewModel:
         self._hash = self._calcola_hash()
 
 
-    def to_dict(self):
-        return {
+    def to_dict(self, proiezione=PROIEZIONE_COMPLETA):
+        return proiezione.applica({
             "orario-rilevazione": self.orario_rilevazione,
             "stima-attesa-residua-min": self.stima_attesa_residua_min,
             "transitabilita": self.transitabilita,
@@ -75,7 +75,7 @@ class StatoAttualePassaggioViewModel:
             "tipologia-ultimo-treno": self.tipologia_ultimo_treno,
             "_links": self._links,
             "_hash": self._hash
-        }
+        })
 
 
     def _get_velocita(self, velocita_from_db: int) -> int:
@@ -122,4 +122,4 @@ class StatoAttualePassaggioViewModel:
 
     def _calcola_hash(self) -> str:
         raw = f"{self.orario_rilevazione}{self.stima_attesa_residua_min}{self.transitabilita}"
-        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        return digest_testo(raw)
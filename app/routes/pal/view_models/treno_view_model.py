@@ -10,10 +10,11 @@ Contiene:
 - _hash
 """
 
-import hashlib
 from datetime import datetime
 
 from app.routes.pal.utils.orario_treni import OrarioTreni
+from utils.hashing import digest_testo
+from utils.rest.proiezione import PROIEZIONE_COMPLETA
 from utils.tracing.view_model_logger_decorator import log_view_model
 
 #------------------------------------------------------------------------------
@@ -23,15 +24,14 @@ class TrenoViewModel:
 
     orario_treni = OrarioTreni()
 
-    def __init__(self, id_entity: str, dati_raw: dict):
+    def __init__(self, id_entity: str, dati_raw: dict, tratta: str = None, tipologia: str = None):
 
         stato = int(dati_raw.replace("stato: ", "").strip())
         velocita = round(60 + (stato * 40))  # finta logica per demo
 
-        dt_from_id_treno = datetime.strptime(id_entity, "%d-%m-%Y_%H:%M:%S")
-        dt_riformattata_str = dt_from_id_treno.strftime("%Y-%m-%d %H:%M:%S")
-        tratta = self.get_tratta(dt_riformattata_str)
-        tipologia = self.get_tipologia(dt_riformattata_str)
+        # Tratta e tipologia possono essere già state risolte in batch (vedi Treni.get)
+        if tratta is None or tipologia is None:
+            tratta, tipologia = self.orario_treni.get_tratta_e_tipologia_by_id_treno(id_entity, self.chiave_orario)
 
         self.id_treno = id_entity
         self.stato = stato # <- dato non utilizzato
@@ -40,25 +40,34 @@ class TrenoViewModel:
         self.tipologia = tipologia
 
 
-    def to_dict(self):
-        base_url = f"/api/pal/v1.0.0/storico-treni/{self.id_treno}"
-
-        payload = {
+    def to_dict(self, proiezione=PROIEZIONE_COMPLETA):
+        payload = proiezione.applica({
             "id": self.id_treno,
             "velocita-rilevata-kmh": self.velocita_kmh,
             "tratta": self.tratta,
-            "tipologia": self.tipologia,
-            "_links": {
-                "self": base_url,
+            "tipologia": self.tipologia
+        })
+
+        if proiezione.includi("_links"):
+            payload["_links"] = {
+                "self": f"/api/pal/v1.0.0/storico-treni/{self.id_treno}",
                 "storico_treni": "/api/pal/v1.0.0/storico-treni"
             }
-        }
 
-        hash_input = f"{self.id_treno}|{self.velocita_kmh}|{self.tratta}|{self.tipologia}"
-        payload["_hash"] = hashlib.sha256(hash_input.encode()).hexdigest()
+        if proiezione.includi("_hash"):
+            hash_input = f"{self.id_treno}|{self.velocita_kmh}|{self.tratta}|{self.tipologia}"
+            payload["_hash"] = digest_testo(hash_input)
 
         return payload
 
+    @staticmethod
+    def chiave_orario(id_treno: str) -> str:
+        """
+        Riformatta l'identificativo treno nella chiave usata per la consultazione dell'orario treni.
+        """
+        dt_from_id_treno = datetime.strptime(id_treno, "%d-%m-%Y_%H:%M:%S")
+        return dt_from_id_treno.strftime("%Y-%m-%d %H:%M:%S")
+
     def get_tratta(self, id_treno: str) -> str:
         return self.orario_treni.get_tratta_by_id_treno(id_treno)
 
@@ -10,12 +10,17 @@ from flasgger import Swagger
 
 from utils.config import config, env
 from utils.tracing.logger_utils import get_logger
+from utils.rest.compressione import registra_compressione
+from utils.rest.rappresentazione_json import output_json, ProviderJsonVeloce
 
 from utils.firebase.firebase_initializer import FirebaseInitializer
+from utils.firebase.diffusore_modifiche import DiffusoreModifiche
+from app.routes.mra.utils.indice_riepilogo_atleti import IndiceRiepilogoAtleti
 
 # -----------------------------------------------------------------------------
 
 from app.routes.mra.bulk_import_export_1a import BulkImportExport1A
+from app.routes.mra.batch import Batch
 
 from app.routes.mra.atleti import Atleti
 from app.routes.mra.atleta import Atleta
@@ -36,6 +41,7 @@ from app.routes.mra.tentativo_in_tipologia_esercizio import TentativoInTipologia
 from app.routes.pal.bulk_import_export_1h import BulkImportExport1H
 
 from app.routes.pal.stato_attuale_passaggio import StatoAttualePassaggio
+from app.routes.pal.stato_attuale_passaggio_eventi import StatoAttualePassaggioEventi
 from app.routes.pal.treni import Treni
 from app.routes.pal.treno import Treno
 
@@ -54,8 +60,14 @@ logger.info("$$$ START APPLICATION")
 
 app = Flask(__name__)
 
+# Serializzazione JSON veloce (orjson, se disponibile) anche per jsonify, es. /swagger.json:
+app.json = ProviderJsonVeloce(app)
+
 swagger = Swagger(app)
 
+# Compressione delle risposte (gzip/brotli/zstd) negoziata via Accept-Encoding:
+registra_compressione(app)
+
 # -----------------------------------------------------------------------------
 
 # # Debug - stampa i parametri attuali della configurazione:
@@ -70,6 +82,16 @@ firebase = FirebaseInitializer(config[env])
 firebase.initialize_all()
 app.config['firebase'] = firebase
 
+# Indice di riepilogo per atleta (database 1A), mantenuto in memoria ed aggiornato dalle scritture via API:
+app.config['indice_riepilogo_1a'] = IndiceRiepilogoAtleti(ttl_sec=float(config[env].INDICE_RIEPILOGO_TTL_SEC))
+
+# Stato attuale del passaggio a livello (database 1H), mantenuto in memoria da un unico listener Firebase
+# per processo, avviato al primo client collegato allo stream SSE:
+app.config['diffusore_stato_passaggio'] = DiffusoreModifiche(
+    firebase.get('db_app_1h').get_reference("/passaggioLivello/statoCorrente"),
+    max_silenzio_sec=float(config[env].SSE_LISTENER_MAX_SILENZIO_SEC)
+)
+
 # -----------------------------------------------------------------------------
 
 # Configurazione Swagger-UI (generatore automatico documentaz. API):
@@ -85,6 +107,9 @@ app.register_blueprint(swagger_ui_blueprint, url_prefix=SWAGGER_DOC_ENDPOINT)
 # Creazione dell'API Flask-RESTful
 api = Api(app)
 
+# Rappresentazione "application/json" delle risorse con l'encoder configurato (JSON_ENCODER):
+api.representations['application/json'] = output_json
+
 # -----------------------------------------------------------------------------
 
 mra_base_url = "/api/mra/v1.0.0"
@@ -95,6 +120,9 @@ pal_base_url = "/api/pal/v1.0.0"
 # Aggiunta API di bulk IMPORT/EXPORT per l'intero database 1A:
 api.add_resource(BulkImportExport1A, f"{mra_base_url}/")
 
+# Aggiunta API di lettura multipla (batch) di risorse del database 1A:
+api.add_resource(Batch, f"{mra_base_url}/batch")
+
 # Aggiunta di tutte le API previste per REST-API "MRA" web-application, verso il database 1A:
 
 api.add_resource(Atleti,                  f"{mra_base_url}/atleti")
@@ -119,6 +147,7 @@ api.add_resource(BulkImportExport1H, f"{pal_base_url}/")
 # Aggiunta di tutte le API previste per REST-API "PAL" web-application, verso il database 1B:
 
 api.add_resource(StatoAttualePassaggio,  f"{pal_base_url}/stato-attuale-passaggio")
+api.add_resource(StatoAttualePassaggioEventi, f"{pal_base_url}/stato-attuale-passaggio/eventi")
 api.add_resource(Treni,                  f"{pal_base_url}/storico-treni")
 api.add_resource(Treno,                  f"{pal_base_url}/storico-treni/<path:id_treno_encoded>")
 
@@ -130,6 +159,10 @@ api.add_resource(Treno,                  f"{pal_base_url}/storico-treni/<path:id
 #         ->  "attesa-accumulata-sec"  (simulazione tempo di attesa a sbarra chiusa)
 #         ->  "transito"               (aperto/agibile = 0, chiuso/interrotto = 1, in-riapertura = 2, in-chiusura = 3)
 
+# StatoAttualePassaggioEventi
+# GET     /stato-attuale-passaggio/eventi
+#         ->  stream SSE (text/event-stream) con un evento "stato" ad ogni modifica dello stato attuale
+
 # Treni
 # GET     /storico-treni
 
@@ -0,0 +1,90 @@
+"""
+Microbenchmark del calcolo del campo "_hash" dei view model, su una sessione di 100.000 rilevazioni.
+
+Confronta:
+- l'implementazione storica (dizionario temporaneo + json.dumps(sort_keys=True) + SHA-256)
+- utils.hashing.HashCampi in modalità compatibile "sha256" (stessi valori)
+- utils.hashing.HashCampi con "blake2b" e, se installato, "xxhash"
+
+Uso (dalla root del progetto):
+    python benchmarks/hash_view_model_benchmark.py [numero_rilevazioni] [ripetizioni]
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.hashing import HashCampi, xxhash
+
+CAMPI_RILEVAZIONE = ("id", "pulsante_proposto", "pulsante_premuto", "tempo_risposta_ms")
+
+#------------------------------------------------------------------------------
+
+def genera_sessione(numero_rilevazioni: int) -> list:
+    random.seed(42)
+    return [
+        (str(i), random.randint(1, 8), random.randint(1, 8), random.randint(150, 1500))
+        for i in range(numero_rilevazioni)
+    ]
+
+
+def hash_storico(rilevazioni: list) -> list:
+    risultato = []
+    for valori in rilevazioni:
+        data = dict(zip(CAMPI_RILEVAZIONE, valori))
+        dati_rilevanti = {k: data[k] for k in CAMPI_RILEVAZIONE if k in data}
+        json_ordinato = json.dumps(dati_rilevanti, sort_keys=True)
+        risultato.append(hashlib.sha256(json_ordinato.encode("utf-8")).hexdigest())
+    return risultato
+
+
+def hash_con(hash_campi: HashCampi):
+    def calcola(rilevazioni: list) -> list:
+        return [hash_campi(*valori) for valori in rilevazioni]
+    return calcola
+
+
+def misura(funzione, rilevazioni: list, ripetizioni: int) -> float:
+    migliore = None
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        funzione(rilevazioni)
+        durata = time.perf_counter() - inizio
+        migliore = durata if migliore is None else min(migliore, durata)
+    return migliore
+
+#------------------------------------------------------------------------------
+
+def main():
+    numero_rilevazioni = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    ripetizioni = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rilevazioni = genera_sessione(numero_rilevazioni)
+
+    candidati = [
+        ("storico json.dumps + sha256", hash_storico),
+        ("HashCampi sha256 (compatibile)", hash_con(HashCampi(*CAMPI_RILEVAZIONE, algoritmo="sha256"))),
+        ("HashCampi blake2b-128", hash_con(HashCampi(*CAMPI_RILEVAZIONE, algoritmo="blake2b"))),
+    ]
+    if xxhash is not None:
+        candidati.append(("HashCampi xxh3-128", hash_con(HashCampi(*CAMPI_RILEVAZIONE, algoritmo="xxhash"))))
+    else:
+        print("(xxhash non installato: algoritmo \"xxhash\" non misurato)")
+
+    # La modalità compatibile deve produrre esattamente gli hash storici
+    assert hash_storico(rilevazioni[:1000]) == candidati[1][1](rilevazioni[:1000])
+
+    print(f"Sessione di {numero_rilevazioni} rilevazioni, migliore di {ripetizioni} ripetizioni:")
+    riferimento = None
+    for nome, funzione in candidati:
+        durata = misura(funzione, rilevazioni, ripetizioni)
+        riferimento = riferimento or durata
+        print(f"  {nome:<32} {durata * 1000:9.1f} ms   {durata * 1e9 / numero_rilevazioni:7.0f} ns/rilevazione   x{riferimento / durata:.2f}")
+
+
+if __name__ == "__main__":
+    main()
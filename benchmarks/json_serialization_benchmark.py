@@ -0,0 +1,82 @@
+"""
+Microbenchmark della serializzazione JSON delle risposte sugli endpoint di lista più grandi:
+- GET /atleti                     (elenco atleti, AtletaViewModel)
+- GET .../sessioni/<id>/rilevazioni (sessione con molte rilevazioni, RilevazioneViewModel)
+
+Confronta json.dumps della stdlib (rappresentazione predefinita di Flask-RESTful) con
+utils.rest.rappresentazione_json.serializza_json (orjson, se installato e configurato).
+
+Uso (dalla root del progetto):
+    python benchmarks/json_serialization_benchmark.py [numero_elementi] [ripetizioni]
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.rest.rappresentazione_json import serializza_json, USA_ORJSON
+from app.routes.mra.view_models.atleta_view_model import AtletaViewModel
+from app.routes.mra.view_models.rilevazione_view_model import RilevazioneViewModel
+
+#------------------------------------------------------------------------------
+
+def genera_atleti(numero: int) -> list:
+    random.seed(42)
+    return [
+        AtletaViewModel(i, {"nickname": f"atleta-{i}", "sesso": random.choice("MF"), "data": "2025-03-14 10:00:00"}).to_dict()
+        for i in range(numero)
+    ]
+
+
+def genera_rilevazioni(numero: int) -> list:
+    random.seed(42)
+    return [
+        RilevazioneViewModel(1, 2, "2025-03-14 10:00:00", str(i), f"{random.randint(1, 8)},{random.randint(1, 8)},{random.randint(150, 1500)}").to_dict()
+        for i in range(numero)
+    ]
+
+
+def stdlib(data) -> bytes:
+    # Come la rappresentazione predefinita di Flask-RESTful (json.dumps + newline), codificata in UTF-8
+    return (json.dumps(data) + "\n").encode("utf-8")
+
+
+def misura(funzione, data, ripetizioni: int) -> float:
+    migliore = None
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        funzione(data)
+        durata = time.perf_counter() - inizio
+        migliore = durata if migliore is None else min(migliore, durata)
+    return migliore
+
+#------------------------------------------------------------------------------
+
+def main():
+    numero_elementi = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    ripetizioni = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    if not USA_ORJSON:
+        print("(orjson non installato o JSON_ENCODER diverso da \"orjson\": serializza_json usa la stdlib)")
+
+    casi = [
+        ("atleti", genera_atleti(numero_elementi)),
+        ("rilevazioni", genera_rilevazioni(numero_elementi)),
+    ]
+
+    print(f"Liste di {numero_elementi} elementi, migliore di {ripetizioni} ripetizioni:")
+    for nome, data in casi:
+        # Stesso documento, a meno di spaziature
+        assert json.loads(stdlib(data)) == json.loads(serializza_json(data))
+
+        durata_stdlib = misura(stdlib, data, ripetizioni)
+        durata_veloce = misura(serializza_json, data, ripetizioni)
+        print(f"  {nome:<12} json {durata_stdlib * 1000:8.1f} ms   serializza_json {durata_veloce * 1000:8.1f} ms   x{durata_stdlib / durata_veloce:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,79 @@ class Config:
     APP_CONTROLLER_LOGGER_LOG_LEVEL =    os.getenv("APP_CONTROLLER_LOGGER_LOG_LEVEL", "INFO")
     APP_CONTROLLER_LOGGER_LOG_CHANNELS = os.getenv("APP_CONTROLLER_LOGGER_LOG_CHANNELS", "cf") # "c"->console, "f"->file, "cf"->console+file
 
+    # Cache read-through (TTL + LRU) davanti alle letture Firebase, invalidata dalle scritture via API:
+    FIREBASE_CACHE_ENABLED =        os.getenv("FIREBASE_CACHE_ENABLED",        "true")
+    FIREBASE_CACHE_TTL_SEC =        os.getenv("FIREBASE_CACHE_TTL_SEC",        "30")
+    FIREBASE_CACHE_MAX_ENTRIES =    os.getenv("FIREBASE_CACHE_MAX_ENTRIES",    "512")
+    FIREBASE_CACHE_EXCLUDED_PATHS = os.getenv("FIREBASE_CACHE_EXCLUDED_PATHS", "/passaggioLivello/statoCorrente") # path separati da ","
+
+    # Numero massimo di letture Firebase parallele per le letture "fan-out" (es. shallow sui figli):
+    FIREBASE_FANOUT_MAX_WORKERS = os.getenv("FIREBASE_FANOUT_MAX_WORKERS", "8")
+
+    # Validità dell'indice di riepilogo per atleta, locale a ciascun processo: limita il ritardo con cui sono recepite
+    # le scritture dirette su Firebase dei dispositivi e quelle via API ricevute da altri worker
+    # (ogni ricostruzione costa 1 + numero di esercizi letture shallow, in parallelo):
+    INDICE_RIEPILOGO_TTL_SEC = os.getenv("INDICE_RIEPILOGO_TTL_SEC", "300")
+
+    # Numero massimo di elementi restituibili in una singola pagina (parametro "limit"):
+    PAGINATION_MAX_LIMIT = os.getenv("PAGINATION_MAX_LIMIT", "500")
+
+    # Richieste GET multiple (risorsa batch): numero massimo di elementi per richiesta e di esecuzioni parallele:
+    BATCH_MAX_ITEMS =   os.getenv("BATCH_MAX_ITEMS",   "100")
+    BATCH_MAX_WORKERS = os.getenv("BATCH_MAX_WORKERS", "8")
+
+    # Scrittura di rilevazioni (POST su sessioni e rilevazioni): numero massimo di rilevazioni per richiesta:
+    RILEVAZIONI_MAX_PER_RICHIESTA = os.getenv("RILEVAZIONI_MAX_PER_RICHIESTA", "1000")
+
+    # Stream SSE dello stato del passaggio a livello: intervallo dei commenti keep-alive, durata massima di una
+    # connessione (il client si ricollega automaticamente) ed attesa suggerita al client per la riconnessione:
+    SSE_HEARTBEAT_SEC =  os.getenv("SSE_HEARTBEAT_SEC",  "15")
+    SSE_MAX_DURATA_SEC = os.getenv("SSE_MAX_DURATA_SEC", "300")
+    SSE_RETRY_MS =       os.getenv("SSE_RETRY_MS",       "3000")
+
+    # Listener Firebase dello stream SSE: oltre questo intervallo senza eventi è considerato non più attivo
+    # (il valore in memoria non è servito ed il listener è riavviato al successivo client in attesa):
+    SSE_LISTENER_MAX_SILENZIO_SEC = os.getenv("SSE_LISTENER_MAX_SILENZIO_SEC", "600")
+
+    # Dimensione massima della cache degli hash per identificativo treno (OrarioTreni):
+    ORARIO_TRENI_MEMO_MAX_ENTRIES = os.getenv("ORARIO_TRENI_MEMO_MAX_ENTRIES", "16384")
+
+    # Dimensione massima della cache degli ETag per (richiesta, versione in cache dei dati):
+    ETAG_MEMO_MAX_ENTRIES = os.getenv("ETAG_MEMO_MAX_ENTRIES", "4096")
+
+    # Algoritmo per il campo "_hash" dei view model: "sha256" (compatibile), "blake2b", "xxhash":
+    VIEW_MODEL_HASH_ALGORITHM = os.getenv("VIEW_MODEL_HASH_ALGORITHM", "sha256")
+
+    # Export bulk: profondità (da root) dei nodi letti ed emessi come singolo record, per database
+    # (1A: 3 -> un record per atleta "/tempiDiReazione/utenti/<id>";
+    #  1H: 2 -> un record per ramo "/passaggioLivello/<ramo>", l'intero storico treni con una sola lettura):
+    BULK_EXPORT_RECORD_DEPTH_1A = os.getenv("BULK_EXPORT_RECORD_DEPTH_1A", "3")
+    BULK_EXPORT_RECORD_DEPTH_1H = os.getenv("BULK_EXPORT_RECORD_DEPTH_1H", "2")
+    # Numero massimo di letture concorrenti dei record durante l'export bulk:
+    BULK_EXPORT_MAX_WORKERS =  os.getenv("BULK_EXPORT_MAX_WORKERS",  "8")
+    # Livelli di compressione degli export bulk nei formati "json.gz" e "json.zst":
+    BULK_EXPORT_GZIP_LEVEL =   os.getenv("BULK_EXPORT_GZIP_LEVEL",   "6")
+    BULK_EXPORT_ZSTD_LEVEL =   os.getenv("BULK_EXPORT_ZSTD_LEVEL",   "3")
+
+    # Import bulk a blocchi: numero massimo di record e di byte (JSON) per singolo update multi-path:
+    BULK_IMPORT_BATCH_MAX_RECORDS = os.getenv("BULK_IMPORT_BATCH_MAX_RECORDS", "200")
+    BULK_IMPORT_BATCH_MAX_BYTES =   os.getenv("BULK_IMPORT_BATCH_MAX_BYTES",   "4000000")
+    # Import bulk di JSON compresso (json.gz, json.zst): dimensione massima del documento decompresso in byte:
+    BULK_IMPORT_MAX_DECOMPRESSED_BYTES = os.getenv("BULK_IMPORT_MAX_DECOMPRESSED_BYTES", "268435456")
+
+    # Compressione delle risposte HTTP, negoziata via Accept-Encoding (algoritmi in ordine di preferenza;
+    # "br" e "zstd" richiedono i pacchetti opzionali brotli e zstandard):
+    HTTP_COMPRESSION_ENABLED =        os.getenv("HTTP_COMPRESSION_ENABLED",        "true")
+    HTTP_COMPRESSION_ALGORITHMS =     os.getenv("HTTP_COMPRESSION_ALGORITHMS",     "br,zstd,gzip")
+    HTTP_COMPRESSION_MIN_SIZE =       os.getenv("HTTP_COMPRESSION_MIN_SIZE",       "1024")
+    HTTP_COMPRESSION_MIMETYPES =      os.getenv("HTTP_COMPRESSION_MIMETYPES",      "application/json,application/x-ndjson,text/html,text/plain")
+    HTTP_COMPRESSION_GZIP_LEVEL =     os.getenv("HTTP_COMPRESSION_GZIP_LEVEL",     "6")
+    HTTP_COMPRESSION_BROTLI_QUALITY = os.getenv("HTTP_COMPRESSION_BROTLI_QUALITY", "4")
+    HTTP_COMPRESSION_ZSTD_LEVEL =     os.getenv("HTTP_COMPRESSION_ZSTD_LEVEL",     "3")
+
+    # Encoder JSON delle risposte: "orjson" (veloce, pacchetto opzionale, con ripiego automatico) o "json" (stdlib):
+    JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson")
+
     MIN_VELOCITA_TRENI_AT_PAL = os.getenv("MIN_VELOCITA_TRENI_AT_PAL",  "10")
     MAX_VELOCITA_TRENI_AT_PAL = os.getenv("MAX_VELOCITA_TRENI_AT_PAL", "140")
 
@@ -0,0 +1,173 @@
+import atexit
+import threading
+import time
+
+#------------------------------------------------------------------------------
+
+def _imposta(radice, path: str, valore):
+    """
+    Applica (copy-on-write) il valore di un evento Firebase al path indicato, relativo alla radice
+    del nodo ascoltato: i valori già consegnati ai client non vengono mai modificati.
+    """
+    segmenti = [s for s in path.split("/") if s]
+    if not segmenti:
+        return valore
+
+    if isinstance(radice, dict):
+        nodo = dict(radice)
+    elif isinstance(radice, list):
+        nodo = {str(indice): figlio for indice, figlio in enumerate(radice) if figlio is not None}
+    else:
+        nodo = {}
+
+    figlio = _imposta(nodo.get(segmenti[0]), "/".join(segmenti[1:]), valore)
+    if figlio is None:
+        nodo.pop(segmenti[0], None)
+    else:
+        nodo[segmenti[0]] = figlio
+    return nodo or None
+
+
+class DiffusoreModifiche:
+    """
+    Diffusione in memoria delle modifiche di un nodo Firebase: un solo listener (listen()) per processo,
+    avviato alla prima attesa, mantiene il valore corrente del nodo con un numero di versione e risveglia
+    ad ogni modifica tutti i client in attesa. Nessuna coda per client: chi è in ritardo riceve
+    direttamente l'ultimo valore.
+
+    Lo stato del listener non è osservabile con le API pubbliche dell'SDK (gli eventi keep-alive di
+    Firebase non sono notificati): il listener è considerato attivo solo se ha ricevuto un evento, o è
+    stato (ri)avviato, da meno di max_silenzio_sec. Oltre, il valore in memoria non è più servito e
+    il listener è riavviato alla successiva attesa (il nuovo listener rinvia l'intero nodo, che non
+    genera una nuova versione se invariato). Alla terminazione del processo il listener viene chiuso.
+    """
+
+    def __init__(self, ref, max_silenzio_sec: float = 600):
+        self._ref = ref
+        self._max_silenzio_sec = float(max_silenzio_sec)
+        self._condizione = threading.Condition()
+        self._registrazione = None
+        self._ultimo_segnale = None   # istante (monotonic) dell'ultimo evento o dell'ultimo avvio del listener
+        self._versione = 0   # 0: nessun dato ancora ricevuto dal listener
+        self._valore = None
+        self._aggiornato = False   # valore ricevuto dal listener attualmente attivo
+        self._chiuso = False
+        self._in_avvio = False
+        atexit.register(self.chiudi)
+
+    def _listener_attivo(self) -> bool:
+        return self._registrazione is not None and time.monotonic() - self._ultimo_segnale < self._max_silenzio_sec
+
+    def _avvia(self):
+        with self._condizione:
+            if self._chiuso or self._in_avvio or self._listener_attivo():
+                return
+            self._in_avvio = True
+            registrazione_precedente, self._registrazione = self._registrazione, None
+            self._aggiornato = False
+
+        # Chiusura ed apertura fuori dal lock: il thread del listener lo acquisisce per applicare gli eventi
+        if registrazione_precedente is not None:
+            print(f"⚠️ Listener Firebase senza eventi da oltre {self._max_silenzio_sec:g} s, riavvio in corso")
+            self._chiudi_registrazione(registrazione_precedente)
+        try:
+            registrazione = self._apri_listener()
+        except Exception as e:
+            print(f"❌ Errore in DiffusoreModifiche._avvia: {e}")
+            registrazione = None
+
+        with self._condizione:
+            self._in_avvio = False
+            if registrazione is not None and not self._chiuso:
+                self._registrazione, registrazione = registrazione, None
+                self._ultimo_segnale = time.monotonic()
+
+        # Processo in chiusura durante l'avvio: il nuovo listener non viene mantenuto
+        if registrazione is not None:
+            self._chiudi_registrazione(registrazione)
+
+    def _apri_listener(self):
+        """
+        Avvia il listener da un thread daemon di appoggio: il thread creato da listen() ne eredita
+        il flag daemon (comportamento standard di threading.Thread) e non impedisce quindi
+        la terminazione del processo (es. uscita di un worker gunicorn).
+        """
+        esito = {}
+
+        def apri():
+            try:
+                esito["registrazione"] = self._ref.listen(self._applica_evento)
+            except Exception as e:
+                esito["errore"] = e
+
+        avvio = threading.Thread(target=apri, name="diffusore-modifiche-avvio", daemon=True)
+        avvio.start()
+        avvio.join()
+        if "errore" in esito:
+            raise esito["errore"]
+        return esito["registrazione"]
+
+    @staticmethod
+    def _chiudi_registrazione(registrazione):
+        try:
+            registrazione.close()
+        except Exception as e:
+            print(f"❌ Errore in DiffusoreModifiche._chiudi_registrazione: {e}")
+
+    def chiudi(self):
+        """
+        Termina il listener (chiusura della connessione e attesa del suo thread) senza più riavviarlo,
+        risvegliando i client in attesa.
+        """
+        with self._condizione:
+            self._chiuso = True
+            self._aggiornato = False
+            registrazione, self._registrazione = self._registrazione, None
+            self._condizione.notify_all()
+
+        # Fuori dal lock: il thread del listener potrebbe attenderlo per applicare un ultimo evento
+        if registrazione is not None:
+            self._chiudi_registrazione(registrazione)
+
+    def _applica_evento(self, evento):
+        try:
+            with self._condizione:
+                if evento.event_type == "put":
+                    valore = _imposta(self._valore, evento.path, evento.data)
+                elif evento.event_type == "patch":
+                    valore = self._valore
+                    for chiave, figlio in (evento.data or {}).items():
+                        valore = _imposta(valore, f"{evento.path.rstrip('/')}/{chiave}", figlio)
+                else:
+                    return
+                self._ultimo_segnale = time.monotonic()
+                self._aggiornato = True
+
+                # Nuova versione solo se il valore è cambiato (es. non al riavvio del listener)
+                if self._versione and valore == self._valore:
+                    return
+                self._valore = valore
+                self._versione += 1
+                self._condizione.notify_all()
+        except Exception as e:
+            print(f"❌ Errore in DiffusoreModifiche._applica_evento: {e}")
+
+    def valore_corrente(self) -> tuple:
+        """
+        Coppia (versione, valore) correnti, senza avviare il listener: versione 0 se il listener
+        non è attivo (mai avviato o silente oltre max_silenzio_sec) o non ha ancora ricevuto dati.
+        """
+        with self._condizione:
+            if not (self._aggiornato and self._listener_attivo()):
+                return 0, None
+            return self._versione, self._valore
+
+    def attendi(self, ultima_versione: int, timeout: float) -> tuple:
+        """
+        Attende (al più timeout secondi) una versione diversa da ultima_versione e ritorna la coppia
+        (versione, valore) correnti, invariata se nel frattempo non è arrivata alcuna modifica.
+        """
+        self._avvia()
+        with self._condizione:
+            self._condizione.wait_for(lambda: self._versione != ultima_versione, timeout)
+            return self._versione, self._valore
@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+
+class FirebaseCache:
+    """
+    Cache read-through locale al processo, indicizzata per path Firebase, con scadenza (TTL)
+    ed eviction LRU. Un path può essere servito anche da un antenato già presente in cache
+    (discesa nel sotto-albero), mentre ogni scrittura invalida il path stesso, i suoi antenati
+    ed i suoi discendenti.
+
+    Ogni elemento memorizzato riceve un numero di versione crescente: finché un path resta
+    servito dallo stesso elemento in cache il suo contenuto non può essere cambiato, per cui
+    la versione può essere usata come "timbro" per le richieste condizionali (ETag).
+
+    NOTA: i valori restituiti sono condivisi con la cache e vanno trattati in sola lettura.
+    """
+
+    def __init__(self, ttl_sec: float = 30, max_entries: int = 512, excluded_paths=None, logger=None):
+        self._ttl_sec = float(ttl_sec)
+        self._max_entries = int(max_entries)
+        self._excluded = [self._segmenti(p) for p in (excluded_paths or [])]
+        self._logger = logger
+
+        self._entries = OrderedDict()  # chiave (path normalizzato, variante) -> (scadenza, valore, versione)
+        self._lock = threading.Lock()
+        self._generazione = 0  # incrementato ad ogni invalidazione (evita riempimenti "stantii")
+        self._sequenza = 0  # numero di versione assegnato all'ultimo elemento memorizzato
+
+    #--------------------------------------------------------------------------
+    @staticmethod
+    def _segmenti(path: str) -> tuple:
+        return tuple(s for s in str(path).split("/") if s)
+
+    def _escluso(self, segmenti: tuple) -> bool:
+        return any(segmenti[:len(e)] == e for e in self._excluded)
+
+    @staticmethod
+    def _discendi(valore, segmenti: tuple):
+        for segmento in segmenti:
+            if isinstance(valore, dict):
+                valore = valore.get(segmento)
+            elif isinstance(valore, list) and segmento.isdigit() and int(segmento) < len(valore):
+                valore = valore[int(segmento)]
+            else:
+                return None
+            if valore is None:
+                return None
+        return valore
+
+    #--------------------------------------------------------------------------
+    def generazione(self) -> int:
+        """
+        Ritorna il contatore corrente delle invalidazioni, da passare a store().
+        """
+        with self._lock:
+            return self._generazione
+
+    def lookup(self, path: str, variante: str = None):
+        """
+        Cerca il path in cache, oppure nel sotto-albero del più vicino antenato in cache.
+        Le letture "variante" (es. shallow) sono cercate solo per path esatto.
+        Ritorna la coppia (trovato, valore).
+        """
+        trovato, valore, _ = self.lookup_con_versione(path, variante)
+        return trovato, valore
+
+    def versione(self, path: str):
+        """
+        Ritorna la versione dell'elemento in cache che serve il path (None se non in cache),
+        senza discendere nel valore.
+        """
+        trovato, _, versione = self.lookup_con_versione(path, discendi=False)
+        return versione if trovato else None
+
+    def lookup_con_versione(self, path: str, variante: str = None, discendi: bool = True):
+        """
+        Come lookup(), ritorna la terna (trovato, valore, versione dell'elemento che serve il path).
+        """
+        segmenti = self._segmenti(path)
+        if self._escluso(segmenti):
+            return False, None, None
+
+        profondita_minima = len(segmenti) if variante is not None else 0
+
+        adesso = time.monotonic()
+        with self._lock:
+            for i in range(len(segmenti), profondita_minima - 1, -1):
+                chiave = (segmenti[:i], variante)
+                entry = self._entries.get(chiave)
+                if entry is None:
+                    continue
+                scadenza, valore, versione = entry
+                if scadenza <= adesso:
+                    del self._entries[chiave]
+                    continue
+                self._entries.move_to_end(chiave)
+                if self._logger:
+                    self._logger.debug(f"Cache HIT per [/{'/'.join(segmenti)}] servito da [/{'/'.join(chiave[0])}]")
+                return True, (self._discendi(valore, segmenti[i:]) if discendi else None), versione
+        return False, None, None
+
+    def store(self, path: str, valore, generazione: int = None, variante: str = None):
+        """
+        Memorizza il valore letto dal database per il path indicato. Se nel frattempo
+        è avvenuta un'invalidazione (generazione cambiata), il valore non viene memorizzato.
+        Ritorna la versione assegnata, None se il valore non è stato memorizzato.
+        """
+        segmenti = self._segmenti(path)
+        if self._escluso(segmenti) or self._max_entries <= 0:
+            return None
+
+        with self._lock:
+            if generazione is not None and generazione != self._generazione:
+                return None
+            self._sequenza += 1
+            chiave = (segmenti, variante)
+            self._entries[chiave] = (time.monotonic() + self._ttl_sec, valore, self._sequenza)
+            self._entries.move_to_end(chiave)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return self._sequenza
+
+    def invalidate(self, path: str):
+        """
+        Invalida il path indicato, tutti i suoi antenati e tutti i suoi discendenti.
+        """
+        segmenti = self._segmenti(path)
+        with self._lock:
+            self._generazione += 1
+            da_rimuovere = [
+                chiave for chiave in self._entries
+                if chiave[0][:len(segmenti)] == segmenti or segmenti[:len(chiave[0])] == chiave[0]
+            ]
+            for chiave in da_rimuovere:
+                del self._entries[chiave]
+        if self._logger and da_rimuovere:
+            self._logger.debug(f"Cache invalidata per [/{'/'.join(segmenti)}]: {len(da_rimuovere)} elementi rimossi")
+
+    def clear(self):
+        with self._lock:
+            self._generazione += 1
+            self._entries.clear()
@@ -0,0 +1,201 @@
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response, stream_with_context
+from utils.config import config, env
+
+PROFONDITA_RECORD_1A = int(config[env].BULK_EXPORT_RECORD_DEPTH_1A)
+PROFONDITA_RECORD_1H = int(config[env].BULK_EXPORT_RECORD_DEPTH_1H)
+MAX_WORKERS = int(config[env].BULK_EXPORT_MAX_WORKERS)
+
+FORMATO_JSON = "json"
+FORMATO_NDJSON = "ndjson"
+
+MIMETYPE_NDJSON = "application/x-ndjson"
+
+#------------------------------------------------------------------------------
+
+def _path_figlio(path: str, chiave: str) -> str:
+    return f"{path.rstrip('/')}/{chiave}"
+
+
+def _lunghezza_array(chiavi) -> int:
+    """
+    Ritorna la lunghezza dell'array con cui Firebase restituirebbe un nodo con queste chiavi
+    (tutte intere e presenti per più della metà fra 0 ed il massimo), None se è un oggetto.
+    """
+    if not chiavi or not all(c.isdigit() and str(int(c)) == c for c in chiavi):
+        return None
+    lunghezza = max(int(c) for c in chiavi) + 1
+    return lunghezza if len(chiavi) * 2 > lunghezza else None
+
+
+def _mappa_ordinata(funzione, elementi, max_workers: int = MAX_WORKERS):
+    """
+    Applica la funzione agli elementi con un pool di thread limitato, restituendo i risultati
+    nell'ordine degli elementi e tenendo in sospeso al più 2 * max_workers risultati.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        in_corso = deque()
+        for elemento in elementi:
+            in_corso.append(executor.submit(funzione, elemento))
+            if len(in_corso) >= 2 * max_workers:
+                yield in_corso.popleft().result()
+        while in_corso:
+            yield in_corso.popleft().result()
+
+#------------------------------------------------------------------------------
+
+def _piano_record(ref, profondita_record: int, path: str):
+    """
+    Percorre l'albero con letture shallow fino alla profondità dei record, generando le terne
+    (path, ref da leggere, None) dei record oppure (path, None, valore) per i valori primitivi
+    incontrati a profondità minore.
+    """
+    if profondita_record <= 0:
+        yield path, ref, None
+        return
+
+    figli = ref.get_shallow(use_cache=False)
+    if figli is None:
+        return
+    if not isinstance(figli, dict):
+        yield path, None, figli
+        return
+
+    for chiave in figli:
+        yield from _piano_record(ref.child(chiave), profondita_record - 1, _path_figlio(path, chiave))
+
+
+def _leggi_record(voce):
+    path, ref, valore = voce
+    return path, (ref.get(use_cache=False) if ref is not None else valore)
+
+
+def genera_record(ref, profondita_record: int, path: str = "/", max_workers: int = MAX_WORKERS):
+    """
+    Genera le coppie (path, valore) dei record sotto ref: la struttura è scoperta con letture
+    shallow, mentre i nodi alla profondità dei record sono letti per intero in parallelo
+    (al più max_workers letture concorrenti), restituendoli nell'ordine dell'albero.
+    Le letture non passano dalla cache, per non trattenere in memoria l'intero database.
+    """
+    for path_record, valore in _mappa_ordinata(_leggi_record, _piano_record(ref, profondita_record, path), max_workers):
+        if valore is not None:
+            yield path_record, valore
+
+
+def leggi_albero(ref, profondita_record: int, max_workers: int = MAX_WORKERS):
+    """
+    Equivalente a ref.get(), ma con i record letti in parallelo su più connessioni
+    (i nodi con chiavi numeriche sono restituiti come array, come da Firebase).
+    """
+    radice = {}
+    for path, valore in genera_record(ref, profondita_record, max_workers=max_workers):
+        segmenti = [s for s in path.split("/") if s]
+        if not segmenti:
+            return valore
+        nodo = radice
+        for segmento in segmenti[:-1]:
+            nodo = nodo.setdefault(segmento, {})
+        nodo[segmenti[-1]] = valore
+    return _come_firebase(radice, profondita_record) or None
+
+
+def _come_firebase(nodo, profondita: int):
+    if profondita <= 0 or not isinstance(nodo, dict):
+        return nodo
+    nodo = {chiave: _come_firebase(figlio, profondita - 1) for chiave, figlio in nodo.items()}
+    lunghezza = _lunghezza_array(list(nodo.keys()))
+    if lunghezza is not None:
+        return [nodo.get(str(indice)) for indice in range(lunghezza)]
+    return nodo
+
+#------------------------------------------------------------------------------
+
+def genera_ndjson(ref, profondita_record: int):
+    """
+    Export NDJSON: una riga {"path": ..., "value": ...} per ciascun record.
+    """
+    for path, valore in genera_record(ref, profondita_record):
+        yield json.dumps({"path": path, "value": valore}, ensure_ascii=False) + "\n"
+
+
+def _piano_json(ref, profondita_record: int):
+    """
+    Frammenti JSON della struttura scoperta con letture shallow, intervallati dai ref
+    dei record ancora da leggere.
+    """
+    if profondita_record <= 0:
+        yield ref
+        return
+
+    figli = ref.get_shallow(use_cache=False)
+    if not isinstance(figli, dict):
+        yield json.dumps(figli, ensure_ascii=False)
+        return
+
+    lunghezza = _lunghezza_array(list(figli.keys()))
+    if lunghezza is not None:
+        yield "["
+        for indice in range(lunghezza):
+            if indice:
+                yield ","
+            if str(indice) in figli:
+                yield from _piano_json(ref.child(str(indice)), profondita_record - 1)
+            else:
+                yield "null"
+        yield "]"
+        return
+
+    yield "{"
+    for indice, chiave in enumerate(figli):
+        yield ("," if indice else "") + json.dumps(chiave, ensure_ascii=False) + ":"
+        yield from _piano_json(ref.child(chiave), profondita_record - 1)
+    yield "}"
+
+
+def _leggi_frammento(voce) -> str:
+    if isinstance(voce, str):
+        return voce
+    return json.dumps(voce.get(use_cache=False), ensure_ascii=False)
+
+
+def genera_json(ref, profondita_record: int):
+    """
+    Export JSON dell'intero albero, equivalente a ref.get() ma generato a frammenti,
+    con i record letti in parallelo.
+    """
+    yield from _mappa_ordinata(_leggi_frammento, _piano_json(ref, profondita_record))
+
+
+def risposta_export_streaming(ref, profondita_record: int, formato: str = FORMATO_JSON, error_location: str = "export"):
+    """
+    Risposta HTTP in streaming (chunked) per l'export del sotto-albero di ref, in formato JSON o NDJSON,
+    con i record alla profondità indicata per il database esportato.
+    Un errore durante lo streaming interrompe la risposta (documento troncato, quindi non valido).
+    """
+    generatore = genera_ndjson(ref, profondita_record) if formato == FORMATO_NDJSON else genera_json(ref, profondita_record)
+
+    def genera():
+        try:
+            yield from generatore
+        except Exception as e:
+            print(f"❌ Errore in {error_location} durante l'export in streaming: {e}")
+            raise
+
+    mimetype = MIMETYPE_NDJSON if formato == FORMATO_NDJSON else "application/json"
+    return Response(stream_with_context(genera()), mimetype=mimetype)
+
+
+def formato_export_streaming(request):
+    """
+    Ritorna il formato di export in streaming richiesto (parametri "format" / "stream" o header
+    Accept), oppure None per l'export tradizionale in un'unica risposta.
+    """
+    formato = (request.args.get("format") or "").strip().lower()
+    if formato == FORMATO_NDJSON or MIMETYPE_NDJSON in request.headers.get("Accept", ""):
+        return FORMATO_NDJSON
+    if (request.args.get("stream") or "").strip().lower() in ("1", "true", "yes"):
+        return FORMATO_JSON
+    return None
@@ -0,0 +1,239 @@
+import gzip
+import io
+import json
+import zlib
+
+from flask import Response, stream_with_context
+from utils.config import config, env
+from utils.firebase.firebase_export import genera_json, leggi_albero, FORMATO_JSON, FORMATO_NDJSON, MIMETYPE_NDJSON
+
+try:
+    import zstandard  # opzionale: formato "json.zst"
+except ImportError:
+    zstandard = None
+
+try:
+    import msgpack  # opzionale: formato "msgpack"
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow  # opzionale: formati tabellari "parquet", "arrow" ed "arrows"
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATO_GZIP = "json.gz"
+FORMATO_ZSTD = "json.zst"
+FORMATO_MSGPACK = "msgpack"
+FORMATO_PARQUET = "parquet"
+FORMATO_ARROW = "arrow"                # Arrow IPC, formato file
+FORMATO_ARROW_STREAM = "arrows"        # Arrow IPC, formato stream
+
+FORMATI_DOCUMENTO = (FORMATO_JSON, FORMATO_GZIP, FORMATO_ZSTD, FORMATO_MSGPACK)
+FORMATI_TABELLARI = (FORMATO_PARQUET, FORMATO_ARROW, FORMATO_ARROW_STREAM)
+
+MIMETYPE_FORMATI = {
+    FORMATO_JSON: "application/json",
+    FORMATO_NDJSON: MIMETYPE_NDJSON,
+    FORMATO_GZIP: "application/gzip",
+    FORMATO_ZSTD: "application/zstd",
+    FORMATO_MSGPACK: "application/msgpack",
+    FORMATO_PARQUET: "application/vnd.apache.parquet",
+    FORMATO_ARROW: "application/vnd.apache.arrow.file",
+    FORMATO_ARROW_STREAM: "application/vnd.apache.arrow.stream",
+}
+
+# Media type (anche alias non standard) -> formato
+FORMATI_DA_MIMETYPE = dict(
+    {mimetype: formato for formato, mimetype in MIMETYPE_FORMATI.items()},
+    **{
+        "application/x-gzip": FORMATO_GZIP,
+        "application/x-msgpack": FORMATO_MSGPACK,
+        "application/x-parquet": FORMATO_PARQUET,
+    }
+)
+
+ESTENSIONI_FORMATI = {
+    FORMATO_GZIP: "json.gz",
+    FORMATO_ZSTD: "json.zst",
+    FORMATO_MSGPACK: "msgpack",
+    FORMATO_PARQUET: "parquet",
+    FORMATO_ARROW: "arrow",
+    FORMATO_ARROW_STREAM: "arrows",
+}
+
+GZIP_LEVEL = int(config[env].BULK_EXPORT_GZIP_LEVEL)
+ZSTD_LEVEL = int(config[env].BULK_EXPORT_ZSTD_LEVEL)
+MAX_BYTE_DECOMPRESSI = int(config[env].BULK_IMPORT_MAX_DECOMPRESSED_BYTES)
+DIMENSIONE_BLOCCO_DECOMPRESSIONE = 1 << 20
+
+class DocumentoTroppoGrande(ValueError):
+    """
+    Sollevata quando un documento compresso in ingresso supera, decompresso, BULK_IMPORT_MAX_DECOMPRESSED_BYTES.
+    """
+
+#------------------------------------------------------------------------------
+
+def formato_disponibile(formato: str) -> bool:
+    """
+    Verifica che le dipendenze opzionali richieste dal formato siano installate.
+    """
+    if formato == FORMATO_ZSTD:
+        return zstandard is not None
+    if formato == FORMATO_MSGPACK:
+        return msgpack is not None
+    if formato in FORMATI_TABELLARI:
+        return pyarrow is not None
+    return formato in MIMETYPE_FORMATI
+
+
+def formato_export(request) -> str:
+    """
+    Formato di export richiesto con il parametro "format" o, in alternativa, con l'header Accept
+    (primo media type riconosciuto). Ritorna None per il JSON tradizionale e per i formati
+    JSON/NDJSON in streaming, gestiti da firebase_export.formato_export_streaming().
+    """
+    formato = (request.args.get("format") or "").strip().lower()
+    if not formato:
+        for voce in request.headers.get("Accept", "").split(","):
+            formato = FORMATI_DA_MIMETYPE.get(voce.split(";")[0].strip().lower())
+            if formato:
+                break
+    return None if formato in (None, "", FORMATO_JSON, FORMATO_NDJSON) else formato
+
+
+def formato_import(request) -> str:
+    """
+    Formato del documento in ingresso, dal parametro "format", dal Content-Type
+    o dal Content-Encoding (JSON compresso). In assenza di indicazioni: JSON.
+    """
+    formato = (request.args.get("format") or "").strip().lower()
+    if formato:
+        return formato
+    formato = FORMATI_DA_MIMETYPE.get(request.mimetype, FORMATO_JSON)
+    if formato == FORMATO_JSON:
+        codifica = (request.headers.get("Content-Encoding") or "").strip().lower()
+        formato = {"gzip": FORMATO_GZIP, "zstd": FORMATO_ZSTD}.get(codifica, formato)
+    return formato
+
+#------------------------------------------------------------------------------
+
+def _comprimi_gzip(frammenti):
+    compressore = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 -> formato gzip
+    for frammento in frammenti:
+        dati = compressore.compress(frammento.encode("utf-8"))
+        if dati:
+            yield dati
+    yield compressore.flush()
+
+
+def _comprimi_zstd(frammenti):
+    compressore = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    for frammento in frammenti:
+        dati = compressore.compress(frammento.encode("utf-8"))
+        if dati:
+            yield dati
+    yield compressore.flush()
+
+
+def _intestazioni_allegato(formato: str, nome_file: str) -> dict:
+    return {"Content-Disposition": f"attachment; filename={nome_file}.{ESTENSIONI_FORMATI[formato]}"}
+
+
+def risposta_export_documento(ref, formato: str, profondita_record: int, nome_file: str = "export", error_location: str = "export"):
+    """
+    Export dell'intero documento in un formato compresso (in streaming, con i record letti
+    in parallelo) oppure MessagePack; profondita_record è quella dei record del database esportato.
+    """
+    mimetype = MIMETYPE_FORMATI[formato]
+    intestazioni = _intestazioni_allegato(formato, nome_file)
+
+    if formato == FORMATO_MSGPACK:
+        return Response(msgpack.packb(leggi_albero(ref, profondita_record), use_bin_type=True), mimetype=mimetype, headers=intestazioni)
+
+    comprimi = _comprimi_zstd if formato == FORMATO_ZSTD else _comprimi_gzip
+
+    def genera():
+        try:
+            yield from comprimi(genera_json(ref, profondita_record))
+        except Exception as e:
+            print(f"❌ Errore in {error_location} durante l'export in streaming: {e}")
+            raise
+
+    return Response(stream_with_context(genera()), mimetype=mimetype, headers=intestazioni)
+
+
+def risposta_export_tabella(colonne: dict, formato: str, nome_file: str = "export"):
+    """
+    Export tabellare (colonnare) in formato Parquet oppure Arrow IPC (formato file o stream).
+    """
+    tabella = pyarrow.table(colonne)
+    buffer = io.BytesIO()
+    if formato == FORMATO_PARQUET:
+        pyarrow.parquet.write_table(tabella, buffer)
+    else:
+        nuovo_writer = pyarrow.ipc.new_stream if formato == FORMATO_ARROW_STREAM else pyarrow.ipc.new_file
+        with nuovo_writer(buffer, tabella.schema) as writer:
+            writer.write_table(tabella)
+    return Response(buffer.getvalue(), mimetype=MIMETYPE_FORMATI[formato], headers=_intestazioni_allegato(formato, nome_file))
+
+#------------------------------------------------------------------------------
+
+def _decomprimi_limitato(lettore) -> bytes:
+    """
+    Decompressione incrementale (a blocchi) da un lettore gzip/zstd, interrotta con DocumentoTroppoGrande
+    appena il documento decompresso supera BULK_IMPORT_MAX_DECOMPRESSED_BYTES.
+    """
+    buffer = io.BytesIO()
+    while True:
+        blocco = lettore.read(DIMENSIONE_BLOCCO_DECOMPRESSIONE)
+        if not blocco:
+            return buffer.getvalue()
+        if buffer.tell() + len(blocco) > MAX_BYTE_DECOMPRESSI:
+            raise DocumentoTroppoGrande(f"Documento decompresso oltre il limite di {MAX_BYTE_DECOMPRESSI} byte")
+        buffer.write(blocco)
+
+
+def decodifica_documento(request, formato: str):
+    """
+    Decodifica il documento in ingresso (JSON, eventualmente compresso, oppure MessagePack).
+    Solleva ValueError se il documento è malformato o, decompresso, troppo grande.
+    """
+    if formato == FORMATO_JSON:
+        return request.get_json(force=True)
+    dati = request.get_data()
+    try:
+        if formato == FORMATO_MSGPACK:
+            return msgpack.unpackb(dati, raw=False, strict_map_key=False)
+        if formato == FORMATO_ZSTD:
+            lettore = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(dati))
+        else:
+            lettore = gzip.GzipFile(fileobj=io.BytesIO(dati), mode="rb")
+        with lettore:
+            dati = _decomprimi_limitato(lettore)
+        return json.loads(dati)
+    except DocumentoTroppoGrande:
+        raise
+    except Exception as e:
+        # Include gli errori specifici delle librerie di decodifica (gzip, msgpack, zstandard)
+        raise ValueError(f"Documento [{formato}] non valido: {e}")
+
+
+def decodifica_tabella(request, formato: str) -> dict:
+    """
+    Decodifica una tabella Parquet o Arrow IPC (formato file o stream) in ingresso, ritornandone
+    le colonne come liste.
+    """
+    buffer = pyarrow.BufferReader(request.get_data())
+    try:
+        if formato == FORMATO_PARQUET:
+            tabella = pyarrow.parquet.read_table(buffer)
+        elif formato == FORMATO_ARROW_STREAM:
+            tabella = pyarrow.ipc.open_stream(buffer).read_all()
+        else:
+            tabella = pyarrow.ipc.open_file(buffer).read_all()
+    except Exception as e:
+        raise ValueError(f"Tabella [{formato}] non valida: {e}")
+    return tabella.to_pydict()
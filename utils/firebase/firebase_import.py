@@ -0,0 +1,123 @@
+import json
+
+from utils.config import config, env
+from utils.rest.paginazione import costruisci_link_pagina
+from utils.tracing.logger_utils import get_logger
+
+BATCH_MAX_RECORD = int(config[env].BULK_IMPORT_BATCH_MAX_RECORDS)
+BATCH_MAX_BYTE = int(config[env].BULK_IMPORT_BATCH_MAX_BYTES)
+
+logger = get_logger(name="firebase_import", level=config[env].FIREBASE_OPS_LOGGER_LOG_LEVEL, mode=config[env].FIREBASE_OPS_LOGGER_LOG_CHANNELS)
+
+#------------------------------------------------------------------------------
+
+def leggi_record_ndjson(stream):
+    """
+    Legge in modo incrementale (una riga alla volta) un documento NDJSON nel formato dell'export
+    in streaming, generando le terne (path, valore, dimensione in byte della riga).
+    Solleva ValueError alla prima riga malformata.
+    """
+    for numero_riga, riga in enumerate(stream, start=1):
+        if not riga.strip():
+            continue
+        try:
+            record = json.loads(riga)
+        except ValueError as e:
+            raise ValueError(f"Riga {numero_riga} NDJSON non valida: {e}")
+        if not isinstance(record, dict) or not isinstance(record.get("path"), str) or "value" not in record:
+            raise ValueError(f"Riga {numero_riga} NDJSON non valida: attesi i campi \"path\" e \"value\"")
+        yield record["path"], record["value"], len(riga)
+
+
+def record_da_documento(dati, profondita_record: int, path: str = "/"):
+    """
+    Scompone un documento JSON già in memoria negli stessi record dell'export in streaming,
+    generando le terne (path, valore, dimensione stimata in byte).
+    """
+    if isinstance(dati, list):
+        dati = {str(indice): valore for indice, valore in enumerate(dati) if valore is not None}
+    if profondita_record <= 0 or not isinstance(dati, dict):
+        if dati is not None:
+            yield path, dati, len(json.dumps(dati))
+        return
+    for chiave, valore in dati.items():
+        yield from record_da_documento(valore, profondita_record - 1, f"{path.rstrip('/')}/{chiave}")
+
+
+def importa_a_blocchi(ref_root, records, radici_ammesse=None, riprendi_dopo: str = None,
+                      max_record: int = BATCH_MAX_RECORD, max_byte: int = BATCH_MAX_BYTE) -> dict:
+    """
+    Scrive i record sotto ref_root in blocchi limitati (per numero di record e byte), ciascuno
+    con un singolo update multi-path. Con riprendi_dopo si saltano tutti i record fino al checkpoint
+    indicato (incluso), cioè l'ultimo path confermato da un import precedente interrotto.
+
+    Ritorna l'esito con il progresso raggiunto ("checkpoint" è l'ultimo path scritto); in caso di
+    errore l'esito contiene anche "errore" e "errore_dati" (True se il documento è malformato).
+    """
+    esito = {
+        "completato": False,
+        "record_importati": 0,
+        "batch_scritti": 0,
+        "checkpoint": riprendi_dopo,
+        "errore": None,
+        "errore_dati": False
+    }
+    checkpoint = "/".join(s for s in riprendi_dopo.split("/") if s) if riprendi_dopo else None
+    in_attesa_checkpoint = checkpoint is not None
+    blocco, byte_blocco = {}, 0
+
+    def scrivi_blocco():
+        ref_root.update(blocco)
+        esito["record_importati"] += len(blocco)
+        esito["batch_scritti"] += 1
+        esito["checkpoint"] = "/" + next(reversed(blocco))
+        logger.info(f"Import a blocchi: batch {esito['batch_scritti']} scritto, {esito['record_importati']} record, checkpoint [{esito['checkpoint']}]")
+
+    try:
+        for path, valore, dimensione in records:
+            segmenti = [s for s in path.split("/") if s]
+            chiave = "/".join(segmenti)
+            if in_attesa_checkpoint:
+                in_attesa_checkpoint = (chiave != checkpoint)
+                continue
+
+            if not segmenti:
+                raise ValueError("Record con path di root '/' non ammesso nell'import a blocchi")
+            if radici_ammesse and segmenti[0] not in radici_ammesse:
+                raise ValueError(f"Record [{path}] fuori dai rami ammessi: {', '.join(radici_ammesse)}")
+
+            if blocco and (len(blocco) >= max_record or byte_blocco + dimensione > max_byte or chiave in blocco):
+                scrivi_blocco()
+                blocco, byte_blocco = {}, 0
+            blocco[chiave] = valore
+            byte_blocco += dimensione
+
+        if in_attesa_checkpoint:
+            raise ValueError(f"Checkpoint [{riprendi_dopo}] non trovato nel documento in ingresso")
+        if blocco:
+            scrivi_blocco()
+        esito["completato"] = True
+
+    except ValueError as e:
+        esito["errore"], esito["errore_dati"] = str(e), True
+    except Exception as e:
+        esito["errore"] = str(e)
+
+    if esito["errore"]:
+        logger.error(f"Import a blocchi interrotto dopo {esito['record_importati']} record (checkpoint [{esito['checkpoint']}]): {esito['errore']}")
+    return esito
+
+
+def risposta_import_a_blocchi(esito: dict, base_url: str, args) -> tuple:
+    """
+    Converte l'esito dell'import a blocchi nella risposta REST (201 se completato, altrimenti
+    400/500 con il progresso raggiunto ed il link per riprendere dall'ultimo checkpoint).
+    """
+    body = {chiave: esito[chiave] for chiave in ("completato", "record_importati", "batch_scritti", "checkpoint")}
+    if esito["completato"]:
+        return body, 201
+
+    body["error"] = esito["errore"]
+    if esito["checkpoint"] and (esito["batch_scritti"] > 0 or not esito["errore_dati"]):
+        body["_links"] = {"riprendi": costruisci_link_pagina(base_url, args, resume_after=esito["checkpoint"])}
+    return body, (400 if esito["errore_dati"] else 500)
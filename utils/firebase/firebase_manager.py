@@ -2,6 +2,7 @@ import threading
 import firebase_admin
 from firebase_admin import credentials
 from utils.config import config, env
+from utils.firebase.firebase_cache import FirebaseCache
 from utils.firebase.firebase_reference import ReferenceWrapper
 from utils.tracing.firebase_logger_decorator import log_firebase_operation
 from utils.tracing.logger_utils import get_logger
@@ -22,6 +23,16 @@ class FirebaseManager:
 
         self.logger = get_logger(name=logger_name, level=config_logger_level, mode=config_logger_mode)
 
+        # Cache read-through condivisa da tutti i ReferenceWrapper di questa app Firebase:
+        self.cache = None
+        if config[env].FIREBASE_CACHE_ENABLED.lower() in ("1", "true", "yes"):
+            self.cache = FirebaseCache(
+                ttl_sec=float(config[env].FIREBASE_CACHE_TTL_SEC),
+                max_entries=int(config[env].FIREBASE_CACHE_MAX_ENTRIES),
+                excluded_paths=[p for p in config[env].FIREBASE_CACHE_EXCLUDED_PATHS.split(",") if p.strip()],
+                logger=self.logger
+            )
+
     @classmethod
     def get_instance(cls, app_name, credentials_path=None, database_url=None):
         with cls._lock:
@@ -64,4 +75,4 @@ class FirebaseManager:
     def get_reference(self, path="/"):
         if not self.app:
             raise RuntimeError(f"App '{self.app_name}' non inizializzata.")
-        return ReferenceWrapper(path, self.app)
+        return ReferenceWrapper(path, self.app, cache=self.cache)
@@ -1,36 +1,235 @@
-from firebase_admin import db
+from concurrent.futures import ThreadPoolExecutor
+from firebase_admin import db, exceptions
+from utils.config import config, env
 from utils.tracing.firebase_logger_decorator import log_firebase_operation
 
+FANOUT_MAX_WORKERS = int(config[env].FIREBASE_FANOUT_MAX_WORKERS)
+
+class TransazioneAnnullata(Exception):
+    """
+    Sollevata dalla funzione di aggiornamento di una transazione per annullarla senza scrivere.
+    """
+
 class ReferenceWrapper:
-    def __init__(self, path: str, app):
+    def __init__(self, path: str, app, cache=None):
         self._ref = db.reference(path, app=app)
         self._path = path
         self._app = app
+        self._cache = cache
 
     @log_firebase_operation
-    def get(self):
-        return self._ref.get()
+    def get(self, use_cache=True):
+        if self._cache is None or not use_cache:
+            return self._ref.get()
+
+        trovato, valore = self._cache.lookup(self._path)
+        if trovato:
+            return valore
+
+        generazione = self._cache.generazione()
+        valore = self._ref.get()
+        self._cache.store(self._path, valore, generazione)
+        return valore
+
+    @log_firebase_operation
+    def get_con_versione(self, use_cache=True):
+        """
+        Come get(), ritorna la coppia (valore, versione in cache del valore letto); la versione
+        è None se la cache non è attiva o il path non è memorizzabile.
+        """
+        if self._cache is None or not use_cache:
+            return self._ref.get(), None
+
+        trovato, valore, versione = self._cache.lookup_con_versione(self._path)
+        if trovato:
+            return valore, versione
+
+        generazione = self._cache.generazione()
+        valore = self._ref.get()
+        return valore, self._cache.store(self._path, valore, generazione)
+
+    def versione(self):
+        """
+        Versione in cache del path (None se non in cache): non effettua letture sul database.
+        """
+        return self._cache.versione(self._path) if self._cache is not None else None
+
+    @log_firebase_operation
+    def get_shallow(self, use_cache=True):
+        """
+        Lettura "shallow" (semantica REST shallow=true): per un nodo oggetto ritorna il dizionario
+        {chiave_figlio: True}, per un valore primitivo ritorna il valore stesso, None se assente.
+        """
+        if self._cache is not None and use_cache:
+            trovato, valore = self._cache.lookup(self._path)
+            if trovato:
+                return self._tronca(valore)
+            trovato, valore = self._cache.lookup(self._path, variante="shallow")
+            if trovato:
+                return valore
+
+            generazione = self._cache.generazione()
+            valore = self._tronca(self._ref.get(shallow=True))
+            self._cache.store(self._path, valore, generazione, variante="shallow")
+            return valore
+
+        return self._tronca(self._ref.get(shallow=True))
+
+    def get_keys_with_child_keys(self, use_cache=True):
+        """
+        Ritorna {chiave_figlio: [chiavi dei nipoti]}, senza scaricare i sotto-alberi: una lettura
+        shallow del nodo ed una lettura shallow (in parallelo) per ciascun figlio non primitivo.
+        Ritorna None se il nodo non esiste.
+        """
+        figli = self.get_shallow(use_cache=use_cache)
+        if not isinstance(figli, dict):
+            return None
+
+        chiavi = list(figli.keys())
+        if not chiavi:
+            return {}
+
+        def leggi_chiavi_figlio(chiave):
+            nipoti = self.child(chiave).get_shallow(use_cache=use_cache)
+            return list(nipoti.keys()) if isinstance(nipoti, dict) else []
+
+        with ThreadPoolExecutor(max_workers=min(FANOUT_MAX_WORKERS, len(chiavi))) as executor:
+            return dict(zip(chiavi, executor.map(leggi_chiavi_figlio, chiavi)))
+
+    def get_keys_with_child_count(self, use_cache=True):
+        """
+        Ritorna {chiave_figlio: numero di figli}, con le stesse letture shallow di get_keys_with_child_keys().
+        """
+        chiavi_figli = self.get_keys_with_child_keys(use_cache=use_cache)
+        if chiavi_figli is None:
+            return None
+        return {chiave: len(nipoti) for chiave, nipoti in chiavi_figli.items()}
+
+    def get_figli(self, chiavi, use_cache=True) -> dict:
+        """
+        Legge in parallelo i soli figli indicati (es. campi scalari di un nodo), senza scaricare
+        il resto del nodo. Ritorna {chiave: valore} per i figli presenti.
+        """
+        chiavi = list(chiavi)
+        if not chiavi:
+            return {}
+
+        def leggi_figlio(chiave):
+            return self.child(chiave).get(use_cache=use_cache)
+
+        with ThreadPoolExecutor(max_workers=min(FANOUT_MAX_WORKERS, len(chiavi))) as executor:
+            valori = list(executor.map(leggi_figlio, chiavi))
+        return {chiave: valore for chiave, valore in zip(chiavi, valori) if valore is not None}
+
+    @staticmethod
+    def _tronca(valore):
+        if isinstance(valore, dict):
+            return {chiave: True for chiave, figlio in valore.items() if figlio is not None}
+        if isinstance(valore, list):
+            return {str(indice): True for indice, figlio in enumerate(valore) if figlio is not None}
+        return valore
+
+    @log_firebase_operation
+    def get_ordered_by_key(self, start_at=None, end_at=None, limit_to_first=None, limit_to_last=None):
+        """
+        Lettura dei figli ordinati per chiave, con limiti applicati lato database (query non in cache).
+        """
+        query = self._ref.order_by_key()
+        if start_at is not None:
+            query = query.start_at(str(start_at))
+        if end_at is not None:
+            query = query.end_at(str(end_at))
+        if limit_to_first is not None:
+            query = query.limit_to_first(limit_to_first)
+        if limit_to_last is not None:
+            query = query.limit_to_last(limit_to_last)
+        return query.get()
 
     @log_firebase_operation
     def set(self, value):
-        return self._ref.set(value)
+        try:
+            return self._ref.set(value)
+        finally:
+            self._invalidate()
 
     @log_firebase_operation
     def update(self, value):
-        return self._ref.update(value)
+        try:
+            return self._ref.update(value)
+        finally:
+            self._invalidate()
 
     @log_firebase_operation
     def delete(self):
-        return self._ref.delete()
+        try:
+            return self._ref.delete()
+        finally:
+            self._invalidate()
+
+    @log_firebase_operation
+    def transaction(self, funzione):
+        """
+        Aggiornamento atomico del nodo: funzione(valore_corrente) -> nuovo valore, riapplicata in caso
+        di scritture concorrenti. Se funzione solleva TransazioneAnnullata non viene scritto nulla.
+        """
+        try:
+            return self._ref.transaction(funzione)
+        finally:
+            self._invalidate()
+
+    @log_firebase_operation
+    def get_con_etag(self):
+        """
+        Lettura diretta dal database (senza cache) del valore del nodo e del relativo ETag Firebase,
+        da usare per una successiva scrittura condizionata.
+        """
+        return self._ref.get(etag=True)
+
+    @log_firebase_operation
+    def delete_if_unchanged(self, etag: str) -> bool:
+        """
+        Eliminazione condizionata (header "if-match" della REST API, come set_if_unchanged()):
+        il nodo viene eliminato solo se il suo ETag Firebase è ancora quello indicato.
+        Ritorna False, senza eliminare nulla, se il nodo è stato modificato nel frattempo.
+        """
+        try:
+            self._ref._client.request('delete', self._ref._add_suffix(), headers={'if-match': etag})
+            return True
+        except exceptions.FailedPreconditionError:
+            return False
+        finally:
+            self._invalidate()
+
+    def listen(self, callback):
+        """
+        Listener Firebase sul nodo (eventi "put"/"patch" in streaming, in un thread dedicato): ogni modifica
+        notificata invalida anche la cache del path prima di essere passata a callback(evento).
+        Ritorna la registrazione del listener (close() per terminarlo).
+        """
+        def su_evento(evento):
+            self._invalidate()
+            callback(evento)
+        return self._ref.listen(su_evento)
 
     def child(self, path_segment: str):
-        return ReferenceWrapper(f"{self._path}/{path_segment}", app=self._app)
+        return ReferenceWrapper(f"{self._path}/{path_segment}", app=self._app, cache=self._cache)
 
     def push(self, value=None):
         if value:
-            @log_firebase_operation
-            def push_op():
-                return self._ref.push(value)
-            return push_op()
-        return self._ref.push()
+            return self._push(value)
+        try:
+            return self._ref.push()
+        finally:
+            self._invalidate()
+
+    @log_firebase_operation
+    def _push(self, value):
+        try:
+            return self._ref.push(value)
+        finally:
+            self._invalidate()
 
+    def _invalidate(self):
+        # Invalidazione anche in caso di errore: l'esito della scrittura remota è incerto
+        if self._cache is not None:
+            self._cache.invalidate(self._path)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+
+from utils.config import config, env
+from utils.tracing.logger_utils import get_logger
+
+try:
+    import xxhash  # opzionale: abilita l'algoritmo "xxhash" per gli hash dei view model
+except ImportError:
+    xxhash = None
+
+# Algoritmi supportati per il campo "_hash" dei view model:
+#   "sha256"  -> compatibilità: stessi valori calcolati finora (SHA-256 del JSON ordinato dei campi)
+#   "blake2b" -> BLAKE2b con digest di 16 byte su una codifica compatta dei campi
+#   "xxhash"  -> XXH3 a 128 bit (non crittografico) sulla stessa codifica compatta; richiede
+#                il pacchetto opzionale xxhash, altrimenti si ripiega su "blake2b"
+ALGORITMI_SUPPORTATI = ("sha256", "blake2b", "xxhash")
+
+_SEPARATORE_CAMPI = "\x1f"
+
+_encode_stringa_json = json.encoder.encode_basestring_ascii
+
+logger = get_logger(name="viewmodel.hashing", level=config[env].VIEW_MODEL_LOGGER_LOG_LEVEL, mode=config[env].VIEW_MODEL_LOGGER_LOG_CHANNELS)
+
+
+def _algoritmo_configurato(algoritmo: str) -> str:
+    algoritmo = str(algoritmo).strip().lower()
+    if algoritmo not in ALGORITMI_SUPPORTATI:
+        raise ValueError(f"VIEW_MODEL_HASH_ALGORITHM non valido: [{algoritmo}] (ammessi: {', '.join(ALGORITMI_SUPPORTATI)})")
+    if algoritmo == "xxhash" and xxhash is None:
+        logger.warning("VIEW_MODEL_HASH_ALGORITHM=xxhash ma il pacchetto xxhash non è installato: uso blake2b")
+        return "blake2b"
+    return algoritmo
+
+
+ALGORITMO = _algoritmo_configurato(config[env].VIEW_MODEL_HASH_ALGORITHM)
+
+#------------------------------------------------------------------------------
+
+def _json_valore(valore) -> str:
+    """
+    Serializza un singolo valore esattamente come json.dumps(..., sort_keys=True),
+    evitando il passaggio dall'encoder generico per i tipi più comuni.
+    """
+    tipo = type(valore)
+    if tipo is str:
+        return _encode_stringa_json(valore)
+    if tipo is int:
+        return int.__repr__(valore)
+    if valore is None:
+        return "null"
+    if valore is True:
+        return "true"
+    if valore is False:
+        return "false"
+    return json.dumps(valore, sort_keys=True)
+
+
+def digest_testo(testo: str, algoritmo: str = None) -> str:
+    """
+    Digest esadecimale del testo indicato con l'algoritmo configurato (o quello indicato).
+    """
+    algoritmo = algoritmo or ALGORITMO
+    dati = testo.encode("utf-8")
+    if algoritmo == "sha256":
+        return hashlib.sha256(dati).hexdigest()
+    if algoritmo == "xxhash":
+        return xxhash.xxh3_128_hexdigest(dati)
+    return hashlib.blake2b(dati, digest_size=16).hexdigest()
+
+
+class HashCampi:
+    """
+    Calcolatore dell'hash dei campi "core" di un view model, passati direttamente come valori
+    nell'ordine fisso dei nomi dichiarati (senza costruire dizionari temporanei).
+
+    In modalità "sha256" il testo hashato è identico a json.dumps({nome: valore}, sort_keys=True),
+    per cui i valori coincidono con quelli storici; con gli algoritmi veloci si usa invece
+    una codifica compatta dei soli valori.
+    """
+
+    def __init__(self, *nomi, algoritmo: str = None):
+        self.nomi = nomi
+        self.algoritmo = _algoritmo_configurato(algoritmo) if algoritmo else ALGORITMO
+        # Ordine alfabetico dei nomi (come sort_keys) e prefissi JSON precalcolati
+        self._ordine = sorted(range(len(nomi)), key=lambda i: nomi[i])
+        self._prefissi = [json.dumps(nomi[i]) + ": " for i in self._ordine]
+
+    def __call__(self, *valori) -> str:
+        if self.algoritmo == "sha256":
+            testo = "{" + ", ".join([
+                prefisso + _json_valore(valori[i]) for prefisso, i in zip(self._prefissi, self._ordine)
+            ]) + "}"
+        else:
+            testo = _SEPARATORE_CAMPI.join(map(repr, valori))
+        return digest_testo(testo, self.algoritmo)
@@ -0,0 +1,147 @@
+import bisect
+import calendar
+import math
+from datetime import datetime
+
+def parse_id_timestamp(id_timestamp: str) -> float:
+    """
+    Converte un identificativo timestamp nel formato "giorno-mese-anno_ore:minuti:secondi",
+    con campi non necessariamente zero-padded (es. "12-3-2025_13:40:49"), in secondi epoch.
+    Ritorna None se l'identificativo non è nel formato atteso.
+    """
+    try:
+        data, orario = str(id_timestamp).split("_")
+        giorno, mese, anno = data.split("-")
+        ore, minuti, secondi = orario.split(":")
+        return float(calendar.timegm((int(anno), int(mese), int(giorno), int(ore), int(minuti), int(secondi), 0, 0, 0)))
+    except ValueError:
+        return None
+
+
+def parse_parametro_temporale(valore: str) -> float:
+    """
+    Interpreta un estremo di intervallo temporale passato in query-string: formato identificativo
+    ("12-3-2025_13:40:49"), ISO-8601 ("2025-03-12", "2025-03-12T13:40:49", UTC se senza offset,
+    oppure con offset "2025-03-12T13:40:49+01:00") o secondi epoch (valori finiti).
+    Solleva ValueError se il valore non è interpretabile.
+    """
+    epoch = parse_id_timestamp(valore)
+    if epoch is not None:
+        return epoch
+    try:
+        epoch = float(valore)
+    except ValueError:
+        pass
+    else:
+        if not math.isfinite(epoch):
+            raise ValueError(f"Estremo temporale non valido: [{valore}]")
+        return epoch
+    try:
+        istante = datetime.fromisoformat(valore)
+    except ValueError:
+        raise ValueError(f"Estremo temporale non valido: [{valore}]")
+    if istante.tzinfo is not None:
+        return istante.timestamp()
+    return float(calendar.timegm(istante.timetuple()))
+
+
+def leggi_intervallo_temporale(args, nomi_da=("from",), nomi_a=("to",)) -> tuple:
+    """
+    Legge dalla query-string gli estremi (inclusi) di un intervallo temporale, None se non indicati.
+    Per ciascun estremo si possono indicare più nomi di parametro alternativi (alias).
+    """
+    da = next((args.get(n) for n in nomi_da if args.get(n)), None)
+    a = next((args.get(n) for n in nomi_a if args.get(n)), None)
+    return (
+        parse_parametro_temporale(da) if da else None,
+        parse_parametro_temporale(a) if a else None
+    )
+
+#------------------------------------------------------------------------------
+
+class IndiceTemporale:
+    """
+    Indice ordinato cronologicamente di identificativi timestamp (array ordinato di coppie
+    (epoch, identificativo)), aggiornabile in modo incrementale ed interrogabile per intervallo
+    tramite ricerca binaria. Gli identificativi non interpretabili sono posti in coda.
+    """
+
+    def __init__(self, chiavi=None):
+        self._voci = sorted((self._epoch(c), c) for c in (chiavi or []))
+        self._chiavi = {c for _, c in self._voci}
+
+    @staticmethod
+    def _epoch(chiave) -> float:
+        epoch = parse_id_timestamp(chiave)
+        return epoch if epoch is not None else math.inf
+
+    def __len__(self):
+        return len(self._voci)
+
+    def __contains__(self, chiave):
+        return chiave in self._chiavi
+
+    def copia(self):
+        indice = IndiceTemporale()
+        indice._voci = list(self._voci)
+        indice._chiavi = set(self._chiavi)
+        return indice
+
+    #--------------------------------------------------------------------------
+    def aggiungi(self, chiave):
+        if chiave not in self._chiavi:
+            bisect.insort(self._voci, (self._epoch(chiave), chiave))
+            self._chiavi.add(chiave)
+
+    def rimuovi(self, chiave):
+        if chiave in self._chiavi:
+            voce = (self._epoch(chiave), chiave)
+            self._voci.pop(bisect.bisect_left(self._voci, voce))
+            self._chiavi.discard(chiave)
+
+    def sincronizza(self, chiavi):
+        """
+        Allinea l'indice all'insieme di chiavi indicato, ordinando solo le chiavi nuove.
+        """
+        chiavi = set(chiavi)
+        for chiave in self._chiavi - chiavi:
+            self.rimuovi(chiave)
+        for chiave in chiavi - self._chiavi:
+            self.aggiungi(chiave)
+
+    #--------------------------------------------------------------------------
+    def chiavi(self) -> list:
+        return [c for _, c in self._voci]
+
+    def prima(self):
+        return self._voci[0][1] if self._voci else None
+
+    def ultima(self):
+        return self._voci[-1][1] if self._voci else None
+
+    def _estremi(self, da: float, a: float) -> tuple:
+        if da is None and a is None:
+            return 0, len(self._voci)
+        inizio = bisect.bisect_left(self._voci, (da, "")) if da is not None else 0
+        fine = bisect.bisect_right(self._voci, (a, "\uffff")) if a is not None else bisect.bisect_left(self._voci, (math.inf, ""))
+        return inizio, fine
+
+    def intervallo(self, da: float = None, a: float = None) -> list:
+        """
+        Ritorna, in ordine cronologico, le chiavi con epoch compreso fra da ed a (estremi inclusi).
+        """
+        inizio, fine = self._estremi(da, a)
+        return [c for _, c in self._voci[inizio:fine]]
+
+    def pagina_decrescente(self, da: float = None, a: float = None, cursore=None, limite: int = None) -> list:
+        """
+        Ritorna, in ordine cronologico inverso, al più "limite" chiavi dell'intervallo [da, a] a partire
+        dalla chiave "cursore" compresa (se presente nell'indice), individuate con ricerca binaria
+        senza materializzare l'intero intervallo.
+        """
+        inizio, fine = self._estremi(da, a)
+        if cursore in self._chiavi:
+            fine = min(fine, bisect.bisect_left(self._voci, (self._epoch(cursore), cursore)) + 1)
+        if limite is not None:
+            inizio = max(inizio, fine - limite)
+        return [c for _, c in reversed(self._voci[inizio:fine])]
@@ -0,0 +1,7 @@
+# rest/__init__.py
+
+# Rende disponibili i moduli quando si fa: from utils.rest import ...
+from .paginazione import leggi_parametri_paginazione, costruisci_link_pagina
+from .etag import calcola_etag_collezione, formatta_etag, etag_corrisponde, risposta_condizionale, risposta_non_modificata, memorizza_etag
+from .proiezione import Proiezione, PROIEZIONE_COMPLETA, leggi_parametri_proiezione
+from .compressione import registra_compressione
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from werkzeug.exceptions import HTTPException
+from utils.config import config, env
+
+MAX_ELEMENTI = int(config[env].BATCH_MAX_ITEMS)
+MAX_WORKERS = int(config[env].BATCH_MAX_WORKERS)
+
+#------------------------------------------------------------------------------
+
+def leggi_elementi_batch(dati) -> list:
+    """
+    Valida l'elenco delle richieste di un batch: ogni elemento è un path (stringa) oppure un oggetto
+    {"path": ..., "if_none_match": ...}. Ritorna la lista di coppie (path, if_none_match).
+    Solleva ValueError se l'elenco è malformato, vuoto o supera BATCH_MAX_ITEMS.
+    """
+    if not isinstance(dati, list) or not dati:
+        raise ValueError("Elenco di richieste mancante o vuoto")
+    if len(dati) > MAX_ELEMENTI:
+        raise ValueError(f"Troppe richieste nel batch: {len(dati)} (massimo {MAX_ELEMENTI})")
+
+    elementi = []
+    for elemento in dati:
+        if isinstance(elemento, str):
+            elementi.append((elemento, None))
+        elif isinstance(elemento, dict) and isinstance(elemento.get("path"), str):
+            elementi.append((elemento["path"], elemento.get("if_none_match")))
+        else:
+            raise ValueError(f"Richiesta non valida nel batch: [{elemento}]")
+    return elementi
+
+
+def _risultato(path: str, status: int, etag: str = None, body=None) -> dict:
+    risultato = {"path": path, "status": status}
+    if etag is not None:
+        risultato["etag"] = etag
+    if body is not None:
+        risultato["body"] = body
+    return risultato
+
+
+def _esegui_get(app, base_url: str, percorsi_esclusi: set, path: str, if_none_match: str) -> dict:
+    """
+    Esegue internamente una singola GET (routing e risorsa Flask-RESTful, senza hook after_request),
+    in un proprio contesto di richiesta.
+    """
+    url = urlsplit(path)
+    percorso = url.path if url.path.startswith(base_url) else f"{base_url}/{url.path.lstrip('/')}"
+    if percorso in percorsi_esclusi:
+        return _risultato(path, 400, body={"error": "Risorsa non ammessa in un batch"})
+
+    headers = {"If-None-Match": if_none_match} if if_none_match else {}
+    with app.test_request_context(percorso, method="GET", query_string=url.query, headers=headers):
+        try:
+            response = app.make_response(app.dispatch_request())
+        except HTTPException as e:
+            return _risultato(path, e.code, body={"error": e.description})
+
+        body = response.get_json(silent=True) if response.status_code != 304 else None
+        return _risultato(path, response.status_code, response.headers.get("ETag"), body)
+
+
+def esegui_batch_get(app, base_url: str, elementi: list, percorsi_esclusi: set = frozenset()) -> list:
+    """
+    Risolve in parallelo (al più BATCH_MAX_WORKERS alla volta) le GET indicate, con path relativi
+    a base_url o assoluti, ritornando per ciascuna, nell'ordine di richiesta,
+    {"path", "status", "etag", "body"}.
+    """
+    def esegui(elemento):
+        path, if_none_match = elemento
+        try:
+            return _esegui_get(app, base_url, percorsi_esclusi, path, if_none_match)
+        except Exception as e:
+            print(f"❌ Errore in esegui_batch_get per [{path}]: {e}")
+            return _risultato(path, 500, body={"error": str(e)})
+
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(elementi)))) as executor:
+        return list(executor.map(esegui, elementi))
@@ -0,0 +1,124 @@
+import gzip
+import zlib
+
+from flask import request
+from utils.config import config, env
+
+try:
+    import brotli  # opzionale: Content-Encoding "br"
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard  # opzionale: Content-Encoding "zstd"
+except ImportError:
+    zstandard = None
+
+ABILITATA = config[env].HTTP_COMPRESSION_ENABLED.strip().lower() in ("1", "true", "yes")
+DIMENSIONE_MINIMA = int(config[env].HTTP_COMPRESSION_MIN_SIZE)
+MIMETYPES = {m.strip() for m in config[env].HTTP_COMPRESSION_MIMETYPES.split(",") if m.strip()}
+GZIP_LEVEL = int(config[env].HTTP_COMPRESSION_GZIP_LEVEL)
+BROTLI_QUALITY = int(config[env].HTTP_COMPRESSION_BROTLI_QUALITY)
+ZSTD_LEVEL = int(config[env].HTTP_COMPRESSION_ZSTD_LEVEL)
+
+#------------------------------------------------------------------------------
+
+def _disponibile(codifica: str) -> bool:
+    if codifica == "br":
+        return brotli is not None
+    if codifica == "zstd":
+        return zstandard is not None
+    return codifica == "gzip"
+
+
+# Algoritmi configurati ed effettivamente disponibili, in ordine di preferenza del server
+CODIFICHE = [c.strip().lower() for c in config[env].HTTP_COMPRESSION_ALGORITHMS.split(",") if _disponibile(c.strip().lower())]
+
+
+def scegli_codifica(accept_encoding) -> str:
+    """
+    Ritorna la prima codifica (in ordine di preferenza del server) accettata dal client
+    con qualità non nulla nell'header Accept-Encoding, None se nessuna.
+    """
+    for codifica in CODIFICHE:
+        if accept_encoding.quality(codifica) > 0:
+            return codifica
+    return None
+
+
+def comprimi(dati: bytes, codifica: str) -> bytes:
+    if codifica == "br":
+        return brotli.compress(dati, quality=BROTLI_QUALITY)
+    if codifica == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(dati)
+    return gzip.compress(dati, compresslevel=GZIP_LEVEL)
+
+
+def _comprimi_flusso(frammenti, codifica: str):
+    if codifica == "br":
+        compressore = brotli.Compressor(quality=BROTLI_QUALITY)
+        comprimi_frammento, chiudi = compressore.process, compressore.finish
+    elif codifica == "zstd":
+        compressore = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        comprimi_frammento, chiudi = compressore.compress, compressore.flush
+    else:
+        compressore = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 -> formato gzip
+        comprimi_frammento, chiudi = compressore.compress, compressore.flush
+
+    for frammento in frammenti:
+        dati = comprimi_frammento(frammento.encode("utf-8") if isinstance(frammento, str) else frammento)
+        if dati:
+            yield dati
+    yield chiudi()
+
+def _indebolisci_etag(response):
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        response.headers["ETag"] = f'W/"{etag.strip(chr(34))}"'
+
+#------------------------------------------------------------------------------
+
+def comprimi_risposta(response):
+    """
+    Hook after_request: comprime le risposte testuali (JSON, NDJSON, ...) con la codifica
+    negoziata via Accept-Encoding. Le risposte piccole (sotto HTTP_COMPRESSION_MIN_SIZE) non sono
+    compresse; quelle in streaming sono compresse frammento per frammento.
+    Con una codifica negoziata l'eventuale ETag diventa "debole" (W/"..."), anche per le risposte
+    sotto la soglia e per le 304, che ripetono così l'ETag della risposta 200 corrispondente
+    (il confronto di If-None-Match resta debole, quindi le richieste condizionali restano valide).
+    """
+    if response.status_code == 304:
+        response.vary.add("Accept-Encoding")
+        if scegli_codifica(request.accept_encodings) is not None:
+            _indebolisci_etag(response)
+        return response
+    if response.status_code < 200 or response.status_code in (204, 206) or request.method == "HEAD":
+        return response
+    if response.mimetype not in MIMETYPES or "Content-Encoding" in response.headers or response.direct_passthrough:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    codifica = scegli_codifica(request.accept_encodings)
+    if codifica is None:
+        return response
+    _indebolisci_etag(response)
+
+    if response.is_streamed:
+        response.response = _comprimi_flusso(response.response, codifica)
+        response.headers.pop("Content-Length", None)
+    else:
+        dati = response.get_data()
+        if len(dati) < DIMENSIONE_MINIMA:
+            return response
+        response.set_data(comprimi(dati, codifica))
+
+    response.headers["Content-Encoding"] = codifica
+    return response
+
+
+def registra_compressione(app):
+    """
+    Registra la compressione delle risposte sull'applicazione Flask, se abilitata da configurazione.
+    """
+    if ABILITATA and CODIFICHE:
+        app.after_request(comprimi_risposta)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from flask import request, make_response
+from utils.config import config, env
+
+def calcola_etag_collezione(elementi, variante: str = None) -> str:
+    """
+    Calcola l'ETag di una collezione come digest combinato degli "_hash" dei suoi elementi,
+    nell'ordine di restituzione (per elementi senza "_hash" si usa la loro serializzazione JSON).
+    L'eventuale variante (es. Proiezione.variante) distingue rappresentazioni diverse degli stessi dati.
+    """
+    digest = hashlib.sha256()
+    if variante is not None:
+        digest.update(variante.encode("utf-8"))
+        digest.update(b"\n")
+    for elemento in elementi:
+        hash_elemento = elemento.get("_hash") if isinstance(elemento, dict) else None
+        if hash_elemento is None:
+            hash_elemento = json.dumps(elemento, sort_keys=True)
+        digest.update(hash_elemento.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def formatta_etag(etag: str) -> str:
+    """
+    Valore dell'header ETag: entity-tag quotato, come richiesto dalla RFC 7232 (es. "abc123").
+    """
+    return f'"{etag}"'
+
+
+def etag_corrisponde(etag: str, if_none_match: str = None, forte: bool = False) -> bool:
+    """
+    Verifica se l'ETag indicato compare nell'header If-None-Match (lista di ETag, eventualmente
+    quotati e/o deboli "W/", oppure "*"), o nel valore di un altro header passato esplicitamente
+    (es. If-Match).
+    Il confronto è debole (RFC 7232), salvo con forte=True, richiesto per If-Match: in tal caso
+    gli ETag deboli "W/" non corrispondono mai.
+    """
+    if if_none_match is None:
+        if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match or etag is None:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*":
+            return True
+        if candidato.startswith("W/"):
+            if forte:
+                continue
+            candidato = candidato[2:]
+        if candidato.strip('"') == etag:
+            return True
+    return False
+
+
+def risposta_condizionale(body, etag: str, status: int = 200):
+    """
+    Ritorna 304 (Not Modified) se il client possiede già la versione corrente della risorsa,
+    altrimenti la tupla (body, status, headers) con l'ETag, serializzata da Flask-RESTful.
+    """
+    if etag_corrisponde(etag):
+        return _risposta_304(etag)
+    return body, status, {"ETag": formatta_etag(etag)}
+
+
+def _risposta_304(etag: str):
+    response = make_response('', 304)
+    response.headers["ETag"] = formatta_etag(etag)
+    return response
+
+#------------------------------------------------------------------------------
+
+class MemoEtag:
+    """
+    Cache LRU degli ETag già calcolati, indicizzata per (chiave richiesta, versione dei dati).
+    La versione è quella assegnata dalla cache Firebase all'elemento che serve i dati letti:
+    finché non cambia, la stessa richiesta produrrebbe la stessa risposta e lo stesso ETag.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self._max_entries = int(max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chiave: str, versione):
+        with self._lock:
+            etag = self._entries.get((chiave, versione))
+            if etag is not None:
+                self._entries.move_to_end((chiave, versione))
+            return etag
+
+    def store(self, chiave: str, versione, etag: str):
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[(chiave, versione)] = etag
+            self._entries.move_to_end((chiave, versione))
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+memo_etag = MemoEtag(int(config[env].ETAG_MEMO_MAX_ENTRIES))
+
+
+def risposta_non_modificata(versione):
+    """
+    Ritorna la risposta 304 se l'ETag già calcolato per questa richiesta e per questa versione
+    dei dati corrisponde all'header If-None-Match, altrimenti None: permette di rispondere
+    senza leggere i dati e senza costruire i view model.
+    """
+    if versione is None or not request.headers.get("If-None-Match"):
+        return None
+    etag = memo_etag.get(request.full_path, versione)
+    if etag is not None and etag_corrisponde(etag):
+        return _risposta_304(etag)
+    return None
+
+
+def memorizza_etag(versione, etag: str):
+    """
+    Registra l'ETag calcolato per la richiesta corrente e la versione dei dati da cui deriva.
+    """
+    if versione is not None:
+        memo_etag.store(request.full_path, versione, etag)
@@ -0,0 +1,40 @@
+from urllib.parse import urlencode
+from utils.config import config, env
+
+def leggi_parametri_paginazione(args) -> tuple:
+    """
+    Legge i parametri di paginazione "limit" e "cursor" dalla query-string della richiesta.
+    Ritorna la coppia (limit, cursor), con limit a None se la paginazione non è richiesta.
+    Solleva ValueError se "limit" non è un intero compreso fra 1 e PAGINATION_MAX_LIMIT.
+    """
+    limit_raw = args.get("limit")
+    cursor = args.get("cursor") or None
+
+    if limit_raw is None or limit_raw == "":
+        if cursor is not None:
+            raise ValueError("Il parametro 'cursor' richiede anche il parametro 'limit'")
+        return None, None
+
+    limite_max = int(config[env].PAGINATION_MAX_LIMIT)
+    try:
+        limit = int(limit_raw)
+    except ValueError:
+        raise ValueError(f"Parametro 'limit' non valido: [{limit_raw}]")
+    if limit < 1 or limit > limite_max:
+        raise ValueError(f"Parametro 'limit' fuori intervallo (1-{limite_max}): [{limit}]")
+
+    return limit, cursor
+
+
+def costruisci_link_pagina(base_url: str, args, **parametri) -> str:
+    """
+    Costruisce il link ad una pagina della collezione, conservando i parametri della richiesta
+    corrente e sovrascrivendo (o rimuovendo, se None) quelli indicati.
+    """
+    query = {k: v for k, v in args.items()}
+    for nome, valore in parametri.items():
+        if valore is None:
+            query.pop(nome, None)
+        else:
+            query[nome] = valore
+    return f"{base_url}?{urlencode(query)}" if query else base_url
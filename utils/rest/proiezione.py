@@ -0,0 +1,59 @@
+VALORI_LINKS_DISATTIVATI = ("none", "false", "0")
+
+class Proiezione:
+    """
+    Proiezione della rappresentazione di un view model (parametri "fields" e "links" della richiesta):
+    - campi: nomi dei campi di primo livello da restituire ("_hash" e "_links" compresi), None per tutti
+    - links: False per omettere i link HATEOAS ("_links")
+    I view model non calcolano i campi esclusi (es. hash e URL dei link).
+    """
+
+    def __init__(self, campi=None, links: bool = True):
+        self.campi = frozenset(campi) if campi is not None else None
+        self.links = links
+
+    @property
+    def completa(self) -> bool:
+        return self.campi is None and self.links
+
+    @property
+    def variante(self) -> str:
+        """
+        Descrizione canonica della proiezione (None se completa), per distinguerne gli ETag.
+        """
+        if self.completa:
+            return None
+        campi = ",".join(sorted(self.campi)) if self.campi is not None else "*"
+        return f"fields={campi};links={'all' if self.links else 'none'}"
+
+    def includi(self, nome: str) -> bool:
+        if nome == "_links" and not self.links:
+            return False
+        return self.campi is None or nome in self.campi
+
+    def applica(self, dati: dict) -> dict:
+        """
+        Filtra i campi di un dizionario già costruito (invariato se la proiezione è completa).
+        """
+        if self.completa:
+            return dati
+        return {nome: valore for nome, valore in dati.items() if self.includi(nome)}
+
+
+PROIEZIONE_COMPLETA = Proiezione()
+
+#------------------------------------------------------------------------------
+
+def leggi_parametri_proiezione(args) -> Proiezione:
+    """
+    Legge i parametri di proiezione dalla query-string della richiesta:
+    - "fields": elenco separato da virgole dei campi da restituire (es. fields=id,tempo_risposta_ms)
+    - "links":  "none" per omettere i link HATEOAS
+    """
+    fields_raw = args.get("fields")
+    campi = [nome.strip() for nome in fields_raw.split(",") if nome.strip()] if fields_raw else None
+    links = (args.get("links") or "").strip().lower() not in VALORI_LINKS_DISATTIVATI
+
+    if campi is None and links:
+        return PROIEZIONE_COMPLETA
+    return Proiezione(campi, links)
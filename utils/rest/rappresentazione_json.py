@@ -0,0 +1,65 @@
+import json
+
+from flask import make_response, current_app
+from flask.json.provider import DefaultJSONProvider
+from utils.config import config, env
+
+try:
+    import orjson  # opzionale: serializzazione JSON veloce delle risposte
+except ImportError:
+    orjson = None
+
+USA_ORJSON = config[env].JSON_ENCODER.strip().lower() == "orjson" and orjson is not None
+
+#------------------------------------------------------------------------------
+
+def serializza_json(data, impostazioni: dict = None) -> bytes:
+    """
+    Serializza la risposta in JSON (terminato da newline, come Flask-RESTful) con orjson se
+    configurato ed installato, altrimenti (o per tipi non gestiti da orjson) con json della stdlib.
+    """
+    impostazioni = impostazioni or {}
+    if USA_ORJSON and set(impostazioni) <= {"indent"}:
+        opzioni = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if impostazioni.get("indent"):
+            opzioni |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, option=opzioni)
+        except TypeError:
+            pass  # tipo non serializzabile da orjson: si ripiega sull'encoder standard
+    return (json.dumps(data, **impostazioni) + "\n").encode("utf-8")
+
+
+def output_json(data, code, headers=None):
+    """
+    Rappresentazione "application/json" per Flask-RESTful (sostituisce quella predefinita,
+    conservandone le impostazioni RESTFUL_JSON e l'indentazione in modalità debug).
+    """
+    impostazioni = dict(current_app.config.get("RESTFUL_JSON", {}))
+    if current_app.debug:
+        impostazioni.setdefault("indent", 4)
+
+    response = make_response(serializza_json(data, impostazioni), code)
+    response.headers.extend(headers or {})
+    response.mimetype = "application/json"
+    return response
+
+
+class ProviderJsonVeloce(DefaultJSONProvider):
+    """
+    Provider JSON di Flask (jsonify, es. /swagger.json) basato su orjson, se disponibile,
+    con le stesse opzioni del provider predefinito (ordinamento chiavi, indentazione in debug).
+    """
+
+    def dumps(self, obj, **kwargs):
+        if USA_ORJSON and set(kwargs) <= {"indent", "separators"}:
+            opzioni = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                opzioni |= orjson.OPT_SORT_KEYS
+            if kwargs.get("indent"):
+                opzioni |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=self.default, option=opzioni).decode("utf-8")
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
@@ -33,9 +33,9 @@ def log_view_model(cls):
             else:
                 logger.debug(f"[{cls.__name__}] ✅ Campo '{name}' = {value}")
 
-    def wrapped_to_dict(self):
+    def wrapped_to_dict(self, *args, **kwargs):
         try:
-            result = original_to_dict(self)
+            result = original_to_dict(self, *args, **kwargs)
             logger.debug(f"[{cls.__name__}] Output to_dict(): {result}")
             return result
         except Exception as e: